@@ -14,8 +14,12 @@ from models import Base
 # Конфигурация Alembic
 config = context.config
 
-# Установка DATABASE_URL из settings
-config.set_main_option("sqlalchemy.url", settings.async_database_url)
+# DATABASE_URL из settings; шард todo_tasks — через
+# alembic -x database_url=postgresql+asyncpg://... upgrade head
+database_url = context.get_x_argument(as_dictionary=True).get(
+    "database_url", settings.async_database_url
+)
+config.set_main_option("sqlalchemy.url", database_url)
 
 # Настройка логирования
 if config.config_file_name is not None:
@@ -27,9 +31,8 @@ target_metadata = Base.metadata
 
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode."""
-    url = settings.async_database_url
     context.configure(
-        url=url,
+        url=database_url,
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
@@ -49,7 +52,7 @@ def do_run_migrations(connection: Connection) -> None:
 async def run_async_migrations() -> None:
     """Run migrations in 'online' mode."""
     configuration = config.get_section(config.config_ini_section)
-    configuration["sqlalchemy.url"] = settings.async_database_url
+    configuration["sqlalchemy.url"] = database_url
     
     connectable = async_engine_from_config(
         configuration,
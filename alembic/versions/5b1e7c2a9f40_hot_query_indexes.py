@@ -0,0 +1,59 @@
+"""hot query indexes
+
+Revision ID: 5b1e7c2a9f40
+Revises: d983da3d54af
+Create Date: 2026-10-18 10:12:41.208311
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b1e7c2a9f40'
+down_revision: Union[str, Sequence[str], None] = 'd983da3d54af'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY нельзя выполнять внутри транзакции
+    with op.get_context().autocommit_block():
+        # Список, экспорт и keyset-пагинация: responsible_id + created_at (+ id для tiebreak)
+        op.create_index(
+            'ix_todo_tasks_responsible_id_created_at_id',
+            'todo_tasks',
+            ['responsible_id', 'created_at', 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        # AuthService._authenticate: username + disabled
+        op.create_index(
+            'ix_users_username_disabled',
+            'users',
+            ['username', 'disabled'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_users_username_disabled',
+            table_name='users',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            'ix_todo_tasks_responsible_id_created_at_id',
+            table_name='todo_tasks',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,83 @@
+"""todo task search
+
+Revision ID: 8c3f1d6e2b75
+Revises: 5b1e7c2a9f40
+Create Date: 2026-10-18 14:05:19.734120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c3f1d6e2b75'
+down_revision: Union[str, Sequence[str], None] = '5b1e7c2a9f40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # Составные GIN-индексы с uuid-колонкой responsible_id
+    op.execute('CREATE EXTENSION IF NOT EXISTS btree_gin')
+    # Stored generated column: заполнение переписывает таблицу под
+    # ACCESS EXCLUSIVE, на больших таблицах запускать в окно обслуживания
+    op.add_column(
+        'todo_tasks',
+        sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "setweight(to_tsvector('russian', coalesce(title, '')), 'A') || "
+                "setweight(to_tsvector('russian', coalesce(description, '')), 'B')",
+                persisted=True,
+            ),
+            nullable=True,
+            comment='Поисковый вектор по заголовку и описанию',
+        ),
+    )
+    # CREATE INDEX CONCURRENTLY нельзя выполнять внутри транзакции
+    with op.get_context().autocommit_block():
+        # Full-text: responsible_id = :id AND search_vector @@ query
+        op.create_index(
+            'ix_todo_tasks_responsible_id_search_vector',
+            'todo_tasks',
+            ['responsible_id', 'search_vector'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        # Префиксный (ILIKE 'q%') и нечёткий (title % q) поиск по заголовку
+        op.create_index(
+            'ix_todo_tasks_responsible_id_title_trgm',
+            'todo_tasks',
+            ['responsible_id', 'title'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={'title': 'gin_trgm_ops'},
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_todo_tasks_responsible_id_title_trgm',
+            table_name='todo_tasks',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            'ix_todo_tasks_responsible_id_search_vector',
+            table_name='todo_tasks',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column('todo_tasks', 'search_vector')
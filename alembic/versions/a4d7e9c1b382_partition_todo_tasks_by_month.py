@@ -0,0 +1,172 @@
+"""partition todo_tasks by month
+
+Revision ID: a4d7e9c1b382
+Revises: 8c3f1d6e2b75
+Create Date: 2026-10-18 16:47:03.512894
+
+"""
+from datetime import date
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import context, op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4d7e9c1b382'
+down_revision: Union[str, Sequence[str], None] = '8c3f1d6e2b75'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Сколько помесячных секций создать сразу после границы legacy-секции;
+# дальше их поддерживает приложение и scripts/maintain_partitions.py
+MONTHS_AHEAD = 3
+# Наименьшая граница legacy-секции: месяц после создания миграции.
+# Граница не зависит от даты применения, а только от данных в таблице
+LEGACY_BOUNDARY = date(2026, 11, 1)
+
+INDEXES = (
+    ('ix_todo_tasks_responsible_id_created_at_id', ['responsible_id', 'created_at', 'id'], {}),
+    (
+        'ix_todo_tasks_responsible_id_search_vector',
+        ['responsible_id', 'search_vector'],
+        {'postgresql_using': 'gin'},
+    ),
+    (
+        'ix_todo_tasks_responsible_id_title_trgm',
+        ['responsible_id', 'title'],
+        {'postgresql_using': 'gin', 'postgresql_ops': {'title': 'gin_trgm_ops'}},
+    ),
+)
+
+
+def _add_months(value: date, months: int) -> date:
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _bound(value: date) -> str:
+    return f"'{value.isoformat()} 00:00:00+00'"
+
+
+def _legacy_boundary() -> date:
+    """
+    Первое число месяца после последней задачи, но не раньше
+    LEGACY_BOUNDARY. Пока приложение пишет, последняя задача создана
+    в текущем месяце, так что новые строки проходят CHECK до ATTACH.
+    """
+    if context.is_offline_mode():
+        return LEGACY_BOUNDARY
+    last_month = op.get_bind().scalar(
+        sa.text(
+            "SELECT date_trunc('month', max(created_at) AT TIME ZONE 'UTC')::date "
+            "FROM todo_tasks"
+        )
+    )
+    if last_month is None:
+        return LEGACY_BOUNDARY
+    return max(LEGACY_BOUNDARY, _add_months(last_month, 1))
+
+
+def _create_parent_constraints_and_indexes() -> None:
+    op.create_primary_key('todo_tasks_pkey', 'todo_tasks', ['id', 'created_at'])
+    op.create_foreign_key(
+        'todo_tasks_responsible_id_fkey',
+        'todo_tasks',
+        'users',
+        ['responsible_id'],
+        ['id'],
+        ondelete='SET NULL',
+    )
+    for name, columns, options in INDEXES:
+        op.create_index(name, 'todo_tasks', columns, unique=False, **options)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Существующая таблица целиком становится секцией todo_tasks_legacy
+    # [MINVALUE, boundary) без копирования данных; новые строки идут
+    # в помесячные секции начиная с boundary.
+    boundary = _legacy_boundary()
+
+    # Долгие шаги — без блокировки записи: индекс, совпадающий с будущим
+    # первичным ключом (id, created_at), и проверенный CHECK, благодаря
+    # которому ATTACH PARTITION не сканирует таблицу.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_todo_tasks_legacy_id_created_at',
+            'todo_tasks',
+            ['id', 'created_at'],
+            unique=True,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.execute(
+            'ALTER TABLE todo_tasks ADD CONSTRAINT todo_tasks_legacy_created_at_check '
+            f'CHECK (created_at < {_bound(boundary)}) NOT VALID'
+        )
+        op.execute('ALTER TABLE todo_tasks VALIDATE CONSTRAINT todo_tasks_legacy_created_at_check')
+
+    # Дальше — короткая транзакция, изменяющая только каталог
+    op.rename_table('todo_tasks', 'todo_tasks_legacy')
+    op.execute('ALTER TABLE todo_tasks_legacy RENAME CONSTRAINT todo_tasks_pkey TO todo_tasks_legacy_pkey')
+    for name, _, _ in INDEXES:
+        op.execute(f'ALTER INDEX {name} RENAME TO {name.replace("ix_todo_tasks_", "ix_todo_tasks_legacy_")}')
+
+    op.execute(
+        'CREATE TABLE todo_tasks '
+        '(LIKE todo_tasks_legacy INCLUDING DEFAULTS INCLUDING GENERATED INCLUDING COMMENTS) '
+        'PARTITION BY RANGE (created_at)'
+    )
+    _create_parent_constraints_and_indexes()
+
+    # У секции может быть только первичный ключ родителя (id, created_at):
+    # старый ключ (id) заменяется заранее построенным уникальным индексом
+    op.execute(
+        'ALTER TABLE todo_tasks_legacy DROP CONSTRAINT todo_tasks_legacy_pkey, '
+        'ADD CONSTRAINT todo_tasks_legacy_pkey PRIMARY KEY USING INDEX ix_todo_tasks_legacy_id_created_at'
+    )
+
+    # Индексы legacy-таблицы с тем же определением подключаются к индексам родителя
+    op.execute(
+        'ALTER TABLE todo_tasks ATTACH PARTITION todo_tasks_legacy '
+        f'FOR VALUES FROM (MINVALUE) TO ({_bound(boundary)})'
+    )
+    op.execute('ALTER TABLE todo_tasks_legacy DROP CONSTRAINT todo_tasks_legacy_created_at_check')
+
+    for offset in range(MONTHS_AHEAD):
+        lower = _add_months(boundary, offset)
+        upper = _add_months(lower, 1)
+        op.execute(
+            f'CREATE TABLE todo_tasks_p{lower:%Y%m} PARTITION OF todo_tasks '
+            f'FOR VALUES FROM ({_bound(lower)}) TO ({_bound(upper)})'
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Обратное преобразование копирует все данные в обычную таблицу
+    op.execute(
+        'CREATE TABLE todo_tasks_unpartitioned '
+        '(LIKE todo_tasks INCLUDING DEFAULTS INCLUDING GENERATED INCLUDING COMMENTS)'
+    )
+    op.execute(
+        'INSERT INTO todo_tasks_unpartitioned '
+        '(title, description, responsible_id, id, created_at, updated_at) '
+        'SELECT title, description, responsible_id, id, created_at, updated_at FROM todo_tasks'
+    )
+    # Удаляет и все секции
+    op.drop_table('todo_tasks')
+    op.rename_table('todo_tasks_unpartitioned', 'todo_tasks')
+
+    op.create_primary_key('todo_tasks_pkey', 'todo_tasks', ['id'])
+    op.create_foreign_key(
+        'todo_tasks_responsible_id_fkey',
+        'todo_tasks',
+        'users',
+        ['responsible_id'],
+        ['id'],
+        ondelete='SET NULL',
+    )
+    for name, columns, options in INDEXES:
+        op.create_index(name, 'todo_tasks', columns, unique=False, **options)
@@ -0,0 +1,123 @@
+"""todo task daily stats
+
+Revision ID: e2b6c8d4f197
+Revises: a4d7e9c1b382
+Create Date: 2026-10-18 19:12:40.281637
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b6c8d4f197'
+down_revision: Union[str, Sequence[str], None] = 'a4d7e9c1b382'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Statement-триггеры с transition tables: на пакетную вставку create_many —
+# один upsert по (пользователь, день), а не по строке на задачу. На
+# секционированной таблице transition tables видят строки всех секций.
+# Отрицательные изменения применяются только UPDATE: строка rollup
+# удалённого пользователя (ON DELETE CASCADE) не должна появиться снова
+# при SET NULL в его задачах.
+APPLY_FUNCTION = """
+CREATE FUNCTION todo_task_daily_stats_apply() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO todo_task_daily_stats AS s (responsible_id, day, created_count)
+        SELECT responsible_id, (created_at AT TIME ZONE 'UTC')::date, count(*)
+        FROM new_rows
+        WHERE responsible_id IS NOT NULL
+        GROUP BY 1, 2
+        ORDER BY 1, 2
+        ON CONFLICT (responsible_id, day)
+        DO UPDATE SET created_count = s.created_count + EXCLUDED.created_count;
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE todo_task_daily_stats AS s
+        SET created_count = s.created_count - d.n
+        FROM (
+            SELECT responsible_id, (created_at AT TIME ZONE 'UTC')::date AS day, count(*) AS n
+            FROM old_rows
+            WHERE responsible_id IS NOT NULL
+            GROUP BY 1, 2
+        ) AS d
+        WHERE s.responsible_id = d.responsible_id AND s.day = d.day;
+    ELSE
+        -- Разница по (пользователь, день): изменение заголовка или
+        -- описания её не даёт и rollup не трогает
+        WITH delta AS (
+            SELECT responsible_id, day, sum(n) AS n
+            FROM (
+                SELECT responsible_id, (created_at AT TIME ZONE 'UTC')::date AS day, 1 AS n
+                FROM new_rows
+                UNION ALL
+                SELECT responsible_id, (created_at AT TIME ZONE 'UTC')::date, -1
+                FROM old_rows
+            ) AS changes
+            WHERE responsible_id IS NOT NULL
+            GROUP BY 1, 2
+            HAVING sum(n) <> 0
+        ), decremented AS (
+            UPDATE todo_task_daily_stats AS s
+            SET created_count = s.created_count + d.n
+            FROM delta AS d
+            WHERE d.n < 0 AND s.responsible_id = d.responsible_id AND s.day = d.day
+        )
+        INSERT INTO todo_task_daily_stats AS s (responsible_id, day, created_count)
+        SELECT responsible_id, day, n
+        FROM delta
+        WHERE n > 0
+        ORDER BY 1, 2
+        ON CONFLICT (responsible_id, day)
+        DO UPDATE SET created_count = s.created_count + EXCLUDED.created_count;
+    END IF;
+    RETURN NULL;
+END
+$$
+"""
+
+TRIGGERS = (
+    ('todo_task_daily_stats_insert', 'INSERT', 'NEW TABLE AS new_rows'),
+    ('todo_task_daily_stats_update', 'UPDATE', 'OLD TABLE AS old_rows NEW TABLE AS new_rows'),
+    ('todo_task_daily_stats_delete', 'DELETE', 'OLD TABLE AS old_rows'),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'todo_task_daily_stats',
+        sa.Column('responsible_id', sa.Uuid(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('created_count', sa.BigInteger(), server_default='0', nullable=False),
+        sa.ForeignKeyConstraint(['responsible_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('responsible_id', 'day'),
+        comment='Созданные задачи пользователя по дням, ведётся триггерами',
+    )
+    op.execute(APPLY_FUNCTION)
+    # CREATE TRIGGER блокирует запись в todo_tasks до конца транзакции,
+    # поэтому заполнение ниже согласовано с триггерами: ни одна вставка
+    # не будет посчитана дважды или пропущена
+    for name, event, referencing in TRIGGERS:
+        op.execute(
+            f'CREATE TRIGGER {name} AFTER {event} ON todo_tasks '
+            f'REFERENCING {referencing} '
+            'FOR EACH STATEMENT EXECUTE FUNCTION todo_task_daily_stats_apply()'
+        )
+    op.execute(
+        'INSERT INTO todo_task_daily_stats (responsible_id, day, created_count) '
+        "SELECT responsible_id, (created_at AT TIME ZONE 'UTC')::date, count(*) "
+        'FROM todo_tasks WHERE responsible_id IS NOT NULL GROUP BY 1, 2'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, _, _ in TRIGGERS:
+        op.execute(f'DROP TRIGGER {name} ON todo_tasks')
+    op.execute('DROP FUNCTION todo_task_daily_stats_apply()')
+    op.drop_table('todo_task_daily_stats')
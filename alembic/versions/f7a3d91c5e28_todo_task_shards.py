@@ -0,0 +1,126 @@
+"""todo task shards
+
+Revision ID: f7a3d91c5e28
+Revises: e2b6c8d4f197
+Create Date: 2026-10-18 21:03:55.917204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7a3d91c5e28'
+down_revision: Union[str, Sequence[str], None] = 'e2b6c8d4f197'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Миграции применяются к primary и к каждому шарду (alembic -x database_url=...).
+# Запись задач пользователя из todo_task_shard_freezes отклоняется.
+# scripts/rebalance_shards.py переносит строки с SET LOCAL todo_tasks.shard_move = on.
+# Пустая таблица меток (обычное состояние) проверяется без обращения
+# к transition table.
+FREEZE_FUNCTION = """
+CREATE FUNCTION todo_task_shard_freeze_check() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    frozen record;
+BEGIN
+    IF current_setting('todo_tasks.shard_move', true) = 'on'
+       OR NOT EXISTS (SELECT 1 FROM todo_task_shard_freezes) THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP = 'DELETE' THEN
+        SELECT f.responsible_id, f.target_shard INTO frozen
+        FROM todo_task_shard_freezes AS f
+        WHERE f.responsible_id IN (SELECT responsible_id FROM old_rows)
+        LIMIT 1;
+    ELSE
+        SELECT f.responsible_id, f.target_shard INTO frozen
+        FROM todo_task_shard_freezes AS f
+        WHERE f.responsible_id IN (SELECT responsible_id FROM new_rows)
+        LIMIT 1;
+    END IF;
+    IF FOUND THEN
+        RAISE EXCEPTION 'todo tasks of user % are moved to shard %',
+            frozen.responsible_id, frozen.target_shard
+            USING ERRCODE = 'TS001';
+    END IF;
+    RETURN NULL;
+END
+$$
+"""
+
+TRIGGERS = (
+    ('todo_task_shard_freeze_insert', 'INSERT', 'NEW TABLE AS new_rows'),
+    ('todo_task_shard_freeze_update', 'UPDATE', 'NEW TABLE AS new_rows'),
+    ('todo_task_shard_freeze_delete', 'DELETE', 'OLD TABLE AS old_rows'),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Внешний ключ между базами невозможен: шард хранит задачи без пользователей
+    op.drop_constraint('todo_tasks_responsible_id_fkey', 'todo_tasks', type_='foreignkey')
+    op.drop_constraint(
+        'todo_task_daily_stats_responsible_id_fkey', 'todo_task_daily_stats', type_='foreignkey'
+    )
+
+    op.create_table(
+        'todo_task_shard_overrides',
+        sa.Column('responsible_id', sa.Uuid(), nullable=False),
+        sa.Column('shard', sa.String(length=100), nullable=False),
+        sa.Column(
+            'updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False
+        ),
+        sa.ForeignKeyConstraint(['responsible_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('responsible_id'),
+        comment='Шард задач пользователя, отличный от кольца хеширования',
+    )
+    op.create_table(
+        'todo_task_shard_freezes',
+        sa.Column('responsible_id', sa.Uuid(), nullable=False),
+        sa.Column('target_shard', sa.String(length=100), nullable=False),
+        sa.Column(
+            'frozen_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False
+        ),
+        sa.PrimaryKeyConstraint('responsible_id'),
+        comment='Задачи пользователя переносятся на другой шард, запись запрещена',
+    )
+    op.execute(FREEZE_FUNCTION)
+    for name, event, referencing in TRIGGERS:
+        op.execute(
+            f'CREATE TRIGGER {name} AFTER {event} ON todo_tasks '
+            f'REFERENCING {referencing} '
+            'FOR EACH STATEMENT EXECUTE FUNCTION todo_task_shard_freeze_check()'
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, _, _ in TRIGGERS:
+        op.execute(f'DROP TRIGGER {name} ON todo_tasks')
+    op.execute('DROP FUNCTION todo_task_shard_freeze_check()')
+    op.drop_table('todo_task_shard_freezes')
+    op.drop_table('todo_task_shard_overrides')
+
+    # Только для несшардированной установки: на шарде без пользователей
+    # проверка ключей не пройдёт
+    op.create_foreign_key(
+        'todo_task_daily_stats_responsible_id_fkey',
+        'todo_task_daily_stats',
+        'users',
+        ['responsible_id'],
+        ['id'],
+        ondelete='CASCADE',
+    )
+    op.create_foreign_key(
+        'todo_tasks_responsible_id_fkey',
+        'todo_tasks',
+        'users',
+        ['responsible_id'],
+        ['id'],
+        ondelete='SET NULL',
+    )
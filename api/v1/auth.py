@@ -3,6 +3,7 @@ from uuid import UUID
 from fastapi import APIRouter, Depends
 from fastapi.security import OAuth2PasswordRequestForm
 from core.containers import Container
+from core.settings import settings
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.dependencies import get_current_user_id, get_db_session
@@ -21,7 +22,9 @@ router = APIRouter()
     response_model=UserResponse,
 )
 @inject
-@managed_db_session()
+@managed_db_session(
+    read_only=True, statement_timeout_ms=settings.DB_READ_STATEMENT_TIMEOUT_MS
+)
 async def get_current_user_info(
     auth_service: Callable[..., AuthService] = Depends(
         Provide[Container.auth_service.provider]
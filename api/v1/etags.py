@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+from fastapi import Depends, Header
+
+from core.cache import TTLCache
+from core.containers import Container
+from core.dependencies import get_current_user_id
+from dependency_injector.wiring import Provide, inject
+from exceptions.custom_exceptions.not_modified import NotModifiedException
+from exceptions.custom_exceptions.precondition_failed import PreconditionFailedException
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def make_etag(id: UUID, updated_at: datetime) -> str:
+    """Сильный ETag из id и updated_at (с точностью до микросекунды)."""
+    if updated_at.tzinfo is None:
+        updated_at = updated_at.replace(tzinfo=timezone.utc)
+    version = (updated_at - _EPOCH) // _MICROSECOND
+    return f'"{id.hex}.{version:x}"'
+
+
+def parse_etag(etag: str, id: UUID) -> datetime | None:
+    """updated_at из ETag, выданного для записи id; None — если ETag чужой или битый."""
+    value = etag.strip()
+    if not (value.startswith('"') and value.endswith('"')):
+        return None
+
+    id_hex, _, version = value[1:-1].partition(".")
+    if id_hex != id.hex:
+        return None
+    try:
+        return _EPOCH + int(version, 16) * _MICROSECOND
+    except ValueError:
+        return None
+
+
+def get_if_match_version(
+    todo_task_id: UUID,
+    if_match: str | None = Header(default=None),
+) -> datetime | None:
+    """
+    Ожидаемая версия (updated_at) из заголовка If-Match.
+    Отсутствующий заголовок и "*" означают обновление без проверки версии.
+    """
+    if if_match is None or if_match.strip() == "*":
+        return None
+
+    for etag in if_match.split(","):
+        version = parse_etag(etag=etag, id=todo_task_id)
+        if version is not None:
+            return version
+    raise PreconditionFailedException()
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Совпадение ETag со списком из If-None-Match: сравнение слабое
+    (W/ не учитывается), "*" совпадает с любой версией.
+    """
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+@inject
+def get_if_none_match(
+    todo_task_id: UUID,
+    if_none_match: str | None = Header(default=None),
+    current_user_id: UUID = Depends(get_current_user_id),
+    version_cache: TTLCache[UUID, tuple[UUID, datetime]] = Depends(
+        Provide[Container.todo_task_version_cache]
+    ),
+) -> str | None:
+    """
+    Заголовок If-None-Match. Если версия задачи пользователя есть в кэше
+    и совпадает, 304 отдаётся сразу: до транзакции и обращения к БД.
+    """
+    if if_none_match is None:
+        return None
+
+    version = version_cache.get(todo_task_id)
+    if version is not None and version[0] == current_user_id:
+        etag = make_etag(id=todo_task_id, updated_at=version[1])
+        if etag_matches(if_none_match=if_none_match, etag=etag):
+            raise NotModifiedException(etag=etag)
+    return if_none_match
@@ -1,18 +1,28 @@
-from datetime import datetime
-from fastapi import Depends, Query
+from datetime import date, datetime, timedelta, timezone
+from fastapi import Depends, HTTPException, Query, status
 from typing import Annotated
 from pydantic import AfterValidator
-from resources.constants import DATETIME_FMT, LIMIT_FROM_DEFAULT, LIMIT_TO_DEFAULT, OFFSET_FROM_DEFAULT
+from resources.constants import (
+    DATETIME_FMT,
+    LIMIT_FROM_DEFAULT,
+    LIMIT_TO_DEFAULT,
+    OFFSET_FROM_DEFAULT,
+    STATS_DEFAULT_DAYS,
+    STATS_MAX_DAYS,
+)
 from resources.regex import HTTP_QUERY_DT_PATTERN
 
 
 from schemas.query_params.query_params import (
+    CountMode,
+    PaginationMode,
     PaginationParams,
     SortingParams,
     SortOrder,
     DateRangeFilter,
 )
 from schemas.todo_task.query_params import ToDoTaskListParams
+from schemas.todo_task.response import ToDoTaskResponse
 
 
 
@@ -46,8 +56,27 @@ def get_todo_task_filter(
 def get_pagination_params(
     offset: int = Query(default=None, ge=OFFSET_FROM_DEFAULT, description="Смещение"),
     limit: int = Query(default=None, ge=LIMIT_FROM_DEFAULT, le=LIMIT_TO_DEFAULT, description="Лимит"),
+    pagination: PaginationMode = Query(
+        default=PaginationMode.OFFSET,
+        description="Режим пагинации: offset или cursor",
+    ),
+    cursor: str | None = Query(
+        default=None,
+        description="Курсор из заголовка X-Next-Cursor (включает режим cursor)",
+    ),
+    count: CountMode | None = Query(
+        default=None,
+        description="Вернуть X-Total-Count: exact, cached или estimated",
+    ),
 ) -> PaginationParams:
-    return PaginationParams(offset=offset, limit=limit)
+    mode = PaginationMode.CURSOR if cursor is not None else pagination
+    return PaginationParams(
+        offset=offset,
+        limit=limit,
+        mode=mode,
+        cursor=cursor,
+        count_mode=count,
+    )
 
 
 def get_sorting_params(
@@ -74,3 +103,46 @@ def get_todo_task_list_params(
         sorting=sorting,
         dt_range_filter=dt_range_filter,
     )
+
+
+def get_todo_task_fields(
+    fields: str | None = Query(
+        default=None,
+        description="Поля ответа через запятую, например: id,title,created_at",
+    ),
+) -> tuple[str, ...] | None:
+    if fields is None:
+        return None
+
+    names = tuple(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = [name for name in names if name not in ToDoTaskResponse.model_fields]
+    if not names or unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}" if unknown else "Empty fields",
+        )
+    return names
+
+
+def get_todo_task_stats_range(
+    date_from: date | None = Query(
+        default=None,
+        description=f"Первый день (UTC), по умолчанию — {STATS_DEFAULT_DAYS} дней до date_to",
+    ),
+    date_to: date | None = Query(default=None, description="Последний день (UTC), по умолчанию — сегодня"),
+) -> tuple[date, date]:
+    if date_to is None:
+        date_to = datetime.now(timezone.utc).date()
+    if date_from is None:
+        date_from = date_to - timedelta(days=STATS_DEFAULT_DAYS - 1)
+    if date_from > date_to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="date_from is after date_to",
+        )
+    if (date_to - date_from).days >= STATS_MAX_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Date range exceeds {STATS_MAX_DAYS} days",
+        )
+    return date_from, date_to
@@ -1,24 +1,57 @@
+import json
+from datetime import date, datetime
 from uuid import UUID
-from fastapi import APIRouter, Depends, status
-from typing import Callable, List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from typing import Any, AsyncIterator, Callable, List
 
 from fastapi.responses import StreamingResponse
 
-from api.v1.filters import get_dt_range_filter, get_todo_task_list_params
+from api.v1.etags import etag_matches, get_if_match_version, get_if_none_match, make_etag
+from api.v1.filters import (
+    get_dt_range_filter,
+    get_todo_task_fields,
+    get_todo_task_list_params,
+    get_todo_task_stats_range,
+)
 from core.containers import Container
+from core.settings import settings
 
-from core.dependencies import get_current_user_id, get_db_session
+from core.dependencies import get_current_user_id, get_todo_db_session
 from database.ext import managed_db_session
 from resources.constants import (
     CONTENT_DISPOSITION_HEADER,
     CONTENT_DISPOSITION_TEMPLATE,
+    ETAG_HEADER,
+    JSON_MEDIA_TYPE,
     FILENAME_TEMPLATE,
+    LIMIT_FROM_DEFAULT,
+    LIMIT_TO_DEFAULT,
+    NDJSON_MEDIA_TYPE,
+    NEXT_CURSOR_HEADER,
+    OFFSET_FROM_DEFAULT,
+    REPORT_COLUMNS,
     REPORT_EXPORT_MEDIA_TYPE,
+    SEARCH_QUERY_MAX_LENGTH,
+    TOTAL_COUNT_HEADER,
 )
 from schemas.query_params.query_params import DateRangeFilter
-from schemas.todo_task.query_params import ToDoTaskListParams
-from schemas.todo_task.request import CreateToDoTask
-from schemas.todo_task.response import ToDoTaskResponse
+from schemas.todo_task.query_params import ToDoTaskListParams, ToDoTaskStatsBucket
+from schemas.todo_task.request import (
+    BatchDeleteToDoTasks,
+    BatchUpdateToDoTasks,
+    CreateToDoTask,
+    ReplaceToDoTask,
+    UpdateToDoTask,
+)
+from schemas.todo_task.response import (
+    BatchDeleteResponse,
+    BulkCreateResponse,
+    ToDoTaskPage,
+    ToDoTaskResponse,
+    ToDoTaskStatsResponse,
+    dump_partial_todo_task,
+    dump_partial_todo_tasks,
+)
 from services.todo_report import TodoReportService
 from services.todo_task import ToDoTaskService
 from dependency_injector.wiring import Provide, inject
@@ -42,7 +75,7 @@ async def create_todo_task(
         dependency=Provide[Container.todo_task_service.provider]
     ),
     current_user_id: UUID = Depends(get_current_user_id),
-    db_session: AsyncSession = Depends(get_db_session),
+    db_session: AsyncSession = Depends(get_todo_db_session),
 ) -> ToDoTaskResponse:
     return await todo_task_service(session=db_session).create_todo_task(
         responsible_id=current_user_id,
@@ -50,42 +83,351 @@ async def create_todo_task(
     )
 
 
-@router.get(path="/", response_model=List[ToDoTaskResponse])
+async def _iter_bulk_items(request: Request) -> AsyncIterator[Any]:
+    """
+    Элементы тела запроса для массового создания.
+    NDJSON читается потоково, по одной строке на элемент;
+    JSON-массив разбирается целиком.
+    """
+    if request.headers.get("content-type", "").startswith(NDJSON_MEDIA_TYPE):
+        buffer = b""
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield line
+        if buffer.strip():
+            yield buffer
+        return
+
+    try:
+        items = json.loads(await request.body())
+    except ValueError:
+        items = None
+    if not isinstance(items, list):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Body must be a JSON array or NDJSON",
+        )
+    for item in items:
+        yield item
+
+
+@router.post(
+    path="/bulk",
+    response_model=BulkCreateResponse,
+    status_code=status.HTTP_200_OK,
+)
+@inject
+@managed_db_session()
+async def bulk_create_todo_tasks(
+    request: Request,
+    todo_task_service: Callable[..., ToDoTaskService] = Depends(
+        dependency=Provide[Container.todo_task_service.provider]
+    ),
+    current_user_id: UUID = Depends(get_current_user_id),
+    db_session: AsyncSession = Depends(get_todo_db_session),
+) -> BulkCreateResponse:
+    """
+    Массовое создание задач.
+
+    Тело — JSON-массив объектов CreateToDoTask или NDJSON
+    (Content-Type: application/x-ndjson), который читается потоково.
+    Результат содержит статус по каждому элементу.
+    """
+    return await todo_task_service(session=db_session).bulk_create_todo_tasks(
+        responsible_id=current_user_id,
+        raw_items=_iter_bulk_items(request=request),
+    )
+
+
+@router.patch(path="/batch", response_model=List[ToDoTaskResponse])
+@inject
+@managed_db_session()
+async def batch_update_todo_tasks(
+    batch_update: BatchUpdateToDoTasks,
+    todo_task_service: Callable[..., ToDoTaskService] = Depends(
+        dependency=Provide[Container.todo_task_service.provider]
+    ),
+    current_user_id: UUID = Depends(get_current_user_id),
+    db_session: AsyncSession = Depends(get_todo_db_session),
+) -> List[ToDoTaskResponse]:
+    """
+    Пакетное изменение задач текущего пользователя.
+    Возвращает только реально обновлённые задачи.
+    """
+    return await todo_task_service(session=db_session).batch_update_todo_tasks(
+        user_id=current_user_id,
+        batch_update=batch_update,
+    )
+
+
+@router.delete(path="/batch", response_model=BatchDeleteResponse)
 @inject
 @managed_db_session()
+async def batch_delete_todo_tasks(
+    batch_delete: BatchDeleteToDoTasks,
+    todo_task_service: Callable[..., ToDoTaskService] = Depends(
+        dependency=Provide[Container.todo_task_service.provider]
+    ),
+    current_user_id: UUID = Depends(get_current_user_id),
+    db_session: AsyncSession = Depends(get_todo_db_session),
+) -> BatchDeleteResponse:
+    """
+    Пакетное удаление задач текущего пользователя.
+    Возвращает id реально удалённых задач.
+    """
+    return await todo_task_service(session=db_session).batch_delete_todo_tasks(
+        user_id=current_user_id,
+        batch_delete=batch_delete,
+    )
+
+
+@router.get(path="/", response_model=List[ToDoTaskResponse])
+@inject
+@managed_db_session(
+    read_only=True, statement_timeout_ms=settings.DB_READ_STATEMENT_TIMEOUT_MS
+)
 async def get_todo_tasks(
+    response: Response,
     list_params: ToDoTaskListParams = Depends(get_todo_task_list_params),
     todo_task_service: Callable[..., ToDoTaskService] = Depends(
         dependency=Provide[Container.todo_task_service.provider]
     ),
     current_user_id: UUID = Depends(get_current_user_id),
-    db_session: AsyncSession = Depends(get_db_session),
-) -> List[ToDoTaskResponse]:
-    return await todo_task_service(session=db_session).get_user_all_todo_tasks(
+    db_session: AsyncSession = Depends(get_todo_db_session),
+    fields: tuple[str, ...] | None = Depends(get_todo_task_fields),
+) -> List[ToDoTaskResponse] | Response:
+    """
+    Список задач пользователя.
+
+    В режиме `pagination=cursor` курсор следующей страницы возвращается
+    в заголовке X-Next-Cursor и передаётся обратно параметром `cursor`.
+
+    `fields=id,title,...` — выбрать из БД и вернуть только эти поля.
+
+    `count=exact|cached|estimated` — вернуть общее количество в заголовке
+    X-Total-Count: точно (окном в том же запросе), из кэша на несколько
+    секунд или по оценке планировщика.
+    """
+    if fields is not None:
+        rows, next_cursor, total_count = await todo_task_service(
+            session=db_session
+        ).get_user_todo_tasks_rows(
+            user_id=current_user_id,
+            list_params=list_params,
+            fields=fields,
+        )
+        sparse_response = Response(
+            content=dump_partial_todo_tasks(fields=fields, rows=rows),
+            media_type=JSON_MEDIA_TYPE,
+        )
+        if next_cursor is not None:
+            sparse_response.headers[NEXT_CURSOR_HEADER] = next_cursor
+        if total_count is not None:
+            sparse_response.headers[TOTAL_COUNT_HEADER] = str(total_count)
+        return sparse_response
+
+    page: ToDoTaskPage = await todo_task_service(
+        session=db_session
+    ).get_user_todo_tasks_page(
         user_id=current_user_id,
         list_params=list_params,
     )
+    if page.next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    if page.total_count is not None:
+        response.headers[TOTAL_COUNT_HEADER] = str(page.total_count)
+    return page.items
+
+
+@router.get(path="/search", response_model=List[ToDoTaskResponse])
+@inject
+@managed_db_session(
+    read_only=True, statement_timeout_ms=settings.DB_READ_STATEMENT_TIMEOUT_MS
+)
+async def search_todo_tasks(
+    q: str = Query(
+        ...,
+        min_length=1,
+        max_length=SEARCH_QUERY_MAX_LENGTH,
+        description="Строка поиска по заголовку и описанию",
+    ),
+    offset: int = Query(default=None, ge=OFFSET_FROM_DEFAULT, description="Смещение"),
+    limit: int = Query(default=None, ge=LIMIT_FROM_DEFAULT, le=LIMIT_TO_DEFAULT, description="Лимит"),
+    todo_task_service: Callable[..., ToDoTaskService] = Depends(
+        dependency=Provide[Container.todo_task_service.provider]
+    ),
+    current_user_id: UUID = Depends(get_current_user_id),
+    db_session: AsyncSession = Depends(get_todo_db_session),
+) -> List[ToDoTaskResponse]:
+    """
+    Поиск задач пользователя: full-text по заголовку и описанию
+    (синтаксис websearch: "фраза", -исключить, or), а также префиксное
+    и нечёткое совпадение заголовка. Результаты отсортированы по рангу.
+    """
+    return await todo_task_service(session=db_session).search_user_todo_tasks(
+        user_id=current_user_id,
+        query=q,
+        offset=offset,
+        limit=limit,
+    )
+
+
+@router.get(path="/stats", response_model=ToDoTaskStatsResponse)
+@inject
+@managed_db_session(
+    read_only=True, statement_timeout_ms=settings.DB_READ_STATEMENT_TIMEOUT_MS
+)
+async def get_todo_task_stats(
+    bucket: ToDoTaskStatsBucket = Query(
+        default=ToDoTaskStatsBucket.DAY,
+        description="Период группировки: day, week (с понедельника) или month",
+    ),
+    stats_range: tuple[date, date] = Depends(get_todo_task_stats_range),
+    todo_task_service: Callable[..., ToDoTaskService] = Depends(
+        dependency=Provide[Container.todo_task_service.provider]
+    ),
+    current_user_id: UUID = Depends(get_current_user_id),
+    db_session: AsyncSession = Depends(get_todo_db_session),
+) -> ToDoTaskStatsResponse:
+    """
+    Сколько задач пользователь создал по дням, неделям или месяцам
+    за диапазон дат (UTC, включительно). Считается по rollup-таблице,
+    которую ведут триггеры, а не по самим задачам.
+    """
+    date_from, date_to = stats_range
+    return await todo_task_service(session=db_session).get_user_todo_task_stats(
+        user_id=current_user_id,
+        bucket=bucket,
+        date_from=date_from,
+        date_to=date_to,
+    )
 
 
 @router.get(path="/{todo_task_id}", response_model=ToDoTaskResponse)
 @inject
-@managed_db_session()
+@managed_db_session(
+    read_only=True, statement_timeout_ms=settings.DB_READ_STATEMENT_TIMEOUT_MS
+)
 async def get_todo_task(
     todo_task_id: UUID,
+    response: Response,
+    # Раньше сессии шарда: попадание в кэш версий не трогает БД
+    if_none_match: str | None = Depends(get_if_none_match),
     todo_task_service: Callable[..., ToDoTaskService] = Depends(
         dependency=Provide[Container.todo_task_service.provider]
     ),
-    db_session: AsyncSession = Depends(get_db_session),
+    db_session: AsyncSession = Depends(get_todo_db_session),
     current_user_id: UUID = Depends(get_current_user_id),
-) -> ToDoTaskResponse:
-    return await todo_task_service(session=db_session).get_user_todo_task(
+    fields: tuple[str, ...] | None = Depends(get_todo_task_fields),
+) -> ToDoTaskResponse | Response:
+    """
+    Задача пользователя. `fields=id,title,...` — вернуть только эти поля.
+    С If-None-Match (ETag прошлого ответа) неизменённая задача даёт 304
+    без тела: по кэшу версий или по одной колонке updated_at.
+    """
+    if if_none_match is not None:
+        version = await todo_task_service(session=db_session).get_user_todo_task_version(
+            user_id=current_user_id, task_id=todo_task_id
+        )
+        etag = make_etag(id=todo_task_id, updated_at=version)
+        if etag_matches(if_none_match=if_none_match, etag=etag):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED, headers={ETAG_HEADER: etag}
+            )
+
+    if fields is not None:
+        row = await todo_task_service(session=db_session).get_user_todo_task_row(
+            user_id=current_user_id,
+            task_id=todo_task_id,
+            fields=fields,
+        )
+        return Response(
+            content=dump_partial_todo_task(fields=fields, row=row),
+            media_type=JSON_MEDIA_TYPE,
+            headers={ETAG_HEADER: make_etag(id=row.id, updated_at=row.updated_at)},
+        )
+
+    todo_task = await todo_task_service(session=db_session).get_user_todo_task(
         task_id=todo_task_id, user_id=current_user_id
     )
+    response.headers[ETAG_HEADER] = make_etag(
+        id=todo_task.id, updated_at=todo_task.updated_at
+    )
+    return todo_task
 
 
-@router.get("/export/excel")
+@router.patch(path="/{todo_task_id}", response_model=ToDoTaskResponse)
+@inject
+@managed_db_session()
+async def update_todo_task(
+    todo_task_id: UUID,
+    todo_task_update: UpdateToDoTask,
+    response: Response,
+    expected_updated_at: datetime | None = Depends(get_if_match_version),
+    todo_task_service: Callable[..., ToDoTaskService] = Depends(
+        dependency=Provide[Container.todo_task_service.provider]
+    ),
+    current_user_id: UUID = Depends(get_current_user_id),
+    db_session: AsyncSession = Depends(get_todo_db_session),
+) -> ToDoTaskResponse:
+    """
+    Частичное изменение задачи.
+
+    С заголовком If-Match (ETag из GET) изменение применяется, только если
+    задача не менялась с момента чтения, иначе возвращается 412.
+    """
+    todo_task = await todo_task_service(session=db_session).update_user_todo_task(
+        user_id=current_user_id,
+        task_id=todo_task_id,
+        todo_task_update=todo_task_update,
+        expected_updated_at=expected_updated_at,
+    )
+    response.headers[ETAG_HEADER] = make_etag(
+        id=todo_task.id, updated_at=todo_task.updated_at
+    )
+    return todo_task
+
+
+@router.put(path="/{todo_task_id}", response_model=ToDoTaskResponse)
 @inject
 @managed_db_session()
+async def replace_todo_task(
+    todo_task_id: UUID,
+    todo_task_replace: ReplaceToDoTask,
+    response: Response,
+    expected_updated_at: datetime | None = Depends(get_if_match_version),
+    todo_task_service: Callable[..., ToDoTaskService] = Depends(
+        dependency=Provide[Container.todo_task_service.provider]
+    ),
+    current_user_id: UUID = Depends(get_current_user_id),
+    db_session: AsyncSession = Depends(get_todo_db_session),
+) -> ToDoTaskResponse:
+    """
+    Создание или полная замена задачи с заданным id (upsert).
+    If-Match работает так же, как в PATCH.
+    """
+    todo_task = await todo_task_service(session=db_session).replace_user_todo_task(
+        user_id=current_user_id,
+        task_id=todo_task_id,
+        todo_task_replace=todo_task_replace,
+        expected_updated_at=expected_updated_at,
+    )
+    response.headers[ETAG_HEADER] = make_etag(
+        id=todo_task.id, updated_at=todo_task.updated_at
+    )
+    return todo_task
+
+
+@router.get("/export/excel")
+@inject
+@managed_db_session(
+    read_only=True,
+    deferrable=True,
+    statement_timeout_ms=settings.DB_EXPORT_STATEMENT_TIMEOUT_MS,
+)
 async def export_todo_tasks(
     tasks_range: DateRangeFilter = Depends(get_dt_range_filter),
     todo_task_service: Callable[..., ToDoTaskService] = Depends(
@@ -95,16 +437,17 @@ async def export_todo_tasks(
         dependency=Provide[Container.todo_report_service]
     ),
     current_user_id: UUID = Depends(get_current_user_id),
-    db_session: AsyncSession = Depends(get_db_session),
+    db_session: AsyncSession = Depends(get_todo_db_session),
 ) -> StreamingResponse:
     """
-    Экспорт todo задач пользователя в Excel файл
+    Экспорт todo задач пользователя в Excel файл.
+    Задачи читаются из БД курсором по мере записи отчёта, в одной
+    read-only транзакции с согласованным снимком.
     """
-    todo_tasks: List[ToDoTaskResponse] = await todo_task_service(
-        session=db_session
-    ).get_user_all_todo_tasks(
+    todo_tasks = todo_task_service(session=db_session).stream_user_todo_tasks(
         user_id=current_user_id,
         list_params=ToDoTaskListParams(dt_range_filter=tasks_range),
+        columns=REPORT_COLUMNS,
     )
 
     filename = FILENAME_TEMPLATE.format(id=uuid.uuid4())
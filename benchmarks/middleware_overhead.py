@@ -0,0 +1,107 @@
+"""
+Сравнение накладных расходов на запрос: три BaseHTTPMiddleware
+против трёх "чистых" ASGI middleware.
+
+Запросы подаются напрямую в ASGI-приложение, без сети и БД,
+поэтому измеряется только стоимость самого стека middleware.
+
+Запуск: PYTHONPATH=. python benchmarks/middleware_overhead.py [--requests N]
+"""
+import argparse
+import asyncio
+import time
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+
+
+class PassthroughHTTPMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        request.state.marker = True
+        return await call_next(request)
+
+
+class PassthroughASGIMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            Request(scope).state.marker = True
+        await self.app(scope, receive, send)
+
+
+async def plain(request: Request) -> PlainTextResponse:
+    return PlainTextResponse("ok")
+
+
+async def stream(request: Request) -> StreamingResponse:
+    async def chunks():
+        for _ in range(16):
+            yield b"x" * 1024
+
+    return StreamingResponse(chunks())
+
+
+def build_app(middleware_cls) -> Starlette:
+    return Starlette(
+        routes=[Route("/plain", plain), Route("/stream", stream)],
+        middleware=[Middleware(middleware_cls) for _ in range(3)],
+    )
+
+
+async def call(app: Starlette, path: str) -> None:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [],
+        "client": ("127.0.0.1", 1),
+        "server": ("127.0.0.1", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    await app(scope, receive, send)
+
+
+async def measure(app: Starlette, path: str, requests: int) -> float:
+    for _ in range(min(requests, 200)):
+        await call(app, path)
+
+    started = time.perf_counter()
+    for _ in range(requests):
+        await call(app, path)
+    return (time.perf_counter() - started) / requests * 1_000_000
+
+
+async def main(requests: int) -> None:
+    apps = {
+        "BaseHTTPMiddleware x3": build_app(PassthroughHTTPMiddleware),
+        "pure ASGI x3": build_app(PassthroughASGIMiddleware),
+    }
+    for path in ("/plain", "/stream"):
+        for name, app in apps.items():
+            per_request = await measure(app, path, requests)
+            print(f"{path:8} {name:24} {per_request:9.1f} us/request")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(main(requests=args.requests))
@@ -0,0 +1,88 @@
+"""
+Стоимость подготовки запросов репозитория на вызов: формы запросов
+строятся заново на каждый вызов против кэша форм (statement_cache).
+
+БД не нужна: повторяется то, что SQLAlchemy делает при execute до
+обращения к драйверу, — построение select, вычисление ключа кэша
+компиляции и поиск скомпилированного SQL по этому ключу
+(компиляция только при промахе).
+
+Запуск: PYTHONPATH=. python benchmarks/repository_statements.py [--calls N]
+"""
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable
+from uuid import uuid4
+
+from sqlalchemy.dialects.postgresql.asyncpg import dialect as asyncpg_dialect
+
+from core.cache import TTLCache
+from repositories.todo_tasks_repository import ToDoTaskRepository
+
+DIALECT = asyncpg_dialect()
+
+
+def prepare(statement: Any, compiled_cache: dict[Any, Any]) -> None:
+    cache_key = statement._generate_cache_key()
+    if cache_key not in compiled_cache:
+        compiled_cache[cache_key] = statement.compile(dialect=DIALECT)
+
+
+def shapes(repository: ToDoTaskRepository) -> dict[str, Callable[[], tuple[Any, dict]]]:
+    now = datetime.now(timezone.utc)
+    return {
+        "get_one": lambda: repository._get_one_statement(
+            id=uuid4(), responsible_id=uuid4()
+        ),
+        "list_offset": lambda: repository._list_statement(
+            responsible_id=uuid4(),
+            offset=100,
+            limit=50,
+            sort_by="created_at",
+            sort_order="desc",
+            date_from=now - timedelta(days=7),
+            date_to=now,
+        ),
+        "list_keyset": lambda: repository._list_statement(
+            responsible_id=uuid4(),
+            limit=50,
+            sort_by="created_at",
+            keyset=True,
+            after=(now, uuid4()),
+        ),
+        "count": lambda: repository._count_statement(
+            responsible_id=uuid4(), date_from=now - timedelta(days=7)
+        ),
+    }
+
+
+def measure(build: Callable[[], tuple[Any, dict]], calls: int) -> float:
+    compiled_cache: dict[Any, Any] = {}
+    for _ in range(min(calls, 200)):
+        prepare(build()[0], compiled_cache)
+
+    started = time.perf_counter()
+    for _ in range(calls):
+        prepare(build()[0], compiled_cache)
+    return (time.perf_counter() - started) / calls * 1_000_000
+
+
+def main(calls: int) -> None:
+    statement_cache = TTLCache(maxsize=100, ttl_seconds=float("inf"))
+    repositories = {
+        "rebuilt": ToDoTaskRepository(),
+        "statement_cache": ToDoTaskRepository(statement_cache=statement_cache),
+    }
+    for shape in shapes(repositories["rebuilt"]):
+        for name, repository in repositories.items():
+            per_call = measure(shapes(repository)[shape], calls)
+            print(f"{shape:12} {name:16} {per_call:9.1f} us/call")
+    print(f"statement_cache: {statement_cache.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=5000)
+    args = parser.parse_args()
+    main(calls=args.calls)
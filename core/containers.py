@@ -1,7 +1,13 @@
 from dependency_injector import containers, providers
+from core.cache import TTLCache
+from core.executors import BoundedExecutor
+from core.lifecycle import Lifecycle
 from core.logger import setup_logger, LOGS_FMT, LOGS_DATE_FMT
 from core.settings import settings
 from database.database import Database
+from database.pubsub import EventBus
+from database.query_log import QueryMonitor
+from database.sharding import ShardRouter
 from repositories.todo_tasks_repository import ToDoTaskRepository
 from repositories.users_repository import UsersRepository
 from services.auth import AuthService
@@ -14,9 +20,12 @@ class Container(containers.DeclarativeContainer):
     wiring_config = containers.WiringConfiguration(
         modules=[
             "api.v1.auth",
+            "api.v1.etags",
             "api.v1.todo_tasks",
+            "core.dependencies",
             "middleware.auth_middleware",
             "middleware.db_session_middleware",
+            "middleware.in_flight_middleware",
             "database.ext",
         ]
     )
@@ -29,18 +38,119 @@ class Container(containers.DeclarativeContainer):
         logger_name="fastapi_app",
     )
 
+    lifecycle = providers.Singleton(provides=Lifecycle)
+
+    query_monitor = providers.Singleton(
+        provides=QueryMonitor,
+        logger=logger,
+        slow_query_ms=settings.DB_SLOW_QUERY_MS,
+        explain=settings.DB_SLOW_QUERY_EXPLAIN,
+        explain_interval_seconds=settings.DB_SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS,
+        explain_concurrency=settings.DB_SLOW_QUERY_EXPLAIN_CONCURRENCY,
+        explain_timeout_ms=settings.DB_SLOW_QUERY_EXPLAIN_TIMEOUT_MS,
+    )
+
     db = providers.Singleton(
         provides=Database,
         database_url=settings.async_database_url,
-        echo=True,
+        echo=settings.DB_ECHO,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        statement_cache_size=settings.DB_STATEMENT_CACHE_SIZE,
+        pgbouncer_mode=settings.DB_PGBOUNCER_MODE,
+        replica_urls=settings.DATABASE_REPLICA_URLS,
+        replica_selection=settings.DB_REPLICA_SELECTION,
+        statement_timeout_ms=settings.DB_STATEMENT_TIMEOUT_MS,
+        query_monitor=query_monitor,
+        shard_urls=settings.TODO_SHARDS,
+    )
+
+    shard_cache = providers.Singleton(
+        provides=TTLCache,
+        maxsize=settings.TODO_SHARD_CACHE_MAXSIZE,
+        ttl_seconds=settings.TODO_SHARD_CACHE_TTL_SECONDS,
+    )
+
+    shard_router = providers.Singleton(
+        provides=ShardRouter,
+        db=db,
+        ring_nodes=settings.TODO_SHARD_RING,
+        vnodes=settings.TODO_SHARD_VNODES,
+        overrides=shard_cache,
+    )
+
+    event_bus = providers.Singleton(
+        provides=EventBus,
+        database_url=settings.PUBSUB_DATABASE_URL or settings.async_database_url,
+        channel=settings.PUBSUB_CHANNEL,
+        enabled=settings.PUBSUB_ENABLED,
+        keepalive_seconds=settings.PUBSUB_KEEPALIVE_SECONDS,
+        reconnect_min_delay=settings.PUBSUB_RECONNECT_MIN_DELAY_SECONDS,
+        reconnect_max_delay=settings.PUBSUB_RECONNECT_MAX_DELAY_SECONDS,
+        logger=logger,
+        # NOTIFY из транзакций шардов todo_tasks
+        extra_database_urls=list(settings.TODO_SHARDS.values()),
+    )
+
+    recent_writers = providers.Singleton(
+        provides=TTLCache,
+        maxsize=settings.DB_READ_YOUR_WRITES_MAXSIZE,
+        ttl_seconds=settings.DB_READ_YOUR_WRITES_SECONDS,
+    )
+
+    user_status_cache = providers.Singleton(
+        provides=TTLCache,
+        maxsize=settings.USER_STATUS_CACHE_MAXSIZE,
+        ttl_seconds=settings.USER_STATUS_CACHE_TTL_SECONDS,
+    )
+
+    statement_cache = providers.Singleton(
+        provides=TTLCache,
+        maxsize=settings.REPOSITORY_STATEMENT_CACHE_MAXSIZE,
+        ttl_seconds=float("inf"),
     )
 
     users_repository = providers.Factory(
         provides=UsersRepository,
+        user_status_cache=user_status_cache,
+        statement_cache=statement_cache,
+    )
+
+    count_cache = providers.Singleton(
+        provides=TTLCache,
+        maxsize=settings.COUNT_CACHE_MAXSIZE,
+        ttl_seconds=settings.COUNT_CACHE_TTL_SECONDS,
+    )
+
+    # Значения — (responsible_id, updated_at). Без LISTEN/NOTIFY изменения
+    # в других воркерах не сбрасывали бы кэш, поэтому тогда он выключен
+    todo_task_version_cache = providers.Singleton(
+        provides=TTLCache,
+        maxsize=settings.TODO_TASK_VERSION_CACHE_MAXSIZE,
+        ttl_seconds=settings.TODO_TASK_VERSION_CACHE_TTL_SECONDS if settings.PUBSUB_ENABLED else 0,
     )
 
     todo_tasks_repository = providers.Factory(
         provides=ToDoTaskRepository,
+        count_cache=count_cache,
+        statement_cache=statement_cache,
+    )
+
+    password_executor = providers.Singleton(
+        provides=BoundedExecutor,
+        kind=settings.PASSWORD_HASH_EXECUTOR,
+        max_workers=settings.PASSWORD_HASH_MAX_WORKERS,
+        max_concurrency=settings.PASSWORD_HASH_MAX_CONCURRENCY,
+        queue_timeout=settings.PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS,
+    )
+
+    token_cache = providers.Singleton(
+        provides=TTLCache,
+        maxsize=settings.TOKEN_CACHE_MAXSIZE,
+        ttl_seconds=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
     )
 
     security_service = providers.Factory(
@@ -48,6 +158,8 @@ class Container(containers.DeclarativeContainer):
         access_token_expire_minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES,
         sign_algorithm=settings.ALGORITHM,
         secret_key=settings.SECRET_KEY,
+        password_executor=password_executor,
+        token_cache=token_cache,
     )
 
     auth_service = providers.Factory(
@@ -55,6 +167,8 @@ class Container(containers.DeclarativeContainer):
         users_repository=users_repository,
         security_service=security_service,
         logger=logger,
+        user_status_cache=user_status_cache,
+        claims_trust_seconds=settings.USER_STATUS_CLAIMS_TRUST_SECONDS,
     )
 
     todo_task_service = providers.Factory(
@@ -62,6 +176,7 @@ class Container(containers.DeclarativeContainer):
         todo_tasks_repository=todo_tasks_repository,
         session=providers.Dependency(),
         logger=logger,
+        version_cache=todo_task_version_cache,
     )
     todo_report_service = providers.Factory(
         provides=TodoReportService,
@@ -2,6 +2,10 @@ from fastapi import Depends, Request
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy import UUID
 
+from core.containers import Container
+from database.lazy_session import LazyAsyncSession
+from database.sharding import ShardRouter
+from dependency_injector.wiring import Provide, inject
 from exceptions.custom_exceptions.unauthorized import UnauthorizedException
 
 oauth_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/token")
@@ -20,3 +24,21 @@ def get_db_session(
 ):
     return request.state.db_session
 
+@inject
+async def get_todo_db_session(
+    request: Request,
+    current_user_id: UUID = Depends(get_current_user_id),
+    shard_router: ShardRouter = Depends(Provide[Container.shard_router]),
+):
+    """
+    Сессия для задач текущего пользователя: на его шарде, если задан
+    TODO_SHARDS, иначе общая сессия запроса. Закрывает DBSessionMiddleware.
+    """
+    if not shard_router.enabled:
+        return request.state.db_session
+
+    shard = await shard_router.shard_for(current_user_id)
+    request.state.todo_db_session = LazyAsyncSession(
+        session_factory=shard_router.session_factory(shard),
+    )
+    return request.state.todo_db_session
@@ -0,0 +1,99 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Literal, TypeVar
+
+from exceptions.custom_exceptions.service_unavailable import (
+    ServiceUnavailableException,
+)
+
+R = TypeVar("R")
+
+ExecutorKind = Literal["thread", "process"]
+
+
+class BoundedExecutor:
+    """
+    Пул для CPU-тяжёлых синхронных функций (bcrypt и т.п.),
+    вынесенных из event loop.
+
+    Количество одновременно выполняемых задач ограничено семафором.
+    Если слот не освободился за queue_timeout секунд,
+    выбрасывается ServiceUnavailableException (503).
+    """
+
+    def __init__(
+        self,
+        kind: ExecutorKind,
+        max_workers: int,
+        max_concurrency: int,
+        queue_timeout: float,
+    ) -> None:
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+        self._executor: Executor | None = None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+        self.queue_depth = 0
+        self.in_flight = 0
+        self.rejected = 0
+        self.completed = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="bounded-executor",
+                )
+        return self._executor
+
+    async def run(self, func: Callable[..., R], *args: Any) -> R:
+        self.queue_depth += 1
+        try:
+            await asyncio.wait_for(
+                self._semaphore.acquire(), timeout=self.queue_timeout
+            )
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise ServiceUnavailableException()
+        finally:
+            self.queue_depth -= 1
+
+        self.in_flight += 1
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            latency = time.perf_counter() - started
+            self.in_flight -= 1
+            self.completed += 1
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+            self._semaphore.release()
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict[str, float | int | str]:
+        avg_latency = self.total_latency / self.completed if self.completed else 0.0
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_concurrency": self.max_concurrency,
+            "queue_depth": self.queue_depth,
+            "in_flight": self.in_flight,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "avg_latency_ms": round(avg_latency * 1000, 3),
+            "max_latency_ms": round(self.max_latency * 1000, 3),
+        }
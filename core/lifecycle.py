@@ -0,0 +1,50 @@
+class Lifecycle:
+    """
+    Готовность воркера и запросы в обработке.
+
+    ready выставляется в lifespan после прогрева и снимается в начале
+    остановки: /ready отвечает 503, пока воркер не готов, в отличие от
+    /health, который отвечает всегда. Запросы считает InFlightMiddleware.
+
+    Ждать запросы в lifespan бесполезно: uvicorn запускает его остановку,
+    когда уже перестал принимать соединения и дождался открытых. Сколько
+    ждать их завершения, задаёт --timeout-graceful-shutdown (см. Dockerfile).
+    """
+
+    def __init__(self) -> None:
+        self.ready = False
+        self.stopping = False
+        self.in_flight = 0
+        self.completed = 0
+        self.warmup_seconds: float | None = None
+
+    @property
+    def status(self) -> str:
+        if self.stopping:
+            return "stopping"
+        return "ready" if self.ready else "starting"
+
+    def request_started(self) -> None:
+        self.in_flight += 1
+
+    def request_finished(self) -> None:
+        self.in_flight -= 1
+        self.completed += 1
+
+    def mark_ready(self, warmup_seconds: float) -> None:
+        self.warmup_seconds = warmup_seconds
+        self.ready = True
+
+    def mark_stopping(self) -> None:
+        self.ready = False
+        self.stopping = True
+
+    def stats(self) -> dict[str, float | int | str | None]:
+        return {
+            "status": self.status,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "warmup_seconds": (
+                None if self.warmup_seconds is None else round(self.warmup_seconds, 3)
+            ),
+        }
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic import PostgresDsn
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -20,6 +22,101 @@ class Settings(BaseSettings):
 
     DATABASE_URL: PostgresDsn
 
+    # Настройки движка и пула соединений
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Размер кэша prepared statements asyncpg (на соединение)
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    # Совместимость с PgBouncer в режиме transaction pooling:
+    # отключает кэши prepared statements и делает их имена уникальными
+    DB_PGBOUNCER_MODE: bool = False
+    # Прогрев при старте (core/warmup.py): сколько соединений открыть в пуле
+    # каждого движка (не больше DB_POOL_SIZE; 0 — не открывать) и выполнять
+    # ли на них горячие запросы репозиториев
+    DB_WARMUP_CONNECTIONS: int = 2
+    DB_WARMUP_STATEMENTS: bool = True
+
+    # statement_timeout: по умолчанию для соединений (0 — без ограничения)
+    # и бюджеты маршрутов, см. managed_db_session(statement_timeout_ms=...)
+    DB_STATEMENT_TIMEOUT_MS: int = 30_000
+    DB_READ_STATEMENT_TIMEOUT_MS: int = 5_000
+    DB_EXPORT_STATEMENT_TIMEOUT_MS: int = 60_000
+
+    # Журнал медленных запросов: порог и фоновый EXPLAIN (ANALYZE, BUFFERS).
+    # ANALYZE выполняет запрос повторно, поэтому EXPLAIN одного и того же
+    # запроса не чаще раза в интервал и не больше N одновременно
+    DB_SLOW_QUERY_MS: float = 500.0
+    DB_SLOW_QUERY_EXPLAIN: bool = True
+    DB_SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS: float = 300.0
+    DB_SLOW_QUERY_EXPLAIN_CONCURRENCY: int = 1
+    DB_SLOW_QUERY_EXPLAIN_TIMEOUT_MS: int = 30_000
+
+    # Реплики для чтения (JSON-список DSN) и способ выбора реплики
+    DATABASE_REPLICA_URLS: list[str] = []
+    DB_REPLICA_SELECTION: Literal["round_robin", "least_busy"] = "round_robin"
+    # Сколько секунд после записи чтения пользователя идут в primary
+    DB_READ_YOUR_WRITES_SECONDS: float = 5.0
+    DB_READ_YOUR_WRITES_MAXSIZE: int = 10_000
+
+    # Шардирование todo_tasks по responsible_id (database/sharding.py):
+    # JSON-объект имя шарда -> DSN; пусто — задачи хранятся в DATABASE_URL.
+    # TODO_SHARD_RING — шарды в кольце хеширования (по умолчанию все):
+    # новый шард сначала добавляется только в TODO_SHARDS, пользователи
+    # переносятся scripts/rebalance_shards.py, затем он входит в кольцо
+    TODO_SHARDS: dict[str, str] = {}
+    TODO_SHARD_RING: list[str] | None = None
+    TODO_SHARD_VNODES: int = 128
+    TODO_SHARD_CACHE_MAXSIZE: int = 100_000
+    TODO_SHARD_CACHE_TTL_SECONDS: float = 300.0
+
+    # Инвалидация кэшей между воркерами через LISTEN/NOTIFY.
+    # LISTEN не работает через PgBouncer в режиме transaction: для него
+    # можно задать прямой адрес Postgres (по умолчанию DATABASE_URL)
+    PUBSUB_ENABLED: bool = True
+    PUBSUB_DATABASE_URL: str | None = None
+    PUBSUB_CHANNEL: str = "cache_invalidation"
+    PUBSUB_KEEPALIVE_SECONDS: float = 30.0
+    PUBSUB_RECONNECT_MIN_DELAY_SECONDS: float = 0.5
+    PUBSUB_RECONNECT_MAX_DELAY_SECONDS: float = 30.0
+
+    # Помесячные секции todo_tasks: сколько будущих месяцев держать созданными
+    # (проверяется при старте приложения) и сколько месяцев хранить
+    # (применяется scripts/maintain_partitions.py; None — хранить всё)
+    TODO_TASKS_PARTITIONS_AHEAD: int = 3
+    TODO_TASKS_RETENTION_MONTHS: int | None = None
+
+    # Кэш версий задач (updated_at) для If-None-Match в GET /todo_tasks/{id}.
+    # Сбрасывается событиями TODO_TASK, поэтому при PUBSUB_ENABLED=False выключен
+    TODO_TASK_VERSION_CACHE_MAXSIZE: int = 50_000
+    TODO_TASK_VERSION_CACHE_TTL_SECONDS: float = 60.0
+
+    # Кэш статуса пользователей в AuthMiddleware
+    USER_STATUS_CACHE_MAXSIZE: int = 10_000
+    USER_STATUS_CACHE_TTL_SECONDS: float = 60.0
+    # Если токен выпущен не раньше, чем N секунд назад, статус пользователя
+    # берётся из claims без обращения к кэшу и БД. 0 — отключено.
+    USER_STATUS_CLAIMS_TRUST_SECONDS: int = 0
+
+    # Кэш проверенных JWT (записи живут до exp токена)
+    TOKEN_CACHE_MAXSIZE: int = 10_000
+
+    # Кэш форм запросов репозиториев (select с bindparam), записи не устаревают
+    REPOSITORY_STATEMENT_CACHE_MAXSIZE: int = 500
+
+    # Кэш общего количества для count=cached (X-Total-Count)
+    COUNT_CACHE_MAXSIZE: int = 10_000
+    COUNT_CACHE_TTL_SECONDS: float = 10.0
+
+    # Пул для bcrypt: хеширование и проверка паролей вне event loop
+    PASSWORD_HASH_EXECUTOR: Literal["thread", "process"] = "thread"
+    PASSWORD_HASH_MAX_WORKERS: int = 4
+    PASSWORD_HASH_MAX_CONCURRENCY: int = 4
+    PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS: float = 2.0
+
     @property
     def async_database_url(self) -> str:
         """Возвращает строку подключения для асинхронной работы"""
@@ -0,0 +1,122 @@
+"""
+Прогрев воркера перед приёмом трафика.
+
+Без него первые запросы после выкладки платят за открытие соединений
+пула, настройку мапперов SQLAlchemy, компиляцию SQL и подготовку
+prepared statements в asyncpg, а первый /openapi.json — за JSON Schema
+всех моделей. Кэш prepared statements у каждого соединения свой, поэтому
+горячие запросы выполняются на каждом открытом соединении.
+"""
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+from typing import Sequence
+from uuid import uuid4
+
+from fastapi import FastAPI
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+from sqlalchemy.orm import configure_mappers
+
+from database.database import Database
+from models.todo_task import ToDoTask
+from repositories.todo_tasks_repository import ToDoTaskRepository
+from repositories.users_repository import UsersRepository
+from resources.constants import LIMIT_TO_DEFAULT, QUERY_LOG_SKIP_OPTION, STATS_DEFAULT_DAYS
+from schemas.todo_task.query_params import ToDoTaskStatsBucket
+from schemas.todo_task.response import ToDoTaskResponse
+
+
+def hot_statements(
+    users_repository: UsersRepository,
+    todo_tasks_repository: ToDoTaskRepository,
+) -> list[Select]:
+    """
+    Формы запросов, с которых начинается большинство запросов к API.
+    Сигнатуры совпадают с вызовами сервисов, поэтому заодно заполняется
+    statement_cache репозиториев. Идентификаторы случайные: запросы
+    ничего не находят.
+    """
+    user_id = uuid4()
+    today = date.today()
+    return [
+        # Проверка пользователя в AuthMiddleware и вход
+        users_repository.build_get_one_statement(id=user_id, disabled=False),
+        users_repository.build_get_one_statement(username=user_id.hex, disabled=False),
+        todo_tasks_repository.build_get_one_statement(id=uuid4(), responsible_id=user_id),
+        # Проверка If-None-Match
+        todo_tasks_repository.build_get_one_statement(
+            columns=("updated_at",), id=uuid4(), responsible_id=user_id
+        ),
+        # Первая страница списка в режимах offset и cursor
+        todo_tasks_repository.build_list_statement(responsible_id=user_id, sort_order=None),
+        todo_tasks_repository.build_list_statement(
+            responsible_id=user_id,
+            limit=LIMIT_TO_DEFAULT,
+            sort_by=todo_tasks_repository.keyset_sort_column(sort_by=None),
+            keyset=True,
+        ),
+        todo_tasks_repository.build_count_statement(responsible_id=user_id),
+        todo_tasks_repository.build_stats_statement(
+            responsible_id=user_id,
+            bucket=ToDoTaskStatsBucket.DAY,
+            date_from=today - timedelta(days=STATS_DEFAULT_DAYS - 1),
+            date_to=today,
+        ),
+    ]
+
+
+async def _run_statements(conn: AsyncConnection, statements: Sequence[Select]) -> None:
+    # Холодные запросы не должны попадать в журнал медленных
+    await conn.execution_options(**{QUERY_LOG_SKIP_OPTION: True})
+    for statement in statements:
+        await conn.execute(statement)
+    await conn.rollback()
+
+
+async def _warm_up_engine(
+    engine: AsyncEngine, connections: int, statements: Sequence[Select]
+) -> None:
+    # Соединения держатся открытыми одновременно, иначе пул раз за разом
+    # выдавал бы одно и то же
+    pending = [engine.connect() for _ in range(connections)]
+    try:
+        opened = await asyncio.gather(*(conn.start() for conn in pending))
+        await asyncio.gather(*(_run_statements(conn, statements) for conn in opened))
+    finally:
+        await asyncio.gather(*(conn.close() for conn in pending), return_exceptions=True)
+
+
+async def warm_up_database(
+    db: Database, connections: int, statements: Sequence[Select] = ()
+) -> None:
+    """
+    Открыть до connections соединений (не больше размера пула) в каждом
+    движке — primary, репликах и шардах — и выполнить на них statements.
+    """
+    connections = min(connections, db.pool_size)
+    if connections <= 0:
+        return
+    await asyncio.gather(
+        *(
+            _warm_up_engine(engine=engine, connections=connections, statements=statements)
+            for engine in db.engines
+        )
+    )
+
+
+def prime_schemas(app: FastAPI) -> None:
+    """Мапперы SQLAlchemy, схема OpenAPI и валидация ORM-объекта задачи."""
+    configure_mappers()
+    # Кэшируется в app.openapi_schema и отдаётся в /openapi.json
+    app.openapi()
+
+    now = datetime.now(timezone.utc)
+    todo_task = ToDoTask(
+        id=uuid4(),
+        title="",
+        description="",
+        responsible_id=uuid4(),
+        created_at=now,
+        updated_at=now,
+    )
+    ToDoTaskResponse.model_validate(obj=todo_task).model_dump_json()
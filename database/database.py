@@ -1,24 +1,263 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+import asyncio
+import itertools
+import time
+from typing import Any, Literal, Mapping, Sequence
+from uuid import uuid4
+
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from database.query_log import QueryMonitor
+from resources.constants import REPLICA_SESSION_INFO_KEY
 
 Base = declarative_base()
 
 
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Пул, замеряющий время ожидания свободного соединения."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            wait = time.perf_counter() - started
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+
+ReplicaSelection = Literal["round_robin", "least_busy"]
+
+
 class Database:
-    def __init__(self, database_url: str, echo: bool = False):
-        self._engine = create_async_engine(
+    def __init__(
+        self,
+        database_url: str,
+        echo: bool = False,
+        pool_size: int = 10,
+        max_overflow: int = 10,
+        pool_timeout: float = 30.0,
+        pool_recycle: int = 1800,
+        pool_pre_ping: bool = True,
+        statement_cache_size: int = 100,
+        pgbouncer_mode: bool = False,
+        replica_urls: Sequence[str] = (),
+        replica_selection: ReplicaSelection = "round_robin",
+        statement_timeout_ms: int = 0,
+        query_monitor: QueryMonitor | None = None,
+        shard_urls: Mapping[str, str] | None = None,
+    ):
+        self._pool_options = {
+            "pool_size": pool_size,
+            "max_overflow": max_overflow,
+            "pool_timeout": pool_timeout,
+            "pool_recycle": pool_recycle,
+            "pool_pre_ping": pool_pre_ping,
+            "statement_cache_size": statement_cache_size,
+            "pgbouncer_mode": pgbouncer_mode,
+            "statement_timeout_ms": statement_timeout_ms,
+        }
+        self._echo = echo
+        self.query_monitor = query_monitor
+
+        self._engine = self._create_engine(database_url=database_url)
+        self.session_factory = self._create_session_factory(engine=self._engine)
+
+        # Реплики только для чтения; при их отсутствии чтение идёт в primary
+        self._replica_engines = [
+            self._create_engine(database_url=url) for url in replica_urls
+        ]
+        self._replica_session_factories = [
+            self._create_session_factory(engine=engine, replica=True)
+            for engine in self._replica_engines
+        ]
+        self.replica_selection = replica_selection
+        self._replica_cycle = itertools.cycle(range(len(self._replica_engines)))
+
+        # Шарды todo_tasks (имя -> движок), маршрутизация — database/sharding.py
+        self._shard_engines = {
+            name: self._create_engine(database_url=url)
+            for name, url in (shard_urls or {}).items()
+        }
+        self._shard_session_factories = {
+            name: self._create_session_factory(engine=engine)
+            for name, engine in self._shard_engines.items()
+        }
+
+    def _create_engine(self, database_url: str) -> AsyncEngine:
+        engine = create_async_engine(
             url=database_url,
-            echo=echo,
+            echo=self._echo,
             future=True,
+            **self._engine_options(database_url=database_url, **self._pool_options),
         )
-        self.session_factory = async_sessionmaker(
-            bind=self._engine,
+        if self.query_monitor is not None:
+            self.query_monitor.instrument(engine=engine)
+        return engine
+
+    @staticmethod
+    def _create_session_factory(
+        engine: AsyncEngine, replica: bool = False
+    ) -> async_sessionmaker[AsyncSession]:
+        # Кэши, заполняемые из сессии, отличают чтение с отстающей реплики
+        return async_sessionmaker(
+            bind=engine,
             class_=AsyncSession,
             expire_on_commit=False,
             autocommit=False,
             autoflush=False,
+            info={REPLICA_SESSION_INFO_KEY: True} if replica else None,
         )
 
+    @property
+    def engine(self) -> AsyncEngine:
+        return self._engine
+
+    @property
+    def engines(self) -> list[AsyncEngine]:
+        """Все движки: primary, реплики и шарды."""
+        return [self._engine, *self._replica_engines, *self._shard_engines.values()]
+
+    @property
+    def pool_size(self) -> int:
+        return self._pool_options["pool_size"]
+
+    @property
+    def has_replicas(self) -> bool:
+        return bool(self._replica_engines)
+
+    def is_replica(self, engine: Any) -> bool:
+        return any(engine is replica for replica in self._replica_engines)
+
+    @property
+    def shard_names(self) -> list[str]:
+        return list(self._shard_engines)
+
+    @property
+    def shard_engines(self) -> dict[str, AsyncEngine]:
+        return dict(self._shard_engines)
+
+    def shard_session_factory(self, name: str) -> async_sessionmaker[AsyncSession]:
+        return self._shard_session_factories[name]
+
+    def _pick_replica_index(self) -> int:
+        if self.replica_selection == "least_busy":
+            return min(
+                range(len(self._replica_engines)),
+                key=lambda index: self._checked_out(self._replica_engines[index]),
+            )
+        return next(self._replica_cycle)
+
+    @staticmethod
+    def _checked_out(engine: AsyncEngine) -> int:
+        pool = engine.pool
+        return pool.checkedout() if isinstance(pool, AsyncAdaptedQueuePool) else 0
+
+    def read_session_factory(self) -> async_sessionmaker[AsyncSession]:
+        """Фабрика сессий для чтения: реплика, если она настроена, иначе primary."""
+        if not self._replica_engines:
+            return self.session_factory
+        return self._replica_session_factories[self._pick_replica_index()]
+
+    @staticmethod
+    def _engine_options(
+        database_url: str,
+        pool_size: int,
+        max_overflow: int,
+        pool_timeout: float,
+        pool_recycle: int,
+        pool_pre_ping: bool,
+        statement_cache_size: int,
+        pgbouncer_mode: bool,
+        statement_timeout_ms: int,
+    ) -> dict[str, Any]:
+        # SQLite (локальные проверки) использует свой пул и не принимает этих опций
+        if make_url(database_url).get_backend_name() != "postgresql":
+            return {}
+
+        if pgbouncer_mode:
+            connect_args: dict[str, Any] = {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+            }
+        else:
+            connect_args = {
+                "statement_cache_size": statement_cache_size,
+                "prepared_statement_cache_size": statement_cache_size,
+            }
+            # Бюджет по умолчанию для всех запросов соединения; маршруты
+            # переопределяют его через managed_db_session(statement_timeout_ms=...).
+            # PgBouncer не пропускает произвольные стартовые параметры,
+            # поэтому в его режиме действуют только бюджеты маршрутов
+            if statement_timeout_ms:
+                connect_args["server_settings"] = {
+                    "statement_timeout": str(statement_timeout_ms)
+                }
+
+        return {
+            "poolclass": InstrumentedAsyncQueuePool,
+            "pool_size": pool_size,
+            "max_overflow": max_overflow,
+            "pool_timeout": pool_timeout,
+            "pool_recycle": pool_recycle,
+            "pool_pre_ping": pool_pre_ping,
+            "connect_args": connect_args,
+        }
+
+    def pool_stats(self) -> dict[str, Any]:
+        stats = self._engine_pool_stats(engine=self._engine)
+        if self._replica_engines:
+            stats["replicas"] = [
+                self._engine_pool_stats(engine=engine)
+                for engine in self._replica_engines
+            ]
+        if self._shard_engines:
+            stats["shards"] = {
+                name: self._engine_pool_stats(engine=engine)
+                for name, engine in self._shard_engines.items()
+            }
+        return stats
+
+    @staticmethod
+    def _engine_pool_stats(engine: AsyncEngine) -> dict[str, Any]:
+        pool = engine.pool
+        if not isinstance(pool, InstrumentedAsyncQueuePool):
+            return {"pool": pool.status()}
+
+        avg_wait = pool.total_wait / pool.checkouts if pool.checkouts else 0.0
+        return {
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "checkouts": pool.checkouts,
+            "avg_wait_ms": round(avg_wait * 1000, 3),
+            "max_wait_ms": round(pool.max_wait * 1000, 3),
+        }
+
     async def init_db(self) -> None:
         async with self._engine.begin() as conn:
+            # Индексы поиска задач: gin_trgm_ops и GIN по uuid-колонке
+            for extension in ("pg_trgm", "btree_gin"):
+                await conn.execute(text(f"CREATE EXTENSION IF NOT EXISTS {extension}"))
             await conn.run_sync(Base.metadata.create_all)
+
+    async def dispose(self) -> None:
+        """Закрыть соединения пулов всех движков."""
+        await asyncio.gather(*(engine.dispose() for engine in self.engines))
@@ -0,0 +1,40 @@
+from typing import Any
+
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+
+class Explain(Executable, ClauseElement):
+    """
+    EXPLAIN (FORMAT JSON) для произвольного SQLAlchemy-выражения.
+    Параметры исходного запроса передаются как обычные bind-параметры.
+    """
+
+    inherit_cache = False
+
+    def __init__(
+        self,
+        statement: Any,
+        analyze: bool = False,
+        buffers: bool = False,
+    ) -> None:
+        self.statement = statement
+        self.analyze = analyze
+        self.buffers = buffers
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element: Explain, compiler, **kw) -> str:
+    options = ["FORMAT JSON"]
+    if element.analyze:
+        options.append("ANALYZE")
+    if element.buffers:
+        options.append("BUFFERS")
+    return f"EXPLAIN ({', '.join(options)}) " + compiler.process(element.statement, **kw)
+
+
+def iter_plan_nodes(plan: dict[str, Any]):
+    """Обход всех узлов плана EXPLAIN (FORMAT JSON)."""
+    yield plan
+    for child in plan.get("Plans", ()):
+        yield from iter_plan_nodes(child)
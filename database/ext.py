@@ -1,34 +1,114 @@
 from logging import Logger
 from collections.abc import Awaitable, Callable
 from functools import wraps
-from typing import ParamSpec, TypeVar, cast
+from typing import Any, ParamSpec, TypeVar, cast
 
 from fastapi import Depends
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.containers import Container
+from database.database import Database
+from database.pubsub import EventBus, pop_pending_events
+from database.query_log import current_route
 from dependency_injector.wiring import Provide, inject
 
 P = ParamSpec('P')
 R = TypeVar('R')
 
 
-def managed_db_session():
+async def _begin_read_only(db_session: AsyncSession, db: Database, deferrable: bool) -> None:
+    """
+    Начинает транзакцию READ ONLY: asyncpg открывает её одним
+    BEGIN READ ONLY без отдельного SET TRANSACTION.
+    """
+    if db_session.in_transaction():
+        # Например, проверка статуса пользователя в AuthMiddleware:
+        # режим транзакции задаётся только до первого запроса в ней
+        await db_session.commit()
+
+    execution_options: dict[str, Any] = {"postgresql_readonly": True}
+    if deferrable:
+        # primary или шард todo_tasks: у шардов реплик нет
+        if not db.is_replica(db_session.bind):
+            # DEFERRABLE действует только в SERIALIZABLE: снимок без риска
+            # отмены из-за конфликтов сериализации
+            execution_options.update(
+                isolation_level="SERIALIZABLE", postgresql_deferrable=True
+            )
+        else:
+            # На hot standby SERIALIZABLE недоступен; согласованный снимок
+            # для read-only транзакции даёт REPEATABLE READ
+            execution_options["isolation_level"] = "REPEATABLE READ"
+    await db_session.connection(execution_options=execution_options)
+
+
+async def _set_statement_timeout(db_session: AsyncSession, statement_timeout_ms: int) -> None:
+    """SET LOCAL statement_timeout: действует до конца текущей транзакции."""
+    await db_session.execute(
+        text("SELECT set_config('statement_timeout', :value, true)"),
+        {"value": str(statement_timeout_ms)},
+    )
+
+
+def managed_db_session(
+    read_only: bool = False,
+    deferrable: bool = False,
+    statement_timeout_ms: int | None = None,
+):
+    """
+    Транзакция на время обработчика маршрута.
+
+    По умолчанию — COMMIT при успехе и откат при исключении.
+    read_only=True — транзакция READ ONLY без COMMIT: она остаётся открытой
+    до закрытия сессии в DBSessionMiddleware, поэтому потоковый ответ
+    читает в том же снимке. deferrable=True (вместе с read_only) —
+    SERIALIZABLE READ ONLY DEFERRABLE для долгих выгрузок.
+    statement_timeout_ms — бюджет маршрута на каждый запрос транзакции
+    (для потоковой выгрузки — на каждую выборку из курсора) вместо
+    DB_STATEMENT_TIMEOUT_MS соединения.
+    """
     def decorator(func: Callable[P, Awaitable[R]]) -> Callable[P, Awaitable[R]]:
         @wraps(func)
         @inject
-        async def wrapper(*args: P.args, logger: Logger = Depends(Provide[Container.logger]), **kwargs: P.kwargs) -> R:
+        async def wrapper(
+            *args: P.args,
+            logger: Logger = Depends(Provide[Container.logger]),
+            event_bus: EventBus = Depends(Provide[Container.event_bus]),
+            db: Database = Depends(Provide[Container.db]),
+            **kwargs: P.kwargs,
+        ) -> R:
             db_session: AsyncSession = cast(AsyncSession, kwargs.get('db_session'))
+            # Тег для журнала медленных запросов. Не сбрасывается здесь, чтобы
+            # им были помечены и запросы потокового ответа; значение до
+            # запроса восстанавливает DBSessionMiddleware
+            current_route.set(func.__name__)
+            if read_only:
+                try:
+                    await _begin_read_only(db_session=db_session, db=db, deferrable=deferrable)
+                    if statement_timeout_ms is not None:
+                        await _set_statement_timeout(db_session, statement_timeout_ms)
+                    return await func(*args, **kwargs)
+                except Exception as exc:
+                    logger.warning('Exception caught in read-only transaction.: %s', exc)
+                    await db_session.rollback()
+                    raise exc
+
             try:
+                if statement_timeout_ms is not None:
+                    await _set_statement_timeout(db_session, statement_timeout_ms)
                 result = await func(*args, **kwargs)
+                # NOTIFY в той же транзакции доставляется только после COMMIT
+                events = pop_pending_events(db_session)
+                if events:
+                    await event_bus.publish(session=db_session, events=events)
                 logger.debug('Got successful result. Commit DB changes.: %s', result)
                 await db_session.commit()
                 return result
             except Exception as exc:
                 logger.warning('Exception caught. Roll DB changes back.: %s', exc)
+                pop_pending_events(db_session)
                 await db_session.rollback()
                 raise exc
-            finally:
-                await db_session.close()
         return wrapper
-    return decorator
\ No newline at end of file
+    return decorator
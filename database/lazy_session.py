@@ -0,0 +1,55 @@
+from typing import Any, Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class LazyAsyncSession:
+    """
+    Прокси над AsyncSession, который создаёт сессию только при первом
+    обращении к ней. Запросы, не работающие с БД (health, docs, отказ
+    в авторизации), не трогают пул соединений.
+
+    commit/rollback/close без созданной сессии ничего не делают,
+    close выполняется ровно один раз.
+    """
+
+    def __init__(self, session_factory: Callable[[], AsyncSession]) -> None:
+        self._session_factory = session_factory
+        self._session: AsyncSession | None = None
+        self._closed = False
+        self.connection_used = False
+
+    @property
+    def is_materialized(self) -> bool:
+        return self._session is not None
+
+    def _get_session(self) -> AsyncSession:
+        if self._session is None:
+            self._session = self._session_factory()
+        return self._session
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._get_session(), name)
+
+    def _track_connection(self) -> None:
+        if self._session is not None and self._session.in_transaction():
+            self.connection_used = True
+
+    async def commit(self) -> None:
+        if self._session is None:
+            return
+        self._track_connection()
+        await self._session.commit()
+
+    async def rollback(self) -> None:
+        if self._session is None:
+            return
+        self._track_connection()
+        await self._session.rollback()
+
+    async def close(self) -> None:
+        if self._session is None or self._closed:
+            return
+        self._track_connection()
+        self._closed = True
+        await self._session.close()
@@ -0,0 +1,174 @@
+"""
+Помесячные range-секции по created_at.
+
+Секция месяца M называется <table>_pYYYYMM и покрывает
+[M-01 00:00 UTC, (M+1)-01 00:00 UTC). Секции, созданные миграцией
+(например, <table>_legacy с нижней границей MINVALUE), учитываются
+по их фактическим границам из pg_catalog.
+"""
+import re
+from datetime import date, datetime, timezone
+from typing import NamedTuple
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+_BOUND_RE = re.compile(
+    r"FROM \((?P<lower>MINVALUE|'[^']*')\) TO \((?P<upper>MAXVALUE|'[^']*')\)"
+)
+
+
+class Partition(NamedTuple):
+    name: str
+    # None — MINVALUE / MAXVALUE
+    lower: date | None
+    upper: date | None
+    is_default: bool = False
+
+    def overlaps(self, start: date, end: date) -> bool:
+        if self.is_default:
+            return False
+        return (self.lower is None or self.lower < end) and (
+            self.upper is None or start < self.upper
+        )
+
+
+def month_start(value: date) -> date:
+    return value.replace(day=1)
+
+
+def add_months(value: date, months: int) -> date:
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y%m}"
+
+
+def _utc_today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+def _parse_bound(value: str) -> date | None:
+    if value in ("MINVALUE", "MAXVALUE"):
+        return None
+    return date.fromisoformat(value.strip("'")[:10])
+
+
+def _bound_literal(value: date) -> str:
+    # Для timestamp without time zone смещение игнорируется
+    return f"'{value.isoformat()} 00:00:00+00'"
+
+
+async def is_partitioned(conn: AsyncConnection, table: str) -> bool:
+    result = await conn.execute(
+        text("SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass(:table)"),
+        {"table": table},
+    )
+    return bool(result.scalar())
+
+
+async def list_partitions(conn: AsyncConnection, table: str) -> list[Partition]:
+    """Секции таблицы с границами, по возрастанию нижней границы."""
+    # Границы timestamptz выводятся в часовом поясе сессии
+    await conn.execute(text("SET LOCAL TimeZone = 'UTC'"))
+    result = await conn.execute(
+        text(
+            "SELECT child.relname, pg_get_expr(child.relpartbound, child.oid) "
+            "FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = to_regclass(:table)"
+        ),
+        {"table": table},
+    )
+
+    partitions = []
+    for name, bound in result.all():
+        match = _BOUND_RE.search(bound)
+        if match is None:
+            # DEFAULT-секция
+            partitions.append(
+                Partition(name=name, lower=None, upper=None, is_default=True)
+            )
+            continue
+        partitions.append(
+            Partition(
+                name=name,
+                lower=_parse_bound(match["lower"]),
+                upper=_parse_bound(match["upper"]),
+            )
+        )
+    return sorted(partitions, key=lambda partition: partition.lower or date.min)
+
+
+async def ensure_month_partitions(
+    conn: AsyncConnection,
+    table: str,
+    months: int,
+    start: date | None = None,
+) -> list[str]:
+    """
+    Создаёт недостающие секции на months месяцев, начиная с месяца start
+    (по умолчанию текущего). Месяцы, уже покрытые существующими секциями,
+    пропускаются. Для несекционированной таблицы ничего не делает.
+    Возвращает имена созданных секций.
+    """
+    if not await is_partitioned(conn, table=table):
+        return []
+
+    # Несколько процессов приложения могут вызывать это одновременно на старте
+    await conn.execute(select(func.pg_advisory_xact_lock(func.hashtext(table))))
+    existing = await list_partitions(conn, table=table)
+
+    first_month = month_start(start or _utc_today())
+    created = []
+    for offset in range(months):
+        lower = add_months(first_month, offset)
+        upper = add_months(lower, 1)
+        if any(partition.overlaps(lower, upper) for partition in existing):
+            continue
+
+        name = partition_name(table, lower)
+        await conn.execute(
+            text(
+                f'CREATE TABLE "{name}" PARTITION OF "{table}" '
+                f"FOR VALUES FROM ({_bound_literal(lower)}) TO ({_bound_literal(upper)})"
+            )
+        )
+        created.append(name)
+    return created
+
+
+async def detach_expired_partitions(
+    engine: AsyncEngine,
+    table: str,
+    keep_months: int,
+    drop: bool = False,
+    today: date | None = None,
+) -> list[str]:
+    """
+    Отсоединяет секции, целиком лежащие раньше, чем keep_months месяцев
+    до текущего, и при drop=True удаляет их.
+
+    DETACH ... CONCURRENTLY не блокирует запросы к родительской таблице,
+    но не работает внутри транзакции и при наличии DEFAULT-секции.
+    Прерванный DETACH завершается через DETACH PARTITION ... FINALIZE.
+    """
+    cutoff = add_months(month_start(today or _utc_today()), -keep_months)
+    async with engine.begin() as conn:
+        expired = [
+            partition.name
+            for partition in await list_partitions(conn, table=table)
+            if partition.upper is not None and partition.upper <= cutoff
+        ]
+
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        for name in expired:
+            await conn.execute(
+                text(f'ALTER TABLE "{table}" DETACH PARTITION "{name}" CONCURRENTLY')
+            )
+            if drop:
+                await conn.execute(text(f'DROP TABLE "{name}"'))
+    return expired
@@ -0,0 +1,234 @@
+"""
+Инвалидация in-process кэшей между воркерами через LISTEN/NOTIFY.
+
+Репозитории складывают события в session.info, managed_db_session
+отправляет их через pg_notify в той же транзакции прямо перед COMMIT:
+Postgres доставляет уведомления слушателям только после успешного
+коммита и отбрасывает их при откате. Каждый воркер держит одно
+выделенное asyncpg-соединение с LISTEN и раздаёт события подписчикам
+по типу сущности, включая собственные события воркера. NOTIFY из
+транзакций шардов todo_tasks доставляется только слушателям этого
+шарда, поэтому шина слушает и их (extra_database_urls).
+"""
+import asyncio
+from collections import defaultdict
+from logging import Logger
+from typing import Any, Callable, Iterable, Sequence
+from uuid import UUID
+
+import asyncpg
+from pydantic import ValidationError
+from sqlalchemy import func, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.cache import TTLCache
+from database.lazy_session import LazyAsyncSession
+from resources.constants import INVALIDATION_MAX_IDS, PENDING_EVENTS_SESSION_KEY
+from schemas.events.invalidation import EntityType, InvalidationEvent
+
+# Обработчики синхронные: кэши приложения синхронные и не ходят в сеть
+Handler = Callable[[InvalidationEvent], None]
+
+
+def record_event(session: AsyncSession, entity: EntityType, ids: Iterable[UUID]) -> None:
+    """Запомнить изменение до коммита транзакции session."""
+    session.info.setdefault(PENDING_EVENTS_SESSION_KEY, []).append(
+        InvalidationEvent(entity=entity, ids=list(ids))
+    )
+
+
+def pop_pending_events(session: AsyncSession | LazyAsyncSession) -> list[InvalidationEvent]:
+    # Несозданная ленивая сессия ничего не записывала
+    if isinstance(session, LazyAsyncSession) and not session.is_materialized:
+        return []
+    return session.info.pop(PENDING_EVENTS_SESSION_KEY, [])
+
+
+def merge_events(events: Iterable[InvalidationEvent]) -> list[InvalidationEvent]:
+    """
+    Одно событие на тип сущности. Событие без id или с числом id
+    больше INVALIDATION_MAX_IDS превращается в сброс всего типа.
+    """
+    ids_by_entity: dict[EntityType, set[UUID] | None] = {}
+    for event in events:
+        ids = ids_by_entity.setdefault(event.entity, set())
+        if ids is None:
+            continue
+        if not event.ids:
+            ids_by_entity[event.entity] = None
+            continue
+        ids.update(event.ids)
+
+    merged = []
+    for entity, ids in ids_by_entity.items():
+        if ids is not None and len(ids) > INVALIDATION_MAX_IDS:
+            ids = None
+        merged.append(InvalidationEvent(entity=entity, ids=sorted(ids or ())))
+    return merged
+
+
+def cache_invalidator(cache: TTLCache[UUID, Any]) -> Handler:
+    """Обработчик для кэша с ключами-id: удаляет id из события или очищает кэш."""
+
+    def handle(event: InvalidationEvent) -> None:
+        if not event.ids:
+            cache.clear()
+            return
+        for id in event.ids:
+            cache.invalidate(id)
+
+    return handle
+
+
+class EventBus:
+    def __init__(
+        self,
+        database_url: str,
+        channel: str,
+        enabled: bool,
+        keepalive_seconds: float,
+        reconnect_min_delay: float,
+        reconnect_max_delay: float,
+        logger: Logger,
+        extra_database_urls: Sequence[str] = (),
+    ) -> None:
+        # asyncpg принимает обычный postgresql:// DSN
+        self._dsns = list(
+            dict.fromkeys(
+                make_url(url).set(drivername="postgresql").render_as_string(hide_password=False)
+                for url in (database_url, *extra_database_urls)
+            )
+        )
+        self.channel = channel
+        self.enabled = enabled
+        self.keepalive_seconds = keepalive_seconds
+        self.reconnect_min_delay = reconnect_min_delay
+        self.reconnect_max_delay = reconnect_max_delay
+        self.logger = logger
+
+        self._handlers: defaultdict[EntityType, list[Handler]] = defaultdict(list)
+        self._tasks: list[asyncio.Task] = []
+        self._connected: set[str] = set()
+        self.received = 0
+        self.reconnects = 0
+        self.handler_errors = 0
+
+    def subscribe(self, entity: EntityType, handler: Handler) -> None:
+        self._handlers[entity].append(handler)
+
+    async def publish(
+        self,
+        session: AsyncSession | LazyAsyncSession,
+        events: Iterable[InvalidationEvent],
+    ) -> None:
+        """pg_notify в текущей транзакции session; доставка — после COMMIT."""
+        if not self.enabled:
+            return
+        for event in merge_events(events):
+            await session.execute(
+                select(func.pg_notify(self.channel, event.model_dump_json()))
+            )
+
+    @property
+    def connected(self) -> bool:
+        """LISTEN работает на всех базах."""
+        return len(self._connected) == len(self._dsns)
+
+    async def start(self) -> None:
+        if self.enabled and not self._tasks:
+            self._tasks = [asyncio.create_task(self._run(dsn)) for dsn in self._dsns]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def dispatch(self, event: InvalidationEvent) -> None:
+        for handler in self._handlers.get(event.entity, ()):
+            try:
+                handler(event)
+            except Exception:
+                self.handler_errors += 1
+                self.logger.exception("Invalidation handler failed for %s", event.entity)
+
+    def _on_notification(
+        self,
+        connection: asyncpg.Connection,
+        pid: int,
+        channel: str,
+        payload: str,
+    ) -> None:
+        self.received += 1
+        try:
+            event = InvalidationEvent.model_validate_json(payload)
+        except ValidationError:
+            self.logger.warning("Malformed invalidation event: %s", payload)
+            return
+        self.dispatch(event)
+
+    def _invalidate_everything(self) -> None:
+        for entity in list(self._handlers):
+            self.dispatch(InvalidationEvent(entity=entity))
+
+    async def _listen(self, dsn: str, connection: asyncpg.Connection, reconnected: bool) -> None:
+        lost = asyncio.Event()
+        connection.add_termination_listener(lambda _: lost.set())
+        await connection.add_listener(self.channel, self._on_notification)
+        self._connected.add(dsn)
+        if reconnected:
+            # Пока LISTEN не работал, уведомления терялись
+            self._invalidate_everything()
+
+        while not lost.is_set():
+            try:
+                await asyncio.wait_for(lost.wait(), timeout=self.keepalive_seconds)
+            except asyncio.TimeoutError:
+                # Обрыв TCP без FIN обнаруживается только запросом
+                await connection.execute("SELECT 1")
+
+    async def _run(self, dsn: str) -> None:
+        delay = self.reconnect_min_delay
+        first_connect = True
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(
+                    dsn,
+                    # Видно в pg_stat_activity
+                    server_settings={"application_name": f"event_bus:{self.channel}"},
+                )
+                reconnected = not first_connect
+                first_connect = False
+                if reconnected:
+                    self.reconnects += 1
+                delay = self.reconnect_min_delay
+                await self._listen(dsn, connection, reconnected=reconnected)
+                self.logger.warning("LISTEN connection lost, reconnecting")
+                await asyncio.sleep(delay)
+            except (
+                OSError,
+                asyncio.TimeoutError,
+                asyncpg.InterfaceError,
+                asyncpg.PostgresError,
+            ) as exc:
+                self.logger.warning(
+                    "LISTEN connection failed: %s; retry in %.1fs", exc, delay
+                )
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.reconnect_max_delay)
+            finally:
+                self._connected.discard(dsn)
+                if connection is not None and not connection.is_closed():
+                    connection.terminate()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "connected": self.connected,
+            "databases": len(self._dsns),
+            "received": self.received,
+            "reconnects": self.reconnects,
+            "handler_errors": self.handler_errors,
+        }
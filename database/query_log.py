@@ -0,0 +1,315 @@
+"""
+Журнал медленных запросов.
+
+QueryMonitor подписывается на события движка и замеряет каждый запрос,
+помечая его маршрутом (managed_db_session) и методом репозитория
+(tag_repository_methods). Запросы дольше порога пишутся в лог с типами
+параметров вместо значений; для SELECT в фоне, на отдельном соединении
+из пула, снимается EXPLAIN (ANALYZE, BUFFERS). В лог попадает только
+сводка плана по узлам: условия фильтров в плане содержат значения
+параметров.
+"""
+import asyncio
+import inspect
+import json
+import time
+from contextvars import ContextVar
+from functools import partial, wraps
+from logging import Logger
+from typing import Any, Callable, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, ExceptionContext, ExecutionContext
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from core.cache import TTLCache
+from database.explain import iter_plan_nodes
+from resources.constants import (
+    QUERY_CANCELED_SQLSTATE,
+    QUERY_LOG_SKIP_OPTION,
+    QUERY_STARTED_KEY,
+    REPOSITORY_METHOD_OPTION,
+)
+
+current_route: ContextVar[str | None] = ContextVar("current_route", default=None)
+current_repository_method: ContextVar[str | None] = ContextVar(
+    "current_repository_method", default=None
+)
+
+# Тег для запросов вне маршрута или репозитория
+UNTAGGED = "-"
+# ANALYZE выполняет запрос повторно, поэтому только чтение
+EXPLAINABLE_PREFIXES = ("SELECT", "WITH")
+
+T = TypeVar("T", bound=type)
+
+
+def _tagged(func: Callable[..., Any]) -> Callable[..., Any]:
+    @wraps(func)
+    async def wrapper(self, *args: Any, **kwargs: Any) -> Any:
+        # Внешний вызов важнее: list -> list_page остаётся list
+        if current_repository_method.get() is not None:
+            return await func(self, *args, **kwargs)
+        token = current_repository_method.set(f"{type(self).__name__}.{func.__name__}")
+        try:
+            return await func(self, *args, **kwargs)
+        finally:
+            current_repository_method.reset(token)
+
+    return wrapper
+
+
+def tag_repository_methods(cls: T) -> T:
+    """
+    Публичные корутины класса помечают свои запросы именем метода.
+    Асинхронные генераторы не оборачиваются: contextvar, выставленный
+    внутри генератора, не переживает yield, — они передают тег через
+    execution option REPOSITORY_METHOD_OPTION.
+    """
+    for name, attr in list(vars(cls).items()):
+        if not name.startswith("_") and inspect.iscoroutinefunction(attr):
+            setattr(cls, name, _tagged(attr))
+    return cls
+
+
+def redact_parameters(parameters: Any, executemany: bool) -> Any:
+    """Типы вместо значений: в параметрах бывают пароли и персональные данные."""
+    if executemany:
+        rows = list(parameters or ())
+        first = redact_parameters(rows[0], executemany=False) if rows else []
+        return f"{len(rows)} x {first}"
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    return [type(value).__name__ for value in parameters or ()]
+
+
+def summarize_plan(plan: Any) -> str:
+    """Узлы плана без условий: тип, отношение или индекс, строки, буферы."""
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    root = plan[0]
+    nodes = []
+    for node in iter_plan_nodes(root["Plan"]):
+        target = node.get("Index Name") or node.get("Relation Name")
+        nodes.append(
+            f"{node['Node Type']}{f' on {target}' if target else ''}"
+            f" rows={node.get('Actual Rows')} loops={node.get('Actual Loops')}"
+            f" hit={node.get('Shared Hit Blocks', 0)} read={node.get('Shared Read Blocks', 0)}"
+        )
+    return (
+        f"planning={root.get('Planning Time')}ms execution={root.get('Execution Time')}ms; "
+        + "; ".join(nodes)
+    )
+
+
+class QueryMonitor:
+    def __init__(
+        self,
+        logger: Logger,
+        slow_query_ms: float,
+        explain: bool = True,
+        explain_interval_seconds: float = 300.0,
+        explain_concurrency: int = 1,
+        explain_timeout_ms: int = 30_000,
+    ) -> None:
+        self.logger = logger
+        self.slow_query_ms = slow_query_ms
+        self.explain = explain
+        self.explain_timeout_ms = explain_timeout_ms
+        self.explain_concurrency = explain_concurrency
+        # Один EXPLAIN на текст запроса за explain_interval_seconds
+        self._explained: TTLCache[str, bool] = TTLCache(
+            maxsize=1000, ttl_seconds=explain_interval_seconds
+        )
+        self._explain_tasks: set[asyncio.Task] = set()
+
+        # (маршрут, метод репозитория) -> [запросов, суммарно мс, максимум мс, медленных]
+        self._by_tag: dict[tuple[str, str], list[float]] = {}
+        self.slow = 0
+        self.timeouts = 0
+        self.explained = 0
+        self.explain_skipped = 0
+        self.explain_errors = 0
+
+    def instrument(self, engine: AsyncEngine) -> None:
+        sync_engine = engine.sync_engine
+        event.listen(sync_engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(
+            sync_engine,
+            "after_cursor_execute",
+            partial(self._after_cursor_execute, engine),
+        )
+        event.listen(sync_engine, "handle_error", self._handle_error)
+
+    @staticmethod
+    def _tags(context: ExecutionContext | None) -> tuple[str, str]:
+        method = None
+        if context is not None:
+            method = context.execution_options.get(REPOSITORY_METHOD_OPTION)
+        return (
+            current_route.get() or UNTAGGED,
+            method or current_repository_method.get() or UNTAGGED,
+        )
+
+    def _before_cursor_execute(
+        self,
+        conn: Connection,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: ExecutionContext,
+        executemany: bool,
+    ) -> None:
+        conn.info.setdefault(QUERY_STARTED_KEY, []).append(time.perf_counter())
+
+    def _after_cursor_execute(
+        self,
+        engine: AsyncEngine,
+        conn: Connection,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: ExecutionContext,
+        executemany: bool,
+    ) -> None:
+        started = conn.info[QUERY_STARTED_KEY].pop()
+        if context.execution_options.get(QUERY_LOG_SKIP_OPTION):
+            return
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        tags = self._tags(context)
+        slow = elapsed_ms >= self.slow_query_ms
+        self._record(tags=tags, elapsed_ms=elapsed_ms, slow=slow)
+        if not slow:
+            return
+
+        self.slow += 1
+        self.logger.warning(
+            "Slow query %.1f ms route=%s repository=%s params=%s\n%s",
+            elapsed_ms,
+            tags[0],
+            tags[1],
+            redact_parameters(parameters, executemany=executemany),
+            statement,
+        )
+        if not executemany:
+            self._schedule_explain(
+                engine=engine, statement=statement, parameters=parameters, tags=tags
+            )
+
+    def _handle_error(self, exception_context: ExceptionContext) -> None:
+        conn = exception_context.connection
+        if conn is not None and conn.info.get(QUERY_STARTED_KEY):
+            conn.info[QUERY_STARTED_KEY].pop()
+
+        sqlstate = getattr(exception_context.original_exception, "sqlstate", None)
+        if sqlstate == QUERY_CANCELED_SQLSTATE:
+            self.timeouts += 1
+            route, method = self._tags(exception_context.execution_context)
+            self.logger.warning(
+                "Query canceled (statement_timeout) route=%s repository=%s\n%s",
+                route,
+                method,
+                exception_context.statement,
+            )
+
+    def _record(self, tags: tuple[str, str], elapsed_ms: float, slow: bool) -> None:
+        stats = self._by_tag.setdefault(tags, [0, 0.0, 0.0, 0])
+        stats[0] += 1
+        stats[1] += elapsed_ms
+        stats[2] = max(stats[2], elapsed_ms)
+        stats[3] += slow
+
+    def _schedule_explain(
+        self,
+        engine: AsyncEngine,
+        statement: str,
+        parameters: Any,
+        tags: tuple[str, str],
+    ) -> None:
+        if not self.explain or not statement.lstrip().upper().startswith(EXPLAINABLE_PREFIXES):
+            return
+        if self._explained.get(statement) is not None:
+            return
+        if len(self._explain_tasks) >= self.explain_concurrency:
+            self.explain_skipped += 1
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Синхронный движок вне event loop (скрипты)
+            return
+
+        self._explained.set(statement, True)
+        task = loop.create_task(
+            self._explain(
+                engine=engine,
+                statement=statement,
+                parameters=parameters if isinstance(parameters, dict) else tuple(parameters or ()),
+                tags=tags,
+            )
+        )
+        self._explain_tasks.add(task)
+        task.add_done_callback(self._explain_tasks.discard)
+
+    async def _explain(
+        self,
+        engine: AsyncEngine,
+        statement: str,
+        parameters: Any,
+        tags: tuple[str, str],
+    ) -> None:
+        try:
+            async with engine.connect() as conn:
+                # READ ONLY страхует от data-modifying CTE в WITH
+                conn = await conn.execution_options(
+                    postgresql_readonly=True, **{QUERY_LOG_SKIP_OPTION: True}
+                )
+                await conn.exec_driver_sql(
+                    f"SET LOCAL statement_timeout = {int(self.explain_timeout_ms)}"
+                )
+                result = await conn.exec_driver_sql(
+                    f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {statement}", parameters
+                )
+                plan = result.scalar_one()
+                await conn.rollback()
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            self.explain_errors += 1
+            self.logger.warning("EXPLAIN of slow query failed: %s", exc)
+            return
+
+        self.explained += 1
+        self.logger.warning(
+            "Slow query plan route=%s repository=%s: %s",
+            tags[0],
+            tags[1],
+            summarize_plan(plan),
+        )
+
+    async def close(self) -> None:
+        for task in list(self._explain_tasks):
+            task.cancel()
+        await asyncio.gather(*self._explain_tasks, return_exceptions=True)
+
+    def stats(self) -> dict[str, Any]:
+        by_tag = [
+            {
+                "route": route,
+                "repository": method,
+                "queries": int(count),
+                "avg_ms": round(total / count, 3) if count else 0.0,
+                "max_ms": round(max_ms, 3),
+                "slow": int(slow),
+            }
+            for (route, method), (count, total, max_ms, slow) in sorted(self._by_tag.items())
+        ]
+        return {
+            "slow_query_ms": self.slow_query_ms,
+            "slow": self.slow,
+            "timeouts": self.timeouts,
+            "explained": self.explained,
+            "explain_skipped": self.explain_skipped,
+            "explain_errors": self.explain_errors,
+            "by_tag": by_tag,
+        }
@@ -0,0 +1,269 @@
+"""
+Шардирование todo_tasks по responsible_id.
+
+Шард пользователя — владелец его id на кольце консистентного хеширования
+(TODO_SHARD_RING, по умолчанию все TODO_SHARDS) либо запись
+в todo_task_shard_overrides на primary, если задачи перенесены
+move_user_tasks. Шард пользователя кэшируется в TTLCache, который
+сбрасывается событием EntityType.TODO_SHARD через EventBus.
+
+Перенос пользователя без остановки приложения:
+1. на шарде-источнике пишется метка в todo_task_shard_freezes: триггеры
+   отклоняют запись задач пользователя (503, клиент повторяет запрос),
+   и ожидается завершение транзакций, начатых до метки;
+2. строки копируются на целевой шард, чтение всё это время идёт
+   из источника, где данные уже не меняются;
+3. в primary записывается переопределение и рассылается событие,
+   воркеры переключаются на новый шард;
+4. строки на источнике удаляются. Метка остаётся: воркер с устаревшим
+   кэшем не сможет записать задачи на старый шард.
+"""
+import asyncio
+import bisect
+import hashlib
+from typing import Sequence
+from uuid import UUID
+
+from sqlalchemy import cast, delete, distinct, func, insert, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.types import Text
+
+from core.cache import TTLCache
+from database.database import Database
+from database.pubsub import EventBus
+from models.todo_task import ToDoTask
+from models.todo_task_shard import todo_task_shard_freezes, todo_task_shard_overrides
+from resources.constants import (
+    BULK_INSERT_BATCH_SIZE,
+    SHARD_MOVE_SETTING,
+    SHARD_MOVE_WAIT_INTERVAL_SECONDS,
+)
+from schemas.events.invalidation import EntityType, InvalidationEvent
+
+
+def _hash(value: bytes) -> int:
+    # В отличие от hash(), одинаков во всех процессах и версиях Python
+    return int.from_bytes(hashlib.blake2b(value, digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """
+    Кольцо консистентного хеширования: vnodes точек на шард. При
+    добавлении шарда к нему переходит около 1/N пользователей, остальные
+    остаются на месте.
+    """
+
+    def __init__(self, nodes: Sequence[str], vnodes: int) -> None:
+        if not nodes:
+            raise ValueError("Hash ring needs at least one shard")
+        points = sorted(
+            (_hash(f"{node}#{index}".encode()), node)
+            for node in set(nodes)
+            for index in range(vnodes)
+        )
+        self._points = [point for point, _ in points]
+        self._nodes = [node for _, node in points]
+        self.nodes = tuple(sorted(set(nodes)))
+
+    def owner(self, key: UUID) -> str:
+        index = bisect.bisect(self._points, _hash(key.bytes))
+        return self._nodes[index % len(self._nodes)]
+
+
+class ShardRouter:
+    def __init__(
+        self,
+        db: Database,
+        ring_nodes: Sequence[str] | None,
+        vnodes: int,
+        overrides: TTLCache[UUID, str],
+    ) -> None:
+        self.db = db
+        self.overrides = overrides
+        # Без TODO_SHARDS задачи лежат в primary, как до шардирования
+        self.enabled = bool(db.shard_names)
+        self.ring: HashRing | None = None
+        if self.enabled:
+            nodes = list(ring_nodes) if ring_nodes is not None else db.shard_names
+            unknown = sorted(set(nodes) - set(db.shard_names))
+            if unknown:
+                raise ValueError(f"Shards in TODO_SHARD_RING are not in TODO_SHARDS: {unknown}")
+            self.ring = HashRing(nodes=nodes, vnodes=vnodes)
+
+    async def load_override(self, user_id: UUID) -> str | None:
+        """Переопределение из primary, минуя кэш."""
+        async with self.db.session_factory() as session:
+            return await session.scalar(
+                select(todo_task_shard_overrides.c.shard).where(
+                    todo_task_shard_overrides.c.responsible_id == user_id
+                )
+            )
+
+    async def shard_for(self, user_id: UUID) -> str:
+        shard = self.overrides.get(user_id)
+        if shard is None:
+            shard = await self.load_override(user_id) or self.ring.owner(user_id)
+            self.overrides.set(user_id, shard)
+        return shard
+
+    def session_factory(self, shard: str) -> async_sessionmaker[AsyncSession]:
+        return self.db.shard_session_factory(shard)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "ring": list(self.ring.nodes) if self.ring is not None else [],
+            "overrides_cache": self.overrides.stats(),
+        }
+
+
+async def allow_shard_move(conn: AsyncConnection) -> None:
+    """Снять запрет записи по меткам до конца транзакции conn."""
+    await conn.execute(select(func.set_config(SHARD_MOVE_SETTING, "on", True)))
+
+
+async def _wait_for_older_transactions(engine: AsyncEngine, timeout: float) -> None:
+    """
+    Дождаться конца транзакций, получивших xid до этого вызова. Транзакции
+    с более поздним xid проверяют метку в триггере уже после её коммита
+    (VOLATILE-функция видит свежий снимок) и получают отказ.
+    """
+    async with engine.connect() as conn:
+        horizon = await conn.scalar(
+            select(cast(func.pg_snapshot_xmax(func.pg_current_snapshot()), Text))
+        )
+        deadline = asyncio.get_running_loop().time() + timeout
+        while True:
+            done = await conn.scalar(
+                text("SELECT pg_snapshot_xmin(pg_current_snapshot()) >= CAST(:horizon AS xid8)"),
+                {"horizon": horizon},
+            )
+            await conn.rollback()
+            if done:
+                return
+            if asyncio.get_running_loop().time() >= deadline:
+                raise TimeoutError("Transactions started before the freeze are still running")
+            await asyncio.sleep(SHARD_MOVE_WAIT_INTERVAL_SECONDS)
+
+
+async def list_shard_users(engine: AsyncEngine) -> list[UUID]:
+    """Пользователи, чьи задачи есть на шарде."""
+    table = ToDoTask.__table__
+    async with engine.connect() as conn:
+        result = await conn.execute(
+            select(distinct(table.c.responsible_id)).where(table.c.responsible_id.is_not(None))
+        )
+        return list(result.scalars().all())
+
+
+async def move_user_tasks(
+    router: ShardRouter,
+    event_bus: EventBus,
+    user_id: UUID,
+    target: str,
+    freeze_timeout: float = 30.0,
+    batch_size: int = BULK_INSERT_BATCH_SIZE,
+) -> int:
+    """
+    Перенести задачи пользователя на шард target, см. описание модуля.
+    Возвращает число перенесённых задач. При ошибке до переключения
+    метка снимается; уже скопированные строки на целевом шарде удаляет
+    следующий перенос пользователя туда.
+    """
+    source = await router.load_override(user_id) or router.ring.owner(user_id)
+    if source == target:
+        return 0
+    engines = router.db.shard_engines
+    source_engine, target_engine = engines[source], engines[target]
+    table = ToDoTask.__table__
+    # search_vector вычисляется заново на целевом шарде
+    columns = [column for column in table.c if column.computed is None]
+    user_rows = table.c.responsible_id == user_id
+
+    async with source_engine.begin() as conn:
+        await conn.execute(
+            pg_insert(todo_task_shard_freezes)
+            .values(responsible_id=user_id, target_shard=target)
+            .on_conflict_do_update(
+                index_elements=[todo_task_shard_freezes.c.responsible_id],
+                set_={"target_shard": target, "frozen_at": func.now()},
+            )
+        )
+
+    try:
+        await _wait_for_older_transactions(engine=source_engine, timeout=freeze_timeout)
+
+        async with target_engine.begin() as target_conn, source_engine.connect() as source_conn:
+            await allow_shard_move(target_conn)
+            # Метка и остатки прошлого переноса этого пользователя на target
+            await target_conn.execute(
+                delete(todo_task_shard_freezes).where(
+                    todo_task_shard_freezes.c.responsible_id == user_id
+                )
+            )
+            await target_conn.execute(delete(table).where(user_rows))
+
+            moved = 0
+            result = await source_conn.stream(
+                select(*columns).where(user_rows),
+                execution_options={"yield_per": batch_size},
+            )
+            async for rows in result.partitions(batch_size):
+                await target_conn.execute(insert(table), [dict(row._mapping) for row in rows])
+                moved += len(rows)
+
+        async with router.db.session_factory() as session:
+            overrides = todo_task_shard_overrides
+            if target == router.ring.owner(user_id):
+                await session.execute(delete(overrides).where(overrides.c.responsible_id == user_id))
+            else:
+                await session.execute(
+                    pg_insert(overrides)
+                    .values(responsible_id=user_id, shard=target)
+                    .on_conflict_do_update(
+                        index_elements=[overrides.c.responsible_id],
+                        set_={"shard": target, "updated_at": func.now()},
+                    )
+                )
+            # Доставляется после COMMIT: воркеры сбрасывают кэш шарда пользователя
+            await event_bus.publish(
+                session=session,
+                events=[InvalidationEvent(entity=EntityType.TODO_SHARD, ids=[user_id])],
+            )
+            await session.commit()
+    except BaseException:
+        async with source_engine.begin() as conn:
+            await conn.execute(
+                delete(todo_task_shard_freezes).where(
+                    todo_task_shard_freezes.c.responsible_id == user_id
+                )
+            )
+        raise
+    router.overrides.invalidate(user_id)
+
+    async with source_engine.begin() as conn:
+        await allow_shard_move(conn)
+        await conn.execute(delete(table).where(user_rows))
+    return moved
+
+
+async def prune_overrides(router: ShardRouter, event_bus: EventBus) -> list[UUID]:
+    """
+    Удалить переопределения, совпадающие с текущим кольцом: после
+    выкладки нового TODO_SHARD_RING они больше не нужны.
+    """
+    overrides = todo_task_shard_overrides
+    async with router.db.session_factory() as session:
+        rows = (await session.execute(select(overrides.c.responsible_id, overrides.c.shard))).all()
+        redundant = [
+            user_id for user_id, shard in rows if shard == router.ring.owner(user_id)
+        ]
+        if redundant:
+            await session.execute(delete(overrides).where(overrides.c.responsible_id.in_(redundant)))
+            await event_bus.publish(
+                session=session,
+                events=[InvalidationEvent(entity=EntityType.TODO_SHARD, ids=redundant)],
+            )
+            await session.commit()
+    return redundant
@@ -1,9 +1,19 @@
 from exceptions.custom_exceptions.base_app_exception import BaseAppException
+from exceptions.custom_exceptions.invalid_cursor import InvalidCursorException
 from exceptions.custom_exceptions.invalid_token import InvalidTokenException
+from exceptions.custom_exceptions.not_found import NotFoundException
+from exceptions.custom_exceptions.payload_too_large import PayloadTooLargeException
+from exceptions.custom_exceptions.precondition_failed import PreconditionFailedException
+from exceptions.custom_exceptions.service_unavailable import ServiceUnavailableException
 from exceptions.custom_exceptions.unauthorized import UnauthorizedException
 
 __all__ = (
     "BaseAppException",
+    "InvalidCursorException",
     "InvalidTokenException",
+    "NotFoundException",
+    "PayloadTooLargeException",
+    "PreconditionFailedException",
+    "ServiceUnavailableException",
     "UnauthorizedException",
 )
@@ -0,0 +1,11 @@
+from .base_app_exception import BaseAppException
+from fastapi import status
+
+
+class InvalidCursorException(BaseAppException):
+    def __init__(self, message: str = "Invalid pagination cursor"):
+        super().__init__(
+            message=message,
+            status_code=status.HTTP_400_BAD_REQUEST,
+            error_code="INVALID_CURSOR",
+        )
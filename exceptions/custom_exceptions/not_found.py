@@ -0,0 +1,11 @@
+from .base_app_exception import BaseAppException
+from fastapi import status
+
+
+class NotFoundException(BaseAppException):
+    def __init__(self, message: str = "Resource not found"):
+        super().__init__(
+            message=message,
+            status_code=status.HTTP_404_NOT_FOUND,
+            error_code="NOT_FOUND",
+        )
@@ -0,0 +1,12 @@
+from .base_app_exception import BaseAppException
+from fastapi import status
+
+
+class NotModifiedException(BaseAppException):
+    def __init__(self, etag: str, message: str = "Resource was not modified"):
+        super().__init__(
+            message=message,
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            error_code="NOT_MODIFIED",
+        )
+        self.etag = etag
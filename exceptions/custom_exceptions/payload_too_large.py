@@ -0,0 +1,11 @@
+from .base_app_exception import BaseAppException
+from fastapi import status
+
+
+class PayloadTooLargeException(BaseAppException):
+    def __init__(self, message: str = "Too many items in request"):
+        super().__init__(
+            message=message,
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            error_code="PAYLOAD_TOO_LARGE",
+        )
@@ -0,0 +1,11 @@
+from .base_app_exception import BaseAppException
+from fastapi import status
+
+
+class PreconditionFailedException(BaseAppException):
+    def __init__(self, message: str = "Resource was modified by another request"):
+        super().__init__(
+            message=message,
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            error_code="PRECONDITION_FAILED",
+        )
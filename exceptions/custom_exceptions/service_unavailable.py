@@ -0,0 +1,11 @@
+from .base_app_exception import BaseAppException
+from fastapi import status
+
+
+class ServiceUnavailableException(BaseAppException):
+    def __init__(self, message: str = "Service temporarily unavailable"):
+        super().__init__(
+            message=message,
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            error_code="SERVICE_UNAVAILABLE",
+        )
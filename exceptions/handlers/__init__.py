@@ -5,14 +5,18 @@
 
 from exceptions.handlers.base_handler import BaseExceptionHandler
 from exceptions.handlers.app_handler import AppExceptionHandler
+from exceptions.handlers.dbapi_handler import DBAPIErrorHandler
 from exceptions.handlers.http_handler import HTTPExceptionHandler
 from exceptions.handlers.integrity_handler import IntegrityErrorHandler
 from exceptions.handlers.no_result_handler import NoResultFoundErrorHandler
+from exceptions.handlers.not_modified_handler import NotModifiedHandler
 
 __all__ = [
     "AppExceptionHandler",
     "BaseExceptionHandler",
+    "DBAPIErrorHandler",
     "HTTPExceptionHandler",
     "IntegrityErrorHandler",
     "NoResultFoundErrorHandler",
+    "NotModifiedHandler",
 ]
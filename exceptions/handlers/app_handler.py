@@ -7,7 +7,12 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from exceptions.custom_exceptions.base_app_exception import BaseAppException
 from exceptions.custom_exceptions import (
+    InvalidCursorException,
     InvalidTokenException,
+    NotFoundException,
+    PayloadTooLargeException,
+    PreconditionFailedException,
+    ServiceUnavailableException,
     UnauthorizedException,
 )
 from exceptions.registry import exception_registry
@@ -15,7 +20,12 @@ from exceptions.handlers.base_handler import BaseExceptionHandler
 
 
 @exception_registry.register(
+    InvalidCursorException,
     InvalidTokenException,
+    NotFoundException,
+    PayloadTooLargeException,
+    PreconditionFailedException,
+    ServiceUnavailableException,
     UnauthorizedException,
 )
 class AppExceptionHandler(BaseExceptionHandler):
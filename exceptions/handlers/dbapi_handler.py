@@ -0,0 +1,39 @@
+from fastapi import status
+from sqlalchemy.exc import DBAPIError, OperationalError
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+from exceptions.registry import exception_registry
+from exceptions.handlers.base_handler import BaseExceptionHandler
+from resources.constants import QUERY_CANCELED_SQLSTATE, SHARD_MOVING_SQLSTATE
+
+# SQLSTATE -> (HTTP-статус, код ошибки, сообщение)
+SQLSTATE_ERRORS = {
+    # statement_timeout: бюджет маршрута исчерпан
+    QUERY_CANCELED_SQLSTATE: (
+        status.HTTP_503_SERVICE_UNAVAILABLE,
+        "STATEMENT_TIMEOUT",
+        "Query exceeded its time budget",
+    ),
+    # Задачи пользователя переносятся на другой шард (database/sharding.py),
+    # запрос можно повторить
+    SHARD_MOVING_SQLSTATE: (
+        status.HTTP_503_SERVICE_UNAVAILABLE,
+        "SHARD_MOVING",
+        "Tasks are being moved, retry the request",
+    ),
+}
+
+
+# Реестр сопоставляет точный тип исключения: ошибки asyncpg приходят
+# как DBAPIError, других драйверов — и как OperationalError
+@exception_registry.register(DBAPIError, OperationalError)
+class DBAPIErrorHandler(BaseExceptionHandler):
+    """Ошибки драйвера с известным SQLSTATE; остальные не трогаем."""
+
+    def handle(self, request: Request, exc: DBAPIError, expose_internal_errors: bool) -> JSONResponse:
+        error = SQLSTATE_ERRORS.get(getattr(exc.orig, "sqlstate", None))
+        if error is None:
+            raise exc
+        status_code, code, message = error
+        return self.build_error_response(status_code=status_code, code=code, message=message)
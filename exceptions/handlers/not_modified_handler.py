@@ -0,0 +1,22 @@
+from fastapi import status
+from starlette.requests import Request
+from starlette.responses import Response
+
+from exceptions.custom_exceptions import NotModifiedException
+from exceptions.registry import exception_registry
+from exceptions.handlers.base_handler import BaseExceptionHandler
+from resources.constants import ETAG_HEADER
+
+
+@exception_registry.register(NotModifiedException)
+class NotModifiedHandler(BaseExceptionHandler):
+    """
+    If-None-Match совпал с текущей версией: 304 без тела, с ETag.
+    Исключение бросается из зависимости, до обработчика маршрута.
+    """
+
+    def handle(self, request: Request, exc: NotModifiedException, expose_internal_errors: bool) -> Response:
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={ETAG_HEADER: exc.etag},
+        )
@@ -1,13 +1,21 @@
-from fastapi import FastAPI
+import time
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 
 import uvicorn
 from api.v1 import todo_tasks, auth
 from core.settings import settings
 from core.containers import Container
+from core.warmup import hot_statements, prime_schemas, warm_up_database
+from database.partitions import ensure_month_partitions
+from database.pubsub import cache_invalidator
+from models.todo_task import ToDoTask
+from schemas.events.invalidation import EntityType
 from middleware.auth_middleware import AuthMiddleware
 from middleware.db_session_middleware import DBSessionMiddleware
 from middleware.error_middleware import ErrorHandlingMiddleware
+from middleware.in_flight_middleware import InFlightMiddleware
 
 container = Container()
 logger = container.logger()
@@ -16,7 +24,67 @@ logger = container.logger()
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("My fancy app is starting...")
+    started = time.perf_counter()
+    lifecycle = app.container.lifecycle()
+    db = app.container.db()
+    # Ошибки в TODO_SHARDS / TODO_SHARD_RING — при старте, а не на первом запросе
+    app.container.shard_router()
+    # Секции нужны везде, где лежат задачи: в primary и на каждом шарде
+    for name, engine in {"primary": db.engine, **db.shard_engines}.items():
+        async with engine.begin() as conn:
+            # Текущий месяц и TODO_TASKS_PARTITIONS_AHEAD следующих
+            created = await ensure_month_partitions(
+                conn=conn,
+                table=ToDoTask.__tablename__,
+                months=settings.TODO_TASKS_PARTITIONS_AHEAD + 1,
+            )
+        if created:
+            logger.info("Created todo_tasks partitions on %s: %s", name, created)
+
+    event_bus = app.container.event_bus()
+    event_bus.subscribe(
+        entity=EntityType.USER,
+        handler=cache_invalidator(cache=app.container.user_status_cache()),
+    )
+    event_bus.subscribe(
+        entity=EntityType.TODO_TASK,
+        handler=cache_invalidator(cache=app.container.todo_task_version_cache()),
+    )
+    # Счётчики X-Total-Count лежат в count_cache под id владельца задач
+    event_bus.subscribe(
+        entity=EntityType.TODO_TASK_OWNER,
+        handler=cache_invalidator(cache=app.container.count_cache()),
+    )
+    event_bus.subscribe(
+        entity=EntityType.TODO_SHARD,
+        handler=cache_invalidator(cache=app.container.shard_cache()),
+    )
+    await event_bus.start()
+
+    prime_schemas(app=app)
+    await warm_up_database(
+        db=db,
+        connections=settings.DB_WARMUP_CONNECTIONS,
+        statements=hot_statements(
+            users_repository=app.container.users_repository(),
+            todo_tasks_repository=app.container.todo_tasks_repository(),
+        )
+        if settings.DB_WARMUP_STATEMENTS
+        else (),
+    )
+    lifecycle.mark_ready(warmup_seconds=time.perf_counter() - started)
+    logger.info("Warm-up done in %.3f s", lifecycle.warmup_seconds)
     yield
+
+    # Запросы к этому моменту завершены или брошены по
+    # --timeout-graceful-shutdown: uvicorn ждёт их до остановки lifespan
+    lifecycle.mark_stopping()
+    if lifecycle.in_flight:
+        logger.warning("%s requests still in flight, shutting down anyway", lifecycle.in_flight)
+    await event_bus.stop()
+    await app.container.query_monitor().close()
+    app.container.password_executor().shutdown()
+    await db.dispose()
     logger.info("My fancy app is done...")
 
 
@@ -28,6 +96,7 @@ def create_app(lifespan=lifespan) -> FastAPI:
     app.add_middleware(AuthMiddleware)
     app.add_middleware(DBSessionMiddleware)
     app.add_middleware(ErrorHandlingMiddleware, expose_internal_errors=settings.DEBUG)
+    app.add_middleware(InFlightMiddleware)
 
     app.include_router(
         router=auth.router,
@@ -51,5 +120,32 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/ready")
+async def readiness_check(request: Request):
+    """503, пока идёт прогрев и после начала остановки."""
+    lifecycle = request.app.container.lifecycle()
+    if not lifecycle.ready:
+        return JSONResponse(status_code=503, content={"status": lifecycle.status})
+    return {"status": lifecycle.status}
+
+
+@app.get("/metrics")
+async def metrics(request: Request):
+    container: Container = request.app.container
+    return {
+        "db_pool": container.db().pool_stats(),
+        "user_status_cache": container.user_status_cache().stats(),
+        "password_executor": container.password_executor().stats(),
+        "token_cache": container.token_cache().stats(),
+        "count_cache": container.count_cache().stats(),
+        "todo_task_version_cache": container.todo_task_version_cache().stats(),
+        "statement_cache": container.statement_cache().stats(),
+        "event_bus": container.event_bus().stats(),
+        "queries": container.query_monitor().stats(),
+        "shard_router": container.shard_router().stats(),
+        "lifecycle": container.lifecycle().stats(),
+    }
+
+
 if __name__ == "__main__":
     uvicorn.run("main:app", reload=True)
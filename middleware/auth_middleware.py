@@ -1,59 +1,79 @@
 from typing import Callable
 from uuid import UUID
-from fastapi import Depends, Request, HTTPException, status
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import Depends, Request
+from starlette.types import ASGIApp, Receive, Scope, Send
 from dependency_injector.wiring import inject, Provide
 from core.containers import Container
 from exceptions.custom_exceptions.unauthorized import UnauthorizedException
+from middleware.path_matcher import PathMatcher
 from services.auth import AuthService
 
 
-class AuthMiddleware(BaseHTTPMiddleware):
+class AuthMiddleware:
     """Middleware для проверки токенов"""
 
     # Публичные эндпоинты, которые не требуют авторизации
-    PUBLIC_PATHS = [
-        "/docs",
-        "/redoc",
-        "/openapi.json",
-        "/api/v1/auth/login",
-        "/api/v1/auth/token",
-        "/api/v1/auth/register",
-        "/api/v1/auth/",
-    ]
-
-    @inject
-    async def dispatch(
-        self,
-        request: Request,
-        call_next,
-        auth_service: Callable[..., AuthService] = Depends(
-            Provide[Container.auth_service.provider]
+    PUBLIC_PATHS = PathMatcher(
+        exact=(
+            # Пробы оркестратора
+            "/health",
+            "/ready",
+            "/docs",
+            "/redoc",
+            "/openapi.json",
+            "/api/v1/auth/login",
+            "/api/v1/auth/token",
+            "/api/v1/auth/register",
+            "/api/v1/auth/",
         ),
-    ):
+        prefixes=(
+            # /docs/oauth2-redirect для Swagger UI
+            "/docs/",
+        ),
+    )
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self.PUBLIC_PATHS.match(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        token = self._extract_token(authorization=request.headers.get("Authorization"))
+
+        # Валидация токена и добавление данных пользователя в state запроса
+        request.state.user_id = await self._get_user_id(
+            token=token,
+            request=request,
+        )
 
-        if request.url.path in self.PUBLIC_PATHS:
-            return await call_next(request)
+        await self.app(scope, receive, send)
 
-        authorization: str = request.headers.get("Authorization")
+    @staticmethod
+    def _extract_token(authorization: str | None) -> str:
         if not authorization:
             raise UnauthorizedException('Not authenticated')
 
         try:
             scheme, token = authorization.split()
-            if scheme.lower() != "bearer":
-                raise UnauthorizedException('Invalid authentication scheme')
-
         except ValueError:
             raise UnauthorizedException('Invalid authorization header')
 
-        # Валидация токена
-        user_id: UUID = await auth_service(
+        if scheme.lower() != "bearer":
+            raise UnauthorizedException('Invalid authentication scheme')
+        return token
+
+    @inject
+    async def _get_user_id(
+        self,
+        token: str,
+        request: Request,
+        auth_service: Callable[..., AuthService] = Depends(
+            Provide[Container.auth_service.provider]
+        ),
+    ) -> UUID:
+        return await auth_service(
             session=request.state.db_session
         ).get_current_user_id(token=token)
-
-        # Добавляем данные пользователя в state запроса
-        request.state.user_id = user_id
-
-        response = await call_next(request)
-        return response
@@ -1,23 +1,124 @@
+import time
+from logging import Logger
+from uuid import UUID
+
 from fastapi import Depends, Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from core.cache import TTLCache
 from core.containers import Container
 from database.database import Database
+from database.lazy_session import LazyAsyncSession
+from database.query_log import current_route
 from dependency_injector.wiring import inject, Provide
+from resources.constants import LAST_WRITE_COOKIE, READ_ONLY_HTTP_METHODS
+
+
+class DBSessionMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    @staticmethod
+    def _wrote_recently(request: Request, window_seconds: float) -> bool:
+        """Cookie LAST_WRITE_COOKIE моложе window_seconds."""
+        try:
+            written_at = float(request.cookies.get(LAST_WRITE_COOKIE, ""))
+        except ValueError:
+            return False
+        return 0 <= time.time() - written_at < window_seconds
+
+    @classmethod
+    def _select_session_factory(
+        cls,
+        request: Request,
+        db: Database,
+        recent_writers: TTLCache[UUID, bool],
+    ) -> async_sessionmaker[AsyncSession]:
+        """
+        Читающие запросы уходят в реплику, кроме запросов пользователей,
+        которые недавно писали (read-your-writes), и запросов, для которых
+        пользователь ещё не известен (например, проверка статуса в auth).
+
+        Недавнюю запись помнит воркер, который её выполнил (recent_writers),
+        а для остальных воркеров — cookie LAST_WRITE_COOKIE у клиента.
+        Клиент без cookie видит свои записи только на том же воркере.
+        """
+        if not db.has_replicas or request.method not in READ_ONLY_HTTP_METHODS:
+            return db.session_factory
 
+        user_id: UUID | None = getattr(request.state, "user_id", None)
+        if (
+            user_id is None
+            or recent_writers.get(user_id)
+            or cls._wrote_recently(request=request, window_seconds=recent_writers.ttl_seconds)
+        ):
+            return db.session_factory
+        return db.read_session_factory()
+
+    @staticmethod
+    def _is_write(request: Request, db_session: LazyAsyncSession) -> bool:
+        user_id: UUID | None = getattr(request.state, "user_id", None)
+        return (
+            db_session.connection_used
+            and user_id is not None
+            and request.method not in READ_ONLY_HTTP_METHODS
+        )
 
-class DBSessionMiddleware(BaseHTTPMiddleware):
     @inject
-    async def dispatch(
+    async def __call__(
         self,
-        request: Request,
-        call_next,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
         db: Database = Depends(Provide[Container.db]),
-    ):
-        # Создаем сессию
-        request.state.db_session = db.session_factory()
+        recent_writers: TTLCache[UUID, bool] = Depends(Provide[Container.recent_writers]),
+        logger: Logger = Depends(Provide[Container.logger]),
+    ) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Сессия создаётся при первом обращении; единственный владелец close — middleware
+        request = Request(scope)
+        db_session = LazyAsyncSession(
+            session_factory=lambda: self._select_session_factory(
+                request=request, db=db, recent_writers=recent_writers
+            )(),
+        )
+        request.state.db_session = db_session
+
+        async def send_wrapper(message: Message) -> None:
+            # Ответ начинается после коммита, если обработчик не потоковый
+            if message["type"] == "http.response.start" and self._is_write(
+                request=request, db_session=db_session
+            ):
+                max_age = max(1, int(recent_writers.ttl_seconds))
+                MutableHeaders(scope=message).append(
+                    "set-cookie",
+                    f"{LAST_WRITE_COOKIE}={time.time():.3f}; path=/; "
+                    f"Max-Age={max_age}; httponly; samesite=lax",
+                )
+            await send(message)
+
+        # managed_db_session помечает запросы маршрутом до конца ответа
+        route_token = current_route.set(None)
         try:
-            response = await call_next(request)
-            return response
+            await self.app(scope, receive, send_wrapper)
         finally:
-            if request.state.db_session:
-                await request.state.db_session.close()
+            await db_session.close()
+            # Сессия шарда задач, см. core.dependencies.get_todo_db_session
+            todo_db_session = getattr(request.state, "todo_db_session", None)
+            if todo_db_session is not None:
+                await todo_db_session.close()
+            current_route.reset(route_token)
+
+            if self._is_write(request=request, db_session=db_session):
+                recent_writers.set(request.state.user_id, True)
+
+            logger.debug(
+                "%s %s: db_connection_used=%s",
+                scope["method"],
+                scope["path"],
+                db_session.connection_used,
+            )
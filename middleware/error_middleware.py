@@ -1,25 +1,40 @@
 # exceptions/middleware.py
-from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
-from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from exceptions.registry import exception_registry
 
 import exceptions.handlers  # noqa: F401 — триггерим декораторы
 
 
-class ErrorHandlingMiddleware(BaseHTTPMiddleware):
+class ErrorHandlingMiddleware:
 
-    def __init__(self, app, *, expose_internal_errors: bool = False):
-        super().__init__(app)
+    def __init__(self, app: ASGIApp, *, expose_internal_errors: bool = False):
+        self.app = app
         self.expose_internal_errors = expose_internal_errors
 
-    async def dispatch(self, request: Request, call_next) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
         try:
-            return await call_next(request)
+            await self.app(scope, receive, send_wrapper)
         except Exception as exc:
-            return exception_registry.handle(
-                request=request,
+            # Заголовки уже отправлены — корректный ответ об ошибке невозможен
+            if response_started:
+                raise
+            response = exception_registry.handle(
+                request=Request(scope),
                 exc=exc,
                 expose_internal_errors=self.expose_internal_errors,
             )
+            await response(scope, receive, send)
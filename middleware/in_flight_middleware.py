@@ -0,0 +1,30 @@
+from fastapi import Depends
+from starlette.types import ASGIApp, Receive, Scope, Send
+from dependency_injector.wiring import inject, Provide
+from core.containers import Container
+from core.lifecycle import Lifecycle
+
+
+class InFlightMiddleware:
+    """Учёт HTTP-запросов в обработке для /metrics, см. Lifecycle."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    @inject
+    async def __call__(
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+        lifecycle: Lifecycle = Depends(Provide[Container.lifecycle]),
+    ) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        lifecycle.request_started()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            lifecycle.request_finished()
@@ -0,0 +1,21 @@
+from typing import Iterable
+
+
+class PathMatcher:
+    """
+    Предкомпилированный матчер путей: точные совпадения через frozenset,
+    префиксы — одним вызовом str.startswith с кортежем.
+    """
+
+    def __init__(
+        self,
+        exact: Iterable[str] = (),
+        prefixes: Iterable[str] = (),
+    ) -> None:
+        self._exact = frozenset(exact)
+        self._prefixes = tuple(prefixes)
+
+    def match(self, path: str) -> bool:
+        if path in self._exact:
+            return True
+        return bool(self._prefixes) and path.startswith(self._prefixes)
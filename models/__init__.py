@@ -1,9 +1,14 @@
 from .base import Base
 from .todo_task import ToDoTask
+from .todo_task_daily_stats import todo_task_daily_stats
+from .todo_task_shard import todo_task_shard_freezes, todo_task_shard_overrides
 from .user import User
 
 __all__ = (
     "Base",
     "ToDoTask",
+    "todo_task_daily_stats",
+    "todo_task_shard_freezes",
+    "todo_task_shard_overrides",
     "User",
 )
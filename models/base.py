@@ -4,6 +4,10 @@ from uuid import UUID, uuid4
 from datetime import datetime, timezone
 
 
+def utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
 class Base(DeclarativeBase):
     __abstract__ = True
     id: Mapped[UUID] = mapped_column(
@@ -12,10 +16,10 @@ class Base(DeclarativeBase):
     )
     created_at: Mapped[datetime] = mapped_column(
         type_=TIMESTAMP(timezone=True),
-        default=datetime.now(timezone.utc),
+        default=utc_now,
     )
     updated_at: Mapped[datetime] = mapped_column(
         type_=TIMESTAMP(timezone=True),
-        default=datetime.now(timezone.utc),
-        onupdate=datetime.now(timezone.utc),
+        default=utc_now,
+        onupdate=utc_now,
     )
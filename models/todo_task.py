@@ -1,7 +1,10 @@
+from datetime import datetime
 from uuid import UUID
-from models.base import Base
+from models.base import Base, utc_now
+from resources.constants import SEARCH_TS_CONFIG
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import ForeignKey, String
+from sqlalchemy import TIMESTAMP, Computed, Index, String
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -10,15 +13,55 @@ if TYPE_CHECKING:
 
 class ToDoTask(Base):
     __tablename__ = "todo_tasks"
+    __table_args__ = (
+        Index(
+            "ix_todo_tasks_responsible_id_created_at_id",
+            "responsible_id",
+            "created_at",
+            "id",
+        ),
+        # Поиск всегда ограничен responsible_id, поэтому он входит в GIN (btree_gin)
+        Index(
+            "ix_todo_tasks_responsible_id_search_vector",
+            "responsible_id",
+            "search_vector",
+            postgresql_using="gin",
+        ),
+        Index(
+            "ix_todo_tasks_responsible_id_title_trgm",
+            "responsible_id",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ),
+        # Помесячные секции, см. database/partitions.py
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+    # Первичный ключ секционированной таблицы обязан включать ключ секционирования
+    created_at: Mapped[datetime] = mapped_column(
+        type_=TIMESTAMP(timezone=True),
+        primary_key=True,
+        default=utc_now,
+    )
     title: Mapped[str] = mapped_column(String(500), comment="Заголовок задачи")
     description: Mapped[str] = mapped_column(String(5000), comment="Описание задачи")
-
-    responsible_id: Mapped[UUID] = mapped_column(
-        ForeignKey(column="users.id", ondelete="SET NULL")
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(
+            f"setweight(to_tsvector('{SEARCH_TS_CONFIG}', coalesce(title, '')), 'A') || "
+            f"setweight(to_tsvector('{SEARCH_TS_CONFIG}', coalesce(description, '')), 'B')",
+            persisted=True,
+        ),
+        deferred=True,
+        comment="Поисковый вектор по заголовку и описанию",
     )
+
+    # Без внешнего ключа: задачи могут лежать на шарде без таблицы
+    # пользователей, см. database/sharding.py
+    responsible_id: Mapped[UUID] = mapped_column()
     responsible: Mapped["User"] = relationship(
         argument="User",
-        foreign_keys=[responsible_id],
+        primaryjoin="foreign(ToDoTask.responsible_id) == User.id",
         back_populates="tasks",
         lazy="select"
     )
@@ -0,0 +1,16 @@
+from sqlalchemy import BigInteger, Column, Date, Table, Uuid
+
+from models.base import Base
+
+# Число созданных задач пользователя по дням (UTC). Таблицу ведут
+# statement-триггеры todo_tasks (см. миграцию e2b6c8d4f197), приложение
+# только читает её, поэтому это Table без id/created_at/updated_at из Base.
+# Строки секций, отключённых по сроку хранения, в rollup остаются.
+todo_task_daily_stats = Table(
+    "todo_task_daily_stats",
+    Base.metadata,
+    Column("responsible_id", Uuid, primary_key=True),
+    Column("day", Date, primary_key=True),
+    Column("created_count", BigInteger, nullable=False, server_default="0"),
+    comment="Созданные задачи пользователя по дням, ведётся триггерами",
+)
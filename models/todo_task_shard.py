@@ -0,0 +1,31 @@
+from sqlalchemy import TIMESTAMP, Column, ForeignKey, String, Table, Uuid, func
+
+from models.base import Base
+
+# Пользователи, чьи задачи лежат не на шарде из кольца консистентного
+# хеширования (перенесены scripts/rebalance_shards.py). Только в primary.
+todo_task_shard_overrides = Table(
+    "todo_task_shard_overrides",
+    Base.metadata,
+    Column(
+        "responsible_id",
+        Uuid,
+        ForeignKey(column="users.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    Column("shard", String(100), nullable=False),
+    Column("updated_at", TIMESTAMP(timezone=True), nullable=False, server_default=func.now()),
+    comment="Шард задач пользователя, отличный от кольца хеширования",
+)
+
+# Пользователи, чьи задачи переносятся или уже перенесены с этого шарда:
+# триггеры todo_tasks отклоняют запись по ним (SQLSTATE SHARD_MOVING_SQLSTATE).
+# Есть на каждом шарде; после переноса строка остаётся как метка.
+todo_task_shard_freezes = Table(
+    "todo_task_shard_freezes",
+    Base.metadata,
+    Column("responsible_id", Uuid, primary_key=True),
+    Column("target_shard", String(100), nullable=False),
+    Column("frozen_at", TIMESTAMP(timezone=True), nullable=False, server_default=func.now()),
+    comment="Задачи пользователя переносятся на другой шард, запись запрещена",
+)
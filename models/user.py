@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, String
+from sqlalchemy import Boolean, Index, String
 from models.base import Base
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from typing import TYPE_CHECKING
@@ -9,6 +9,9 @@ if TYPE_CHECKING:
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_username_disabled", "username", "disabled"),
+    )
     username: Mapped[str] = mapped_column(String(200))
     email: Mapped[str] = mapped_column(String(500), unique=True)
     full_name: Mapped[str | None] = mapped_column(String(500), nullable=True)
@@ -17,6 +20,7 @@ class User(Base):
 
     tasks: Mapped[list["ToDoTask"] | None] = relationship(
         argument="ToDoTask",
+        primaryjoin="User.id == foreign(ToDoTask.responsible_id)",
         back_populates="responsible",
         cascade="all, delete-orphan",
     )
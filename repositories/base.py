@@ -1,22 +1,96 @@
 from datetime import datetime
-from typing import Generic, Optional, TypeVar
-from uuid import UUID
+from typing import Any, AsyncIterator, Callable, Generic, Iterable, List, Mapping, Optional, Sequence, TypeVar
+from uuid import UUID, uuid4
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import Select, delete, update, insert
+from sqlalchemy import ColumnElement, Integer, Row, Select, bindparam, delete, func, literal, tuple_, update, insert
 from sqlalchemy.future import select
 from sqlalchemy import asc, desc
+from core.cache import TTLCache
+from database.explain import Explain
+from database.pubsub import record_event
+from database.query_log import tag_repository_methods
 from models import Base
+from models.base import utc_now
+from resources.constants import (
+    BULK_INSERT_BATCH_SIZE,
+    REPOSITORY_METHOD_OPTION,
+    STREAM_YIELD_PER,
+    TOTAL_COUNT_LABEL,
+)
+from schemas.events.invalidation import EntityType
 
 ModelType = TypeVar("ModelType", bound=Base)
 
 
+@tag_repository_methods
 class BaseRepository(Generic[ModelType]):
+    # Тип сущности для событий инвалидации кэшей; None — события не пишутся
+    entity_type: EntityType | None = None
+    # Колонка владельца записей: по ней ключуется count_cache;
+    # None — количество не кэшируется
+    owner_column: str | None = None
+    # Тип сущности для событий с id владельцев изменённых записей
+    owner_entity_type: EntityType | None = None
+    # Колонки, по которым допустима keyset-пагинация: их значения попадают
+    # в курсор, поэтому длинные тексты и отложенные колонки сюда не входят
+    keyset_columns: frozenset[str] = frozenset({"created_at", "updated_at", "id"})
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        # Запросы помечаются методом репозитория в журнале медленных запросов
+        tag_repository_methods(cls)
+
     def __init__(
         self,
         model: type[ModelType],
+        count_cache: TTLCache | None = None,
+        statement_cache: TTLCache | None = None,
     ):
         self.model = model
+        self.count_cache = count_cache
+        # Общий для всех репозиториев кэш форм запросов, см. _statement
+        self.statement_cache = statement_cache
+
+    def _record_changes(
+        self,
+        session: AsyncSession,
+        ids: Iterable[UUID],
+        owner_ids: Iterable[UUID] = (),
+    ) -> None:
+        """Изменённые id публикуются после коммита, см. database/pubsub.py."""
+        ids = list(ids)
+        owner_ids = list(dict.fromkeys(owner_ids))
+        # Пустой список в событии означает «сбросить всё», поэтому не пишем его
+        if self.entity_type is not None and ids:
+            record_event(session, entity=self.entity_type, ids=ids)
+        if self.owner_entity_type is not None and owner_ids:
+            record_event(session, entity=self.owner_entity_type, ids=owner_ids)
+
+    def _record_instances(self, session: AsyncSession, instances: Iterable[ModelType]) -> None:
+        instances = list(instances)
+        self._record_changes(
+            session,
+            ids=(instance.id for instance in instances),
+            owner_ids=(
+                ()
+                if self.owner_column is None
+                else (getattr(instance, self.owner_column) for instance in instances)
+            ),
+        )
+
+    def _returning_keys(self) -> tuple[ColumnElement, ...]:
+        """id и, если задан owner_column, владелец — для RETURNING в DELETE."""
+        if self.owner_column is None:
+            return (self.model.id,)
+        return self.model.id, getattr(self.model, self.owner_column)
+
+    def _record_deleted(self, session: AsyncSession, rows: Sequence[Row]) -> None:
+        self._record_changes(
+            session,
+            ids=(row[0] for row in rows),
+            owner_ids=(row[1] for row in rows if len(row) > 1),
+        )
 
     def _apply_pagination(
         self,
@@ -46,6 +120,41 @@ class BaseRepository(Generic[ModelType]):
         order_func = asc if sort_order == "asc" else desc
         return query.order_by(order_func(column))
 
+    def keyset_sort_column(self, sort_by: str | None) -> str:
+        """Колонка для keyset-сортировки; прочие поля заменяются на created_at."""
+        if sort_by in self.keyset_columns:
+            return sort_by
+        return "created_at"
+
+    def keyset_value_types(self, sort_by: str) -> tuple[type, type]:
+        """Python-типы значений курсора: колонка сортировки и id."""
+        columns = self.model.__table__.columns
+        return columns[sort_by].type.python_type, columns["id"].type.python_type
+
+    def _apply_keyset(
+        self,
+        query: Select,
+        sort_by: str,
+        sort_order: str = "asc",
+        after: Sequence[Any] | None = None,
+    ) -> Select:
+        """
+        Keyset-пагинация: стабильная сортировка по (sort_by, id)
+        и условие "строго после" последней строки предыдущей страницы.
+        """
+        column = getattr(self.model, sort_by)
+        key = tuple_(column, self.model.id)
+
+        if sort_order == "desc":
+            query = query.order_by(desc(column), desc(self.model.id))
+            if after is not None:
+                query = query.where(key < tuple_(*after))
+        else:
+            query = query.order_by(asc(column), asc(self.model.id))
+            if after is not None:
+                query = query.where(key > tuple_(*after))
+        return query
+
     def _apply_range_filters(
         self,
         query: Select,
@@ -60,46 +169,632 @@ class BaseRepository(Generic[ModelType]):
             query = query.where(self.model.created_at <= date_to)
         return query
 
+    def _statement(self, key: tuple, build: Callable[[], Select]) -> Select:
+        """
+        Форма запроса из кэша по сигнатуре key или build() при промахе.
+        Форма содержит bindparam вместо значений, поэтому один и тот же
+        объект переиспользуется между вызовами: SQLAlchemy не строит
+        select заново и не пересчитывает ключ кэша компиляции.
+        """
+        if self.statement_cache is None:
+            return build()
+
+        key = (self.model, *key)
+        statement = self.statement_cache.get(key)
+        if statement is None:
+            statement = build()
+            self.statement_cache.set(key, statement)
+        return statement
+
+    @staticmethod
+    def _filters_signature(filters: Mapping[str, Any]) -> tuple:
+        # None даёт другую форму запроса: IS NULL вместо сравнения
+        return tuple(sorted((name, value is None) for name, value in filters.items()))
+
+    @staticmethod
+    def _filters_params(filters: Mapping[str, Any]) -> dict[str, Any]:
+        return {
+            f"filter_{name}": value for name, value in filters.items() if value is not None
+        }
+
+    @staticmethod
+    def _filters_placeholders(filters: Mapping[str, Any]) -> dict[str, Any]:
+        return {
+            name: None if value is None else bindparam(f"filter_{name}")
+            for name, value in filters.items()
+        }
+
+    @staticmethod
+    def _range_placeholders(
+        date_from: datetime | None,
+        date_to: datetime | None,
+    ) -> dict[str, Any]:
+        return {
+            "date_from": None if date_from is None else bindparam("date_from"),
+            "date_to": None if date_to is None else bindparam("date_to"),
+        }
+
+    @staticmethod
+    def _present_params(**values: Any) -> dict[str, Any]:
+        return {name: value for name, value in values.items() if value is not None}
+
+    def _get_by_id_statement(self, id: UUID) -> tuple[Select, dict[str, Any]]:
+        statement = self._statement(
+            key=("get_by_id",),
+            build=lambda: select(self.model).where(self.model.id == bindparam("id")),
+        )
+        return statement, {"id": id}
+
     async def get_by_id(self, session: AsyncSession, id: UUID) -> Optional[ModelType]:
-        result = await session.execute(select(self.model).where(self.model.id == id))
+        statement, params = self._get_by_id_statement(id=id)
+        result = await session.execute(statement, params)
         return result.scalar_one()
 
+    def _select(self, columns: Sequence[str] | None = None) -> Select:
+        """SELECT всей модели или только перечисленных колонок."""
+        if columns is None:
+            return select(self.model)
+        return select(*(self.model.__table__.columns[name] for name in columns))
+
+    def _get_one_statement(
+        self, columns: Sequence[str] | None = None, **filters
+    ) -> tuple[Select, dict[str, Any]]:
+        statement = self._statement(
+            key=(
+                "get_one",
+                None if columns is None else tuple(columns),
+                self._filters_signature(filters),
+            ),
+            build=lambda: self._select(columns=columns).filter_by(
+                **self._filters_placeholders(filters)
+            ),
+        )
+        return statement, self._filters_params(filters)
+
+    def build_get_one_statement(
+        self, columns: Sequence[str] | None = None, **filters
+    ) -> Select:
+        statement, params = self._get_one_statement(columns=columns, **filters)
+        return statement.params(**params)
+
     async def get_one(self, session: AsyncSession, **filters) -> Optional[ModelType]:
-        result = await session.execute(select(self.model).filter_by(**filters))
+        statement, params = self._get_one_statement(**filters)
+        result = await session.execute(statement, params)
         return result.scalar_one()
 
-    async def list(
+    async def get_one_row(
+        self, session: AsyncSession, columns: Sequence[str], **filters
+    ) -> Row:
+        """Одна строка Core только с колонками columns, без загрузки ORM-объекта."""
+        statement, params = self._get_one_statement(columns=columns, **filters)
+        result = await session.execute(statement, params)
+        return result.one()
+
+    def _list_statement(
         self,
-        session: AsyncSession,
         offset: int | None = None,
         limit: int | None = None,
         sort_by: str | None = None,
         sort_order: str = "asc",
         date_from: datetime | None = None,
         date_to: datetime | None = None,
+        keyset: bool = False,
+        after: Sequence[Any] | None = None,
+        columns: Sequence[str] | None = None,
+        with_total_count: bool = False,
+        **filters,
+    ) -> tuple[Select, dict[str, Any]]:
+        """Форма запроса списка и значения её параметров."""
+        sort_order = getattr(sort_order, "value", sort_order)
+        if keyset:
+            sort_by = self.keyset_sort_column(sort_by)
+            # offset в режиме keyset не применяется
+            offset = None
+        else:
+            after = None
+            # ColumnCollection.__contains__ не принимает None (ArgumentError)
+            if sort_by is None or sort_by not in self.model.__table__.columns:
+                sort_by = None
+
+        params = self._filters_params(filters)
+        params.update(
+            self._present_params(
+                offset=offset, limit=limit, date_from=date_from, date_to=date_to
+            )
+        )
+        if after is not None:
+            params.update({f"after_{index}": value for index, value in enumerate(after)})
+
+        def build() -> Select:
+            stmt = self._select(columns=columns).filter_by(
+                **self._filters_placeholders(filters)
+            )
+            limit_param = None if limit is None else bindparam("limit", type_=Integer)
+            if keyset:
+                key_columns = (getattr(self.model, sort_by), self.model.id)
+                after_params = None
+                if after is not None:
+                    after_params = [
+                        bindparam(f"after_{index}", type_=column.type)
+                        for index, column in enumerate(key_columns)
+                    ]
+                stmt = self._apply_keyset(
+                    stmt, sort_by=sort_by, sort_order=sort_order, after=after_params
+                )
+                stmt = self._apply_pagination(stmt, limit=limit_param)
+            else:
+                stmt = self._apply_sorting(stmt, sort_by=sort_by, sort_order=sort_order)
+                stmt = self._apply_pagination(
+                    stmt,
+                    offset=None if offset is None else bindparam("offset", type_=Integer),
+                    limit=limit_param,
+                )
+            stmt = self._apply_range_filters(
+                stmt, **self._range_placeholders(date_from=date_from, date_to=date_to)
+            )
+            if with_total_count:
+                stmt = stmt.add_columns(func.count().over().label(TOTAL_COUNT_LABEL))
+            return stmt
+
+        statement = self._statement(
+            key=(
+                "list",
+                self._filters_signature(filters),
+                None if columns is None else tuple(columns),
+                keyset,
+                sort_by,
+                sort_order,
+                offset is not None,
+                limit is not None,
+                date_from is not None,
+                date_to is not None,
+                after is not None,
+                with_total_count,
+            ),
+            build=build,
+        )
+        return statement, params
+
+    def build_list_statement(
+        self,
+        offset: int | None = None,
+        limit: int | None = None,
+        sort_by: str | None = None,
+        sort_order: str = "asc",
+        date_from: datetime | None = None,
+        date_to: datetime | None = None,
+        keyset: bool = False,
+        after: Sequence[Any] | None = None,
+        columns: Sequence[str] | None = None,
+        **filters,
+    ) -> Select:
+        """
+        keyset=True включает курсорную пагинацию: offset игнорируется,
+        after — значения (sort_by, id) последней строки предыдущей страницы.
+        columns — выбрать только эти колонки вместо всей модели.
+        """
+        statement, params = self._list_statement(
+            offset=offset,
+            limit=limit,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            date_from=date_from,
+            date_to=date_to,
+            keyset=keyset,
+            after=after,
+            columns=columns,
+            **filters,
+        )
+        return statement.params(**params)
+
+    def _count_statement(
+        self,
+        date_from: datetime | None = None,
+        date_to: datetime | None = None,
         **filters,
-    ) -> list[ModelType]:
+    ) -> tuple[Select, dict[str, Any]]:
+        def build() -> Select:
+            stmt = select(func.count()).select_from(self.model).filter_by(
+                **self._filters_placeholders(filters)
+            )
+            return self._apply_range_filters(
+                stmt, **self._range_placeholders(date_from=date_from, date_to=date_to)
+            )
+
+        statement = self._statement(
+            key=(
+                "count",
+                self._filters_signature(filters),
+                date_from is not None,
+                date_to is not None,
+            ),
+            build=build,
+        )
+        params = self._filters_params(filters)
+        params.update(self._present_params(date_from=date_from, date_to=date_to))
+        return statement, params
+
+    def build_count_statement(
+        self,
+        date_from: datetime | None = None,
+        date_to: datetime | None = None,
+        **filters,
+    ) -> Select:
+        statement, params = self._count_statement(
+            date_from=date_from, date_to=date_to, **filters
+        )
+        return statement.params(**params)
+
+    async def _count_exact(self, session: AsyncSession, **count_params) -> int:
+        statement, params = self._count_statement(**count_params)
+        result = await session.execute(statement, params)
+        return result.scalar_one()
 
-        stmt = select(self.model).filter_by(**filters)
-        stmt = self._apply_sorting(stmt, sort_by=sort_by, sort_order=sort_order)
-        stmt = self._apply_pagination(stmt, offset=offset, limit=limit)
+    async def _count_cached(self, session: AsyncSession, **count_params) -> int:
+        owner_id = None if self.owner_column is None else count_params.get(self.owner_column)
+        if self.count_cache is None or owner_id is None:
+            return await self._count_exact(session, **count_params)
+
+        # Счётчики владельца лежат под одним ключом: событие об изменении
+        # его записей сбрасывает их все разом. Подсчёт, начатый до сброса,
+        # пишет в уже вытесненный словарь и в кэш не попадает.
+        counts = self.count_cache.get(owner_id)
+        if counts is None:
+            counts = {}
+            self.count_cache.set(owner_id, counts)
+        key = tuple(sorted(count_params.items(), key=lambda item: item[0]))
+        total = counts.get(key)
+        if total is None:
+            total = await self._count_exact(session, **count_params)
+            counts[key] = total
+        return total
+
+    async def _count_estimated(
+        self,
+        session: AsyncSession,
+        date_from: datetime | None = None,
+        date_to: datetime | None = None,
+        **filters,
+    ) -> int:
+        """Оценка планировщика (Plan Rows из EXPLAIN) без выполнения запроса."""
+        stmt = select(self.model.id).filter_by(**filters)
         stmt = self._apply_range_filters(stmt, date_from=date_from, date_to=date_to)
+        result = await session.execute(Explain(stmt))
+        return int(result.scalar_one()[0]["Plan"]["Plan Rows"])
+
+    async def list_page(
+        self,
+        session: AsyncSession,
+        offset: int | None = None,
+        limit: int | None = None,
+        sort_by: str | None = None,
+        sort_order: str = "asc",
+        date_from: datetime | None = None,
+        date_to: datetime | None = None,
+        keyset: bool = False,
+        after: Sequence[Any] | None = None,
+        columns: Sequence[str] | None = None,
+        count_mode: str | None = None,
+        **filters,
+    ) -> tuple[list[Any], int | None]:
+        """
+        Страница записей и, по запросу, общее количество.
 
-        result = await session.execute(stmt)
-        return list(result.scalars().all())
+        count_mode:
+        - "exact" — count(*) over() в том же запросе; в режиме keyset
+          окно видело бы только записи после курсора, поэтому
+          выполняется отдельный count(*) без условия курсора;
+        - "cached" — отдельный count(*), закэшированный на короткое время;
+        - "estimated" — оценка планировщика, без выполнения подсчёта.
+
+        Без columns возвращаются ORM-объекты, с columns — строки Core.
+        """
+        with_total_count = count_mode == "exact" and not keyset
+        statement, params = self._list_statement(
+            offset=offset,
+            limit=limit,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            date_from=date_from,
+            date_to=date_to,
+            keyset=keyset,
+            after=after,
+            columns=columns,
+            with_total_count=with_total_count,
+            **filters,
+        )
+        count_params = {"date_from": date_from, "date_to": date_to, **filters}
+        result = await session.execute(statement, params)
+
+        if columns is None and with_total_count:
+            rows = result.all()
+            items: list[Any] = [row[0] for row in rows]
+        elif columns is None:
+            items = list(result.scalars().all())
+        else:
+            rows = items = list(result.all())
+
+        total: int | None = None
+        if count_mode == "exact" and keyset:
+            total = await self._count_exact(session, **count_params)
+        elif count_mode == "exact":
+            if rows:
+                total = getattr(rows[0], TOTAL_COUNT_LABEL)
+            elif offset:
+                # Страница за пределами выборки: окно не вернуло ни одной строки
+                total = await self._count_exact(session, **count_params)
+            else:
+                total = 0
+        elif count_mode == "cached":
+            total = await self._count_cached(session, **count_params)
+        elif count_mode == "estimated":
+            total = await self._count_estimated(session, **count_params)
+        return items, total
+
+    # Дальше в теле класса имя list — этот метод: в аннотациях typing.List
+    async def list(
+        self,
+        session: AsyncSession,
+        **list_params,
+    ) -> List[ModelType]:
+        items, _ = await self.list_page(session, **list_params)
+        return items
+
+    async def list_rows(
+        self,
+        session: AsyncSession,
+        columns: Sequence[str],
+        **list_params,
+    ) -> List[Row]:
+        """
+        То же, что list, но выбирает только columns и возвращает строки Core:
+        без гидрации ORM-объектов и identity map.
+        """
+        items, _ = await self.list_page(session, columns=columns, **list_params)
+        return items
+
+    async def stream(
+        self,
+        session: AsyncSession,
+        yield_per: int = STREAM_YIELD_PER,
+        columns: Sequence[str] | None = None,
+        **list_params,
+    ) -> AsyncIterator[Any]:
+        """
+        Записи по одной через server-side cursor: в памяти одновременно
+        не больше yield_per строк. Параметры выборки — как у list.
+        Без columns возвращаются ORM-объекты, с columns — строки Core.
+        """
+        statement, params = self._list_statement(columns=columns, **list_params)
+        result = await session.stream(
+            statement,
+            params,
+            execution_options={
+                "yield_per": yield_per,
+                REPOSITORY_METHOD_OPTION: f"{type(self).__name__}.stream",
+            },
+        )
+        try:
+            if columns is None:
+                async for instance in result.scalars():
+                    yield instance
+            else:
+                async for row in result:
+                    yield row
+        finally:
+            await result.close()
 
     async def create(self, session: AsyncSession, **instance_data) -> ModelType:
         result = await session.execute(
             insert(self.model).values(**instance_data).returning(self.model)
         )
-        return result.scalar_one()
+        instance = result.scalar_one()
+        self._record_instances(session, instances=(instance,))
+        return instance
+
+    async def create_many(
+        self,
+        session: AsyncSession,
+        items: Sequence[Mapping[str, Any]],
+        batch_size: int = BULK_INSERT_BATCH_SIZE,
+    ) -> List[ModelType]:
+        """
+        Массовая вставка: один многострочный INSERT ... RETURNING на пачку.
+        Порядок результата совпадает с порядком items.
+        """
+        # id назначается заранее, чтобы сопоставить строки RETURNING с входными данными
+        rows = [{"id": uuid4(), **item} for item in items]
+        created: dict[UUID, ModelType] = {}
+        for start in range(0, len(rows), batch_size):
+            result = await session.execute(
+                insert(self.model).returning(self.model),
+                rows[start:start + batch_size],
+            )
+            for instance in result.scalars().all():
+                created[instance.id] = instance
+        self._record_instances(session, instances=created.values())
+        return [created[row["id"]] for row in rows]
 
     async def update(
-        self, session: AsyncSession, id: int, **instance_data
-    ) -> ModelType:
+        self,
+        session: AsyncSession,
+        id: UUID,
+        filters: Mapping[str, Any] | None = None,
+        **instance_data,
+    ) -> Optional[ModelType]:
+        """
+        UPDATE ... RETURNING одним запросом.
+        filters — дополнительные условия (владелец, версия и т.п.);
+        если строка под них не попала, возвращается None.
+        """
+        result = await session.execute(
+            update(self.model)
+            .where(self.model.id == id)
+            .filter_by(**(filters or {}))
+            .values(**instance_data)
+            .returning(self.model)
+        )
+        instance = result.scalar_one_or_none()
+        if instance is not None:
+            self._record_instances(session, instances=(instance,))
+        return instance
+
+    async def insert_if_absent(
+        self,
+        session: AsyncSession,
+        values: Mapping[str, Any],
+        key_columns: Sequence[str] = ("id",),
+    ) -> Optional[ModelType]:
+        """
+        INSERT ... SELECT ... WHERE NOT EXISTS ... RETURNING.
+
+        Замена ON CONFLICT для секционированных таблиц: уникальный индекс
+        там обязан включать ключ секционирования, и конфликт по одному id
+        не ловится. Вставки с одинаковым ключом сериализуются
+        транзакционной advisory-блокировкой.
+        Возвращает None, если строка с такими key_columns уже есть.
+        """
+        key = {name: values[name] for name in key_columns}
         await session.execute(
-            update(self.model).where(self.model.id == id).values(**instance_data)
+            select(
+                func.pg_advisory_xact_lock(
+                    func.hashtextextended(
+                        f"{self.model.__tablename__}:{':'.join(map(str, key.values()))}", 0
+                    )
+                )
+            )
+        )
+
+        now = utc_now()
+        # from_select не вычисляет Python-умолчания колонок
+        values = {"created_at": now, "updated_at": now, **values}
+        table_columns = self.model.__table__.columns
+        row = select(
+            *(
+                literal(value, type_=table_columns[name].type).label(name)
+                for name, value in values.items()
+            )
+        ).where(~select(self.model.id).filter_by(**key).exists())
+
+        result = await session.execute(
+            insert(self.model).from_select(list(values), row).returning(self.model)
+        )
+        instance = result.scalar_one_or_none()
+        if instance is not None:
+            self._record_instances(session, instances=(instance,))
+        return instance
+
+    async def delete(self, session: AsyncSession, id: UUID) -> None:
+        result = await session.execute(
+            delete(self.model).where(self.model.id == id).returning(*self._returning_keys())
+        )
+        self._record_deleted(session, rows=result.all())
+
+    @staticmethod
+    def _check_criteria(
+        ids: Sequence[UUID] | None,
+        where: Sequence[ColumnElement[bool]],
+        filters: Mapping[str, Any],
+    ) -> None:
+        # Защита от UPDATE/DELETE всей таблицы по ошибке
+        if ids is None and not where and not filters:
+            raise ValueError("Bulk operation requires ids, where or filters")
+
+    async def _id_batches(
+        self,
+        session: AsyncSession,
+        ids: Sequence[UUID] | None,
+        where: Sequence[ColumnElement[bool]],
+        filters: Mapping[str, Any],
+        batch_size: int,
+    ) -> AsyncIterator[Sequence[UUID]]:
+        """
+        id для пакетных UPDATE/DELETE пачками не более batch_size.
+        Без ids подходящие строки выбираются keyset-ом по id: пачка
+        не зависит от того, перестала ли прошлая подходить под условия.
+        """
+        if ids is not None:
+            for start in range(0, len(ids), batch_size):
+                yield ids[start:start + batch_size]
+            return
+
+        stmt = (
+            select(self.model.id)
+            .where(*where)
+            .filter_by(**filters)
+            .order_by(self.model.id)
+            .limit(batch_size)
+        )
+        last_id: UUID | None = None
+        while True:
+            result = await session.execute(
+                stmt if last_id is None else stmt.where(self.model.id > last_id)
+            )
+            batch = list(result.scalars().all())
+            if batch:
+                yield batch
+            if len(batch) < batch_size:
+                return
+            last_id = batch[-1]
+
+    async def update_many(
+        self,
+        session: AsyncSession,
+        values: Mapping[str, Any],
+        ids: Sequence[UUID] | None = None,
+        where: Sequence[ColumnElement[bool]] = (),
+        batch_size: int = BULK_INSERT_BATCH_SIZE,
+        **filters,
+    ) -> List[ModelType]:
+        """
+        Set-based UPDATE ... RETURNING пачками не более batch_size строк,
+        по списку ids или по where/filters.
+        """
+        self._check_criteria(ids=ids, where=where, filters=filters)
+        # Условия повторяются в UPDATE: строка могла измениться после выборки id
+        base_stmt = (
+            update(self.model)
+            .where(*where)
+            .filter_by(**filters)
+            .values(**values)
+            .returning(self.model)
+        )
+
+        updated: list[ModelType] = []
+        async for batch_ids in self._id_batches(
+            session, ids=ids, where=where, filters=filters, batch_size=batch_size
+        ):
+            result = await session.execute(base_stmt.where(self.model.id.in_(batch_ids)))
+            updated.extend(result.scalars().all())
+        self._record_instances(session, instances=updated)
+        return updated
+
+    async def delete_many(
+        self,
+        session: AsyncSession,
+        ids: Sequence[UUID] | None = None,
+        where: Sequence[ColumnElement[bool]] = (),
+        batch_size: int = BULK_INSERT_BATCH_SIZE,
+        **filters,
+    ) -> List[UUID]:
+        """
+        Set-based DELETE ... RETURNING id пачками не более batch_size строк,
+        по списку ids или по where/filters.
+        Возвращает id удалённых записей.
+        """
+        self._check_criteria(ids=ids, where=where, filters=filters)
+        base_stmt = (
+            delete(self.model)
+            .where(*where)
+            .filter_by(**filters)
+            .returning(*self._returning_keys())
         )
 
-    async def delete(self, session: AsyncSession, id: int) -> None:
-        await session.execute(delete(self.model).where(self.model.id == id))
+        deleted: list[Row] = []
+        async for batch_ids in self._id_batches(
+            session, ids=ids, where=where, filters=filters, batch_size=batch_size
+        ):
+            result = await session.execute(base_stmt.where(self.model.id.in_(batch_ids)))
+            deleted.extend(result.all())
+        self._record_deleted(session, rows=deleted)
+        return [row[0] for row in deleted]
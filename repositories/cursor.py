@@ -0,0 +1,74 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Sequence
+from uuid import UUID
+
+from exceptions.custom_exceptions.invalid_cursor import InvalidCursorException
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, UUID):
+        return {"uuid": str(value)}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "uuid" in value:
+            return UUID(value["uuid"])
+    return value
+
+
+def encode_cursor(sort_by: str, sort_order: str, values: Sequence[Any]) -> str:
+    """Непрозрачный курсор: сортировка и значения (колонка сортировки, id) последней строки."""
+    payload = {
+        "s": sort_by,
+        "o": sort_order,
+        "v": [_encode_value(value) for value in values],
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> tuple[str, str, list[Any]]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        values = [_decode_value(value) for value in payload["v"]]
+        sort_by, sort_order = payload["s"], payload["o"]
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise InvalidCursorException()
+
+    if not isinstance(sort_by, str) or sort_order not in ("asc", "desc") or len(values) != 2:
+        raise InvalidCursorException()
+    return sort_by, sort_order, values
+
+
+def _coerce_value(value: Any, python_type: type) -> Any:
+    if python_type is datetime and isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    elif python_type is UUID and isinstance(value, str):
+        value = UUID(value)
+    if not isinstance(value, python_type) or isinstance(value, bool):
+        raise TypeError(f"Expected {python_type.__name__}, got {type(value).__name__}")
+    # Колонки времени — timestamptz; encode_cursor всегда пишет смещение
+    if isinstance(value, datetime) and value.tzinfo is None:
+        raise ValueError("Cursor datetime without time zone")
+    return value
+
+
+def coerce_cursor_values(values: Sequence[Any], types: Sequence[type]) -> list[Any]:
+    """
+    Значения курсора, приведённые к типам колонок (колонка сортировки, id).
+    Курсор приходит от клиента: без проверки неверный тип дошёл бы до БД.
+    """
+    try:
+        return [_coerce_value(value, python_type) for value, python_type in zip(values, types)]
+    except (ValueError, TypeError):
+        raise InvalidCursorException()
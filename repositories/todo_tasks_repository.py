@@ -1,9 +1,142 @@
+from datetime import date
+from uuid import UUID
+
+from sqlalchemy import TIMESTAMP, ColumnElement, Date, Row, Select, cast, func, literal_column, or_, select
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.cache import TTLCache
 from models.todo_task import ToDoTask
+from models.todo_task_daily_stats import todo_task_daily_stats
 from repositories.base import BaseRepository
+from resources.constants import SEARCH_RANK_LABEL, SEARCH_TS_CONFIG
+from schemas.events.invalidation import EntityType
+from schemas.todo_task.query_params import ToDoTaskStatsBucket
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
 
 
 class ToDoTaskRepository(BaseRepository[ToDoTask]):
+    entity_type = EntityType.TODO_TASK
+    owner_column = "responsible_id"
+    owner_entity_type = EntityType.TODO_TASK_OWNER
+    keyset_columns = frozenset({"created_at", "updated_at", "title", "id"})
+
     def __init__(
         self,
+        count_cache: TTLCache | None = None,
+        statement_cache: TTLCache | None = None,
     ):
-        super().__init__(model=ToDoTask)
+        super().__init__(
+            model=ToDoTask,
+            count_cache=count_cache,
+            statement_cache=statement_cache,
+        )
+
+    def _search_rank(self, query: str) -> tuple[ColumnElement, ColumnElement]:
+        """Условие поиска и ранг совпадения для строки query."""
+        ts_query = func.websearch_to_tsquery(
+            literal_column(f"'{SEARCH_TS_CONFIG}'", type_=REGCONFIG), query
+        )
+        condition = or_(
+            # Full-text по заголовку и описанию (GIN по search_vector)
+            self.model.search_vector.op("@@")(ts_query),
+            # Префикс и нечёткое совпадение заголовка (GIN gin_trgm_ops)
+            self.model.title.ilike(f"{_escape_like(query)}%", escape="\\"),
+            self.model.title.op("%")(query),
+        )
+        rank = func.greatest(
+            func.ts_rank_cd(self.model.search_vector, ts_query),
+            func.similarity(self.model.title, query),
+        ).label(SEARCH_RANK_LABEL)
+        return condition, rank
+
+    def build_search_statement(
+        self,
+        responsible_id: UUID,
+        query: str,
+        offset: int | None = None,
+        limit: int | None = None,
+    ) -> Select:
+        condition, rank = self._search_rank(query=query)
+        stmt = (
+            self._select()
+            .where(self.model.responsible_id == responsible_id, condition)
+            .order_by(rank.desc(), self.model.id)
+        )
+        return self._apply_pagination(stmt, offset=offset, limit=limit)
+
+    async def search(
+        self,
+        session: AsyncSession,
+        responsible_id: UUID,
+        query: str,
+        offset: int | None = None,
+        limit: int | None = None,
+    ) -> list[ToDoTask]:
+        """
+        Задачи пользователя, совпадающие с query, по убыванию ранга:
+        максимум из ts_rank_cd и триграммного сходства заголовка.
+        """
+        result = await session.execute(
+            self.build_search_statement(
+                responsible_id=responsible_id,
+                query=query,
+                offset=offset,
+                limit=limit,
+            )
+        )
+        return list(result.scalars().all())
+
+    @staticmethod
+    def build_stats_statement(
+        responsible_id: UUID,
+        bucket: ToDoTaskStatsBucket,
+        date_from: date,
+        date_to: date,
+    ) -> Select:
+        stats = todo_task_daily_stats.c
+        # Поле date_trunc — литерал из enum: с bind-параметром выражения
+        # в SELECT и GROUP BY для Postgres различались бы. Дата приводится
+        # к timestamp без зоны, иначе date_trunc зависел бы от TimeZone сессии
+        start = cast(
+            func.date_trunc(literal_column(f"'{bucket.value}'"), cast(stats.day, TIMESTAMP)),
+            Date,
+        )
+        created = func.sum(stats.created_count)
+        return (
+            select(start.label("start"), created.label("count"))
+            .where(
+                stats.responsible_id == responsible_id,
+                stats.day.between(date_from, date_to),
+            )
+            .group_by(start)
+            .having(created > 0)
+            .order_by(start)
+        )
+
+    async def stats(
+        self,
+        session: AsyncSession,
+        responsible_id: UUID,
+        bucket: ToDoTaskStatsBucket,
+        date_from: date,
+        date_to: date,
+    ) -> list[Row]:
+        """
+        Созданные задачи пользователя по дням, неделям (с понедельника)
+        или месяцам за [date_from, date_to] по UTC. Читается из
+        todo_task_daily_stats: не больше одной строки на день диапазона
+        по первичному ключу, независимо от числа задач.
+        """
+        result = await session.execute(
+            self.build_stats_statement(
+                responsible_id=responsible_id,
+                bucket=bucket,
+                date_from=date_from,
+                date_to=date_to,
+            )
+        )
+        return list(result.all())
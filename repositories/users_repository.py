@@ -1,9 +1,36 @@
+from typing import Any, Mapping, Optional
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.cache import TTLCache
 from models.user import User
 from repositories.base import BaseRepository
+from schemas.events.invalidation import EntityType
 
 
 class UsersRepository(BaseRepository[User]):
+    entity_type = EntityType.USER
+
     def __init__(
         self,
+        user_status_cache: TTLCache[UUID, bool],
+        statement_cache: TTLCache | None = None,
     ):
-        super().__init__(model=User)
+        super().__init__(model=User, statement_cache=statement_cache)
+        self.user_status_cache = user_status_cache
+
+    async def update(
+        self,
+        session: AsyncSession,
+        id: UUID,
+        filters: Mapping[str, Any] | None = None,
+        **instance_data,
+    ) -> Optional[User]:
+        result = await super().update(session, id=id, filters=filters, **instance_data)
+        self.user_status_cache.invalidate(id)
+        return result
+
+    async def delete(self, session: AsyncSession, id: UUID) -> None:
+        await super().delete(session, id=id)
+        self.user_status_cache.invalidate(id)
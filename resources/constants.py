@@ -4,11 +4,71 @@ OFFSET_FROM_DEFAULT = 0
 LIMIT_FROM_DEFAULT = 1
 LIMIT_TO_DEFAULT = 1000
 
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+TOTAL_COUNT_LABEL = "total_count"
+ETAG_HEADER = "ETag"
+JSON_MEDIA_TYPE = "application/json"
+
+# Строк на одну выборку из server-side cursor в BaseRepository.stream
+STREAM_YIELD_PER = 1000
+
+# Массовое создание задач
+BULK_INSERT_BATCH_SIZE = 1000
+BULK_CREATE_MAX_ITEMS = 10_000
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+# Максимум id в одном пакетном PATCH/DELETE
+BATCH_MAX_IDS = 10_000
+
+# Поиск задач: конфигурация full-text (russian стеммит и латиницу через english_stem)
+SEARCH_TS_CONFIG = "russian"
+SEARCH_QUERY_MAX_LENGTH = 200
+SEARCH_LIMIT_DEFAULT = 50
+SEARCH_RANK_LABEL = "rank"
+
+# Статистика задач: диапазон по умолчанию и максимальный (дней)
+STATS_DEFAULT_DAYS = 30
+STATS_MAX_DAYS = 366 * 5
+
+# Инвалидация кэшей между воркерами (LISTEN/NOTIFY)
+PENDING_EVENTS_SESSION_KEY = "pending_invalidation_events"
+# Больше id в одном событии — сбрасывается весь тип сущностей:
+# payload NOTIFY ограничен 8000 байт
+INVALIDATION_MAX_IDS = 100
+# Отметка в session.info сессий реплик, см. Database._create_session_factory
+REPLICA_SESSION_INFO_KEY = "replica"
+# Cookie со временем последней записи клиента (unix-время, секунды):
+# read-your-writes между воркерами, см. DBSessionMiddleware
+LAST_WRITE_COOKIE = "last_write_at"
+
+# Журнал медленных запросов: execution options с тегом метода репозитория
+# (для потоковых выборок, где contextvar не переживает yield) и пропуском
+# собственных служебных запросов журнала
+REPOSITORY_METHOD_OPTION = "repository_method"
+QUERY_LOG_SKIP_OPTION = "query_log_skip"
+QUERY_STARTED_KEY = "query_started"
+# SQLSTATE query_canceled: statement_timeout или pg_cancel_backend
+QUERY_CANCELED_SQLSTATE = "57014"
+
+# Шардирование todo_tasks: SQLSTATE отказа в записи задач переносимого
+# пользователя и параметр сессии, которым перенос обходит этот запрет
+SHARD_MOVING_SQLSTATE = "TS001"
+SHARD_MOVE_SETTING = "todo_tasks.shard_move"
+SHARD_MOVE_WAIT_INTERVAL_SECONDS = 0.1
+
+# Методы, запросы которых можно обслуживать из реплики
+READ_ONLY_HTTP_METHODS = frozenset(("GET", "HEAD"))
+
 """
 Константы для выгрузки отчёта
 """
 FILENAME_TEMPLATE = "todos_{id}.xlsx"
-REPORT_CHUNK_SIZE: int = 1024
+REPORT_CHUNK_SIZE: int = 64 * 1024
+# Сколько строк за раз дописывается в лист вне event loop
+REPORT_APPEND_BATCH_SIZE: int = 1000
+# Готовый файл держится в памяти до этого размера, дальше — на диске
+REPORT_SPOOL_MAX_SIZE: int = 8 * 1024 * 1024
+REPORT_COLUMNS = ("id", "title", "description", "created_at", "updated_at")
 REPORT_EXPORT_MEDIA_TYPE = (
     "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
 )
@@ -29,10 +89,8 @@ HEADER_FONT = {
     "bold": True,
     "color": "FFFFFF",
 }
-HEADERS_ROW_NUM: int = 1
 HEADERS_COL_NUM: int = 1
 COLUMNS_WIDTH: int = 40
-BODY_ROW_NUM: int = 2
 REPORT_DATETIME_FORMAT = "%d.%m.%Y %H:%M"
 
 """
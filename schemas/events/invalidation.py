@@ -0,0 +1,19 @@
+from enum import Enum
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+
+class EntityType(str, Enum):
+    USER = "user"
+    TODO_TASK = "todo_task"
+    # Изменились задачи пользователей с этими id (счётчики списков)
+    TODO_TASK_OWNER = "todo_task_owner"
+    # Шард задач пользователя изменился (scripts/rebalance_shards.py)
+    TODO_SHARD = "todo_shard"
+
+
+class InvalidationEvent(BaseModel):
+    entity: EntityType = Field(...)
+    # Пустой список — сбросить всё, что закэшировано по этому типу сущностей
+    ids: list[UUID] = Field(default_factory=list)
@@ -3,9 +3,23 @@ from enum import Enum
 from pydantic import BaseModel, Field
 
 
+class PaginationMode(str, Enum):
+    OFFSET = "offset"
+    CURSOR = "cursor"
+
+
+class CountMode(str, Enum):
+    EXACT = "exact"
+    CACHED = "cached"
+    ESTIMATED = "estimated"
+
+
 class PaginationParams(BaseModel):
     offset: int | None = Field(default=None, ge=0, description="Смещение")
     limit: int | None = Field(default=None, ge=1, le=1000, description="Лимит")
+    mode: PaginationMode = Field(default=PaginationMode.OFFSET, description="Режим пагинации")
+    cursor: str | None = Field(default=None, description="Курсор следующей страницы")
+    count_mode: CountMode | None = Field(default=None, description="Режим подсчёта общего количества")
 
 
 class SortOrder(str, Enum):
@@ -1,3 +1,5 @@
+from enum import Enum
+
 from pydantic import BaseModel, Field
 
 from schemas.query_params.query_params import PaginationParams, SortingParams, DateRangeFilter
@@ -7,3 +9,9 @@ class ToDoTaskListParams(BaseModel):
     pagination: PaginationParams = Field(default_factory=PaginationParams)
     sorting: SortingParams = Field(default_factory=SortingParams)
     dt_range_filter: DateRangeFilter = Field(default_factory=DateRangeFilter)
+
+
+class ToDoTaskStatsBucket(str, Enum):
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
@@ -1,7 +1,29 @@
+from typing import List
+from uuid import UUID
+
 from pydantic import BaseModel, Field
 
+from resources.constants import BATCH_MAX_IDS
+
 
 class CreateToDoTask(BaseModel):
     title: str = Field(description="Заголовок задачи")
     description: str = Field(...)
 
+
+class ReplaceToDoTask(CreateToDoTask):
+    pass
+
+
+class UpdateToDoTask(BaseModel):
+    title: str | None = Field(default=None, description="Заголовок задачи")
+    description: str | None = Field(default=None)
+
+
+class BatchUpdateToDoTasks(BaseModel):
+    ids: List[UUID] = Field(..., min_length=1, max_length=BATCH_MAX_IDS)
+    changes: UpdateToDoTask = Field(...)
+
+
+class BatchDeleteToDoTasks(BaseModel):
+    ids: List[UUID] = Field(..., min_length=1, max_length=BATCH_MAX_IDS)
@@ -1,6 +1,10 @@
-from datetime import datetime
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, List, Sequence
 from uuid import UUID
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, create_model
+
+from schemas.todo_task.query_params import ToDoTaskStatsBucket
 
 class ToDoTaskResponse(BaseModel):
     id: UUID = Field(...)
@@ -11,4 +15,74 @@ class ToDoTaskResponse(BaseModel):
     updated_at: datetime = Field(...)
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+@lru_cache(maxsize=128)
+def _partial_todo_task_model(fields: tuple[str, ...]) -> type[BaseModel]:
+    """Модель задачи только с полями fields (кэшируется по набору полей)."""
+    return create_model(
+        "ToDoTaskPartialResponse",
+        __config__=ConfigDict(from_attributes=True),
+        **{
+            name: (ToDoTaskResponse.model_fields[name].annotation, ...)
+            for name in fields
+        },
+    )
+
+
+@lru_cache(maxsize=128)
+def _partial_todo_tasks_adapter(fields: tuple[str, ...]) -> TypeAdapter:
+    return TypeAdapter(List[_partial_todo_task_model(fields)])
+
+
+def dump_partial_todo_tasks(fields: Sequence[str], rows: Sequence[Any]) -> bytes:
+    """JSON-массив задач, в который попадают только поля fields."""
+    adapter = _partial_todo_tasks_adapter(tuple(fields))
+    return adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
+
+
+def dump_partial_todo_task(fields: Sequence[str], row: Any) -> bytes:
+    model = _partial_todo_task_model(tuple(fields))
+    return model.model_validate(row, from_attributes=True).model_dump_json().encode()
+
+
+class ToDoTaskPage(BaseModel):
+    items: List[ToDoTaskResponse] = Field(...)
+    next_cursor: str | None = Field(default=None)
+    total_count: int | None = Field(default=None)
+
+
+class ToDoTaskStatsItem(BaseModel):
+    start: date = Field(..., description="Начало периода (UTC)")
+    count: int = Field(..., description="Создано задач за период")
+
+    class Config:
+        from_attributes = True
+
+
+class ToDoTaskStatsResponse(BaseModel):
+    bucket: ToDoTaskStatsBucket = Field(...)
+    date_from: date = Field(...)
+    date_to: date = Field(...)
+    total: int = Field(..., description="Создано задач за весь диапазон")
+    items: List[ToDoTaskStatsItem] = Field(
+        ..., description="Периоды без созданных задач пропускаются"
+    )
+
+
+class BulkCreateItemResult(BaseModel):
+    index: int = Field(..., description="Позиция элемента во входных данных")
+    id: UUID | None = Field(default=None)
+    error: str | None = Field(default=None)
+    message: str | None = Field(default=None)
+
+
+class BulkCreateResponse(BaseModel):
+    created: int = Field(...)
+    failed: int = Field(...)
+    results: List[BulkCreateItemResult] = Field(...)
+
+
+class BatchDeleteResponse(BaseModel):
+    deleted_ids: List[UUID] = Field(...)
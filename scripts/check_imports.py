@@ -0,0 +1,56 @@
+"""
+Smoke-проверка импорта приложения: main и все модули пакетов.
+
+Ловит ошибки, которые проявляются только при импорте (например,
+аннотация list[...] в теле класса после метода list), без БД и сервера.
+Нужны переменные окружения настроек, как для самого приложения.
+Завершается с кодом 1, если хотя бы один модуль не импортируется.
+
+Запуск: PYTHONPATH=. python scripts/check_imports.py
+"""
+import importlib
+import pkgutil
+import sys
+import traceback
+
+PACKAGES = (
+    "api",
+    "core",
+    "database",
+    "exceptions",
+    "middleware",
+    "models",
+    "repositories",
+    "schemas",
+    "services",
+)
+
+
+def module_names() -> list[str]:
+    names = ["main"]
+    for package_name in PACKAGES:
+        package = importlib.import_module(package_name)
+        names.append(package_name)
+        names.extend(
+            module.name
+            for module in pkgutil.walk_packages(package.__path__, prefix=f"{package_name}.")
+        )
+    return names
+
+
+def main() -> None:
+    failures = 0
+    for name in module_names():
+        try:
+            importlib.import_module(name)
+        except Exception:
+            failures += 1
+            print(f"FAIL {name}")
+            traceback.print_exc()
+    if not failures:
+        print("ok")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
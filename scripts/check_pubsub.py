@@ -0,0 +1,123 @@
+"""
+Проверка шины инвалидации (LISTEN/NOTIFY) на локальном Postgres.
+
+Поднимает два EventBus, как два воркера, и проверяет, что:
+- событие, отправленное в транзакции, доходит до обоих только после COMMIT;
+- при ROLLBACK событие не доставляется;
+- после принудительного разрыва LISTEN-соединения шина переподключается
+  и сбрасывает кэши подписчиков целиком.
+Завершается с кодом 1, если хотя бы одна проверка не прошла.
+
+Запуск: PYTHONPATH=. python scripts/check_pubsub.py [--database-url URL]
+"""
+import argparse
+import asyncio
+import logging
+import sys
+from uuid import uuid4
+
+from sqlalchemy import text
+
+from database.database import Database
+from database.pubsub import EventBus
+from schemas.events.invalidation import EntityType, InvalidationEvent
+
+CHANNEL = "cache_invalidation_check"
+DELIVERY_TIMEOUT_SECONDS = 5.0
+
+
+async def wait_for(condition, timeout: float = DELIVERY_TIMEOUT_SECONDS) -> bool:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while asyncio.get_running_loop().time() < deadline:
+        if condition():
+            return True
+        await asyncio.sleep(0.05)
+    return condition()
+
+
+async def check(database_url: str) -> list[str]:
+    logger = logging.getLogger("check_pubsub")
+    db = Database(database_url=database_url)
+    buses = [
+        EventBus(
+            database_url=database_url,
+            channel=CHANNEL,
+            enabled=True,
+            keepalive_seconds=1.0,
+            reconnect_min_delay=0.1,
+            reconnect_max_delay=1.0,
+            logger=logger,
+        )
+        for _ in range(2)
+    ]
+    received: list[list[InvalidationEvent]] = [[] for _ in buses]
+    for bus, events in zip(buses, received):
+        bus.subscribe(entity=EntityType.USER, handler=events.append)
+        await bus.start()
+
+    failures: list[str] = []
+    try:
+        if not await wait_for(lambda: all(bus.connected for bus in buses)):
+            return ["listeners did not connect"]
+
+        user_id = uuid4()
+        event = InvalidationEvent(entity=EntityType.USER, ids=[user_id])
+        async with db.session_factory() as session:
+            await buses[0].publish(session=session, events=[event])
+            await asyncio.sleep(0.5)
+            if any(received):
+                failures.append("event delivered before commit")
+            await session.commit()
+        if not await wait_for(lambda: all(events == [event] for events in received)):
+            failures.append(f"event not delivered after commit: {received}")
+
+        for events in received:
+            events.clear()
+        async with db.session_factory() as session:
+            await buses[0].publish(session=session, events=[event])
+            await session.rollback()
+        await asyncio.sleep(0.5)
+        if any(received):
+            failures.append("event delivered after rollback")
+
+        async with db.session_factory() as session:
+            await session.execute(
+                text(
+                    "SELECT pg_terminate_backend(pid) FROM pg_stat_activity "
+                    "WHERE application_name = :application_name"
+                ),
+                {"application_name": f"event_bus:{CHANNEL}"},
+            )
+        if not await wait_for(lambda: all(bus.reconnects == 1 and bus.connected for bus in buses)):
+            failures.append("listeners did not reconnect")
+        elif not all(InvalidationEvent(entity=EntityType.USER) in events for events in received):
+            failures.append("caches were not reset after reconnect")
+    finally:
+        for bus in buses:
+            await bus.stop()
+        await db.engine.dispose()
+
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    database_url = args.database_url
+    if database_url is None:
+        from core.settings import settings
+
+        database_url = settings.async_database_url
+
+    failures = asyncio.run(check(database_url=database_url))
+    for failure in failures:
+        print(f"FAIL {failure}")
+    if not failures:
+        print("ok")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
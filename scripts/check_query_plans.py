@@ -0,0 +1,210 @@
+"""
+Проверка планов запросов репозиториев.
+
+Скрипт наполняет БД тестовыми данными внутри транзакции, выполняет
+EXPLAIN для каждой формы запроса репозиториев и завершается с кодом 1,
+если хотя бы один план содержит Seq Scan. Seq Scan запрещается через
+enable_seqscan = off: если он всё равно остался в плане, подходящего
+индекса нет. Для запросов с фильтром по created_at дополнительно
+проверяется отсечение секций: в плане должны остаться только секции
+todo_tasks, пересекающиеся с диапазоном дат.
+Транзакция откатывается, данные не сохраняются.
+
+Запуск: PYTHONPATH=. python scripts/check_query_plans.py [--database-url URL]
+"""
+import argparse
+import asyncio
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import Any
+from uuid import uuid4
+
+from sqlalchemy import Select, insert, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.cache import TTLCache
+from database.database import Database
+from database.explain import Explain, iter_plan_nodes
+from database.partitions import list_partitions
+from models.todo_task import ToDoTask
+from models.user import User
+from repositories.todo_tasks_repository import ToDoTaskRepository
+from repositories.users_repository import UsersRepository
+from schemas.todo_task.query_params import ToDoTaskStatsBucket
+
+SEED_USERS = 50
+SEED_TASKS_PER_USER = 200
+# Формы с фильтром date_from/date_to, для которых обязательно отсечение секций
+PRUNED_SHAPES = frozenset(("todo_tasks.list_offset", "todo_tasks.count", "todo_tasks.export"))
+
+
+async def seed(session: AsyncSession) -> dict[str, Any]:
+    now = datetime.now(timezone.utc)
+    users = [
+        {
+            "id": uuid4(),
+            "username": f"plan_check_{index}",
+            "email": f"plan_check_{index}@example.com",
+            "full_name": None,
+            "disabled": False,
+            "password_hash": "x",
+            "created_at": now,
+            "updated_at": now,
+        }
+        for index in range(SEED_USERS)
+    ]
+    await session.execute(insert(User), users)
+
+    tasks = []
+    for user in users:
+        for index in range(SEED_TASKS_PER_USER):
+            created_at = now - timedelta(hours=index)
+            tasks.append(
+                {
+                    "id": uuid4(),
+                    "title": f"task {index}",
+                    "description": "plan check",
+                    "responsible_id": user["id"],
+                    "created_at": created_at,
+                    "updated_at": created_at,
+                }
+            )
+    await session.execute(insert(ToDoTask), tasks)
+    await session.execute(text("ANALYZE users"))
+    await session.execute(text("ANALYZE todo_tasks"))
+    # Заполнена триггерами при вставке задач
+    await session.execute(text("ANALYZE todo_task_daily_stats"))
+
+    return {
+        "user": users[0],
+        "task": tasks[0],
+        "date_from": now - timedelta(days=3),
+        "date_to": now,
+    }
+
+
+def query_shapes(seeded: dict[str, Any]) -> dict[str, Select]:
+    """Формы запросов, которые выполняют сервисы."""
+    users_repository = UsersRepository(user_status_cache=TTLCache(maxsize=0, ttl_seconds=0))
+    todo_tasks_repository = ToDoTaskRepository()
+    user_id = seeded["user"]["id"]
+
+    return {
+        "users.authenticate": users_repository.build_get_one_statement(
+            username=seeded["user"]["username"], disabled=False
+        ),
+        "users.current_user": users_repository.build_get_one_statement(
+            id=user_id, disabled=False
+        ),
+        "todo_tasks.get_user_todo_task": todo_tasks_repository.build_get_one_statement(
+            id=seeded["task"]["id"], responsible_id=user_id
+        ),
+        "todo_tasks.list_offset": todo_tasks_repository.build_list_statement(
+            responsible_id=user_id,
+            offset=100,
+            limit=50,
+            sort_by="created_at",
+            sort_order="desc",
+            date_from=seeded["date_from"],
+            date_to=seeded["date_to"],
+        ),
+        "todo_tasks.list_keyset": todo_tasks_repository.build_list_statement(
+            responsible_id=user_id,
+            limit=50,
+            sort_by="created_at",
+            sort_order="asc",
+            keyset=True,
+            after=(seeded["task"]["created_at"], seeded["task"]["id"]),
+        ),
+        "todo_tasks.count": todo_tasks_repository.build_count_statement(
+            responsible_id=user_id,
+            date_from=seeded["date_from"],
+            date_to=seeded["date_to"],
+        ),
+        "todo_tasks.search": todo_tasks_repository.build_search_statement(
+            responsible_id=user_id,
+            query=seeded["task"]["title"],
+            limit=50,
+        ),
+        "todo_tasks.export": todo_tasks_repository.build_list_statement(
+            responsible_id=user_id,
+            date_from=seeded["date_from"],
+            date_to=seeded["date_to"],
+        ),
+        "todo_tasks.stats": todo_tasks_repository.build_stats_statement(
+            responsible_id=user_id,
+            bucket=ToDoTaskStatsBucket.WEEK,
+            date_from=seeded["date_from"].date(),
+            date_to=seeded["date_to"].date(),
+        ),
+    }
+
+
+async def check(database_url: str) -> list[str]:
+    db = Database(database_url=database_url)
+    failures: list[str] = []
+
+    async with db.session_factory() as session:
+        try:
+            seeded = await seed(session=session)
+            await session.execute(text("SET LOCAL enable_seqscan = off"))
+            partitions = await list_partitions(
+                conn=await session.connection(), table=ToDoTask.__tablename__
+            )
+            partition_names = {partition.name for partition in partitions}
+            expected_partitions = {
+                partition.name
+                for partition in partitions
+                if partition.overlaps(
+                    start=seeded["date_from"].date(),
+                    end=seeded["date_to"].date() + timedelta(days=1),
+                )
+            }
+
+            for name, statement in query_shapes(seeded=seeded).items():
+                result = await session.execute(Explain(statement))
+                plan = result.scalar_one()[0]["Plan"]
+                seq_scans = [
+                    node.get("Relation Name", "?")
+                    for node in iter_plan_nodes(plan)
+                    if node["Node Type"] == "Seq Scan"
+                ]
+                problems = [f"seq scan on {seq_scans}"] if seq_scans else []
+
+                if partition_names and name in PRUNED_SHAPES:
+                    scanned = {
+                        node["Relation Name"]
+                        for node in iter_plan_nodes(plan)
+                        if node.get("Relation Name") in partition_names
+                    }
+                    not_pruned = sorted(scanned - expected_partitions)
+                    if not_pruned:
+                        problems.append(f"partitions not pruned: {not_pruned}")
+
+                status = "FAIL" if problems else "ok"
+                print(f"{status:4} {name}" + (f" {'; '.join(problems)}" if problems else ""))
+                if problems:
+                    failures.append(name)
+        finally:
+            await session.rollback()
+
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    database_url = args.database_url
+    if database_url is None:
+        from core.settings import settings
+
+        database_url = settings.async_database_url
+
+    failures = asyncio.run(check(database_url=database_url))
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
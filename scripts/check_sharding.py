@@ -0,0 +1,171 @@
+"""
+Проверка шардирования todo_tasks на нескольких локальных базах Postgres
+с применёнными миграциями (alembic -x database_url=... upgrade head).
+
+Первая база из --shard служит и primary (пользователи, переопределения).
+Скрипт создаёт пользователя и его задачи через ShardRouter и проверяет, что:
+- задачи лежат только на шарде-владельце из кольца;
+- после move_user_tasks они вместе со статистикой на целевом шарде,
+  на источнике их нет, а запись туда отклоняется (SHARD_MOVING_SQLSTATE);
+- маршрутизатор отправляет пользователя на новый шард.
+Созданные данные удаляются. Завершается с кодом 1 при ошибке проверки.
+
+Запуск: PYTHONPATH=. python scripts/check_sharding.py
+    --shard s0=postgresql+asyncpg://.../s0 --shard s1=postgresql+asyncpg://.../s1
+"""
+import argparse
+import asyncio
+import logging
+import sys
+from datetime import datetime, timezone
+from uuid import UUID, uuid4
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.exc import DBAPIError
+
+from core.cache import TTLCache
+from database.database import Database
+from database.pubsub import EventBus
+from database.sharding import ShardRouter, allow_shard_move, move_user_tasks
+from models.todo_task import ToDoTask
+from models.todo_task_daily_stats import todo_task_daily_stats
+from models.todo_task_shard import todo_task_shard_freezes, todo_task_shard_overrides
+from models.user import User
+from repositories.todo_tasks_repository import ToDoTaskRepository
+from resources.constants import SHARD_MOVING_SQLSTATE
+
+TASKS = 25
+
+
+async def count_tasks(db: Database, shard: str, user_id: UUID) -> int:
+    async with db.shard_session_factory(shard)() as session:
+        return await session.scalar(
+            select(func.count()).where(ToDoTask.responsible_id == user_id)
+        )
+
+
+async def check(shards: dict[str, str]) -> list[str]:
+    primary_url = next(iter(shards.values()))
+    db = Database(database_url=primary_url, shard_urls=shards)
+    router = ShardRouter(
+        db=db, ring_nodes=None, vnodes=128, overrides=TTLCache(maxsize=100, ttl_seconds=60)
+    )
+    event_bus = EventBus(
+        database_url=primary_url,
+        channel="check_sharding",
+        enabled=False,
+        keepalive_seconds=1.0,
+        reconnect_min_delay=0.1,
+        reconnect_max_delay=1.0,
+        logger=logging.getLogger("check_sharding"),
+    )
+    repository = ToDoTaskRepository()
+    user_id = uuid4()
+    now = datetime.now(timezone.utc)
+    failures: list[str] = []
+
+    async with db.session_factory() as session:
+        await session.execute(
+            insert(User).values(
+                id=user_id,
+                username=f"shard_check_{user_id.hex[:8]}",
+                email=f"shard_check_{user_id.hex[:8]}@example.com",
+                password_hash="x",
+                created_at=now,
+                updated_at=now,
+            )
+        )
+        await session.commit()
+
+    try:
+        source = await router.shard_for(user_id)
+        async with router.session_factory(source)() as session:
+            await repository.create_many(
+                session=session,
+                items=[
+                    {"title": f"task {index}", "description": "shard check", "responsible_id": user_id}
+                    for index in range(TASKS)
+                ],
+            )
+            await session.commit()
+        placed = {shard: await count_tasks(db, shard, user_id) for shard in db.shard_names}
+        if placed != {shard: TASKS if shard == source else 0 for shard in db.shard_names}:
+            failures.append(f"tasks not on ring owner {source}: {placed}")
+
+        target = next(shard for shard in db.shard_names if shard != source)
+        moved = await move_user_tasks(
+            router=router, event_bus=event_bus, user_id=user_id, target=target
+        )
+        placed = {shard: await count_tasks(db, shard, user_id) for shard in db.shard_names}
+        if moved != TASKS or placed[target] != TASKS or placed[source] != 0:
+            failures.append(f"move {source} -> {target}: moved={moved}, placed={placed}")
+        if await router.shard_for(user_id) != target:
+            failures.append("router still points to the source shard")
+
+        async with router.session_factory(target)() as session:
+            stats_total = await session.scalar(
+                select(func.sum(todo_task_daily_stats.c.created_count)).where(
+                    todo_task_daily_stats.c.responsible_id == user_id
+                )
+            )
+        if stats_total != TASKS:
+            failures.append(f"stats on target: {stats_total}")
+
+        async with router.session_factory(source)() as session:
+            try:
+                await repository.create(
+                    session=session, title="late", description="", responsible_id=user_id
+                )
+                failures.append("write to the source shard was accepted")
+            except DBAPIError as exc:
+                if getattr(exc.orig, "sqlstate", None) != SHARD_MOVING_SQLSTATE:
+                    raise
+            await session.rollback()
+    finally:
+        for shard, engine in db.shard_engines.items():
+            async with engine.begin() as conn:
+                await allow_shard_move(conn)
+                await conn.execute(delete(ToDoTask).where(ToDoTask.responsible_id == user_id))
+                await conn.execute(
+                    delete(todo_task_shard_freezes).where(
+                        todo_task_shard_freezes.c.responsible_id == user_id
+                    )
+                )
+                await conn.execute(
+                    delete(todo_task_daily_stats).where(
+                        todo_task_daily_stats.c.responsible_id == user_id
+                    )
+                )
+        async with db.session_factory() as session:
+            await session.execute(
+                delete(todo_task_shard_overrides).where(
+                    todo_task_shard_overrides.c.responsible_id == user_id
+                )
+            )
+            await session.execute(delete(User).where(User.id == user_id))
+            await session.commit()
+        for engine in (db.engine, *db.shard_engines.values()):
+            await engine.dispose()
+
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--shard", action="append", required=True, help="NAME=DATABASE_URL")
+    args = parser.parse_args()
+
+    shards = dict(item.split("=", 1) for item in args.shard)
+    if len(shards) < 2:
+        sys.exit("at least two --shard are required")
+
+    failures = asyncio.run(check(shards=shards))
+    for failure in failures:
+        print(f"FAIL {failure}")
+    if not failures:
+        print("ok")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Обслуживание помесячных секций todo_tasks.
+
+Создаёт секции на текущий и --months-ahead следующих месяцев и,
+если задан срок хранения, отсоединяет (с --drop — удаляет) секции
+старше --retention-months месяцев. Рассчитан на запуск по расписанию,
+например раз в сутки. Без --database-url обслуживает primary и все
+шарды из TODO_SHARDS.
+
+Запуск: PYTHONPATH=. python scripts/maintain_partitions.py
+    [--database-url URL ...] [--months-ahead N] [--retention-months N] [--drop]
+"""
+import argparse
+import asyncio
+
+from sqlalchemy.engine import make_url
+
+from core.settings import settings
+from database.database import Database
+from database.partitions import detach_expired_partitions, ensure_month_partitions
+from models.todo_task import ToDoTask
+
+
+async def maintain(
+    database_url: str,
+    months_ahead: int,
+    retention_months: int | None,
+    drop: bool,
+) -> None:
+    db = Database(database_url=database_url)
+    table = ToDoTask.__tablename__
+    print(make_url(database_url).render_as_string(hide_password=True))
+    try:
+        async with db.engine.begin() as conn:
+            created = await ensure_month_partitions(
+                conn=conn, table=table, months=months_ahead + 1
+            )
+        print(f"created: {created or '-'}")
+
+        if retention_months is not None:
+            expired = await detach_expired_partitions(
+                engine=db.engine,
+                table=table,
+                keep_months=retention_months,
+                drop=drop,
+            )
+            print(f"{'dropped' if drop else 'detached'}: {expired or '-'}")
+    finally:
+        await db.engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--database-url", action="append", default=None)
+    parser.add_argument("--months-ahead", type=int, default=settings.TODO_TASKS_PARTITIONS_AHEAD)
+    parser.add_argument(
+        "--retention-months", type=int, default=settings.TODO_TASKS_RETENTION_MONTHS
+    )
+    parser.add_argument(
+        "--drop",
+        action="store_true",
+        help="Удалять отсоединённые секции (иначе они остаются отдельными таблицами)",
+    )
+    args = parser.parse_args()
+
+    database_urls = args.database_url or list(
+        dict.fromkeys((settings.async_database_url, *settings.TODO_SHARDS.values()))
+    )
+    for database_url in database_urls:
+        asyncio.run(
+            maintain(
+                database_url=database_url,
+                months_ahead=args.months_ahead,
+                retention_months=args.retention_months,
+                drop=args.drop,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Перенос задач пользователей между шардами todo_tasks без остановки
+приложения (см. database/sharding.py).
+
+Команды:
+- move --user-id ID --to SHARD — перенести одного пользователя;
+- rebalance --ring S0,S1,S2 [--dry-run] — перенести пользователей, чей
+  владелец на новом кольце отличается от текущего шарда;
+- prune-overrides — после выкладки нового TODO_SHARD_RING удалить
+  переопределения, совпавшие с кольцом.
+
+Порядок добавления шарда: шард добавляется в TODO_SHARDS, но не
+в TODO_SHARD_RING, к нему применяются миграции
+(alembic -x database_url=... upgrade head); затем rebalance с новым
+кольцом, выкладка нового TODO_SHARD_RING и prune-overrides.
+
+Запуск: PYTHONPATH=. python scripts/rebalance_shards.py COMMAND [...]
+"""
+import argparse
+import asyncio
+import logging
+import sys
+from uuid import UUID
+
+from core.cache import TTLCache
+from core.settings import settings
+from database.database import Database
+from database.pubsub import EventBus
+from database.sharding import (
+    HashRing,
+    ShardRouter,
+    list_shard_users,
+    move_user_tasks,
+    prune_overrides,
+)
+
+
+def build(database_url: str, shards: dict[str, str]) -> tuple[Database, ShardRouter, EventBus]:
+    db = Database(database_url=database_url, shard_urls=shards)
+    router = ShardRouter(
+        db=db,
+        ring_nodes=settings.TODO_SHARD_RING,
+        vnodes=settings.TODO_SHARD_VNODES,
+        overrides=TTLCache(maxsize=0, ttl_seconds=0),
+    )
+    # Только publish: pg_notify в транзакции переключения
+    event_bus = EventBus(
+        database_url=database_url,
+        channel=settings.PUBSUB_CHANNEL,
+        enabled=settings.PUBSUB_ENABLED,
+        keepalive_seconds=settings.PUBSUB_KEEPALIVE_SECONDS,
+        reconnect_min_delay=settings.PUBSUB_RECONNECT_MIN_DELAY_SECONDS,
+        reconnect_max_delay=settings.PUBSUB_RECONNECT_MAX_DELAY_SECONDS,
+        logger=logging.getLogger("rebalance_shards"),
+    )
+    return db, router, event_bus
+
+
+async def rebalance(
+    router: ShardRouter,
+    event_bus: EventBus,
+    ring: HashRing,
+    dry_run: bool,
+    freeze_timeout: float,
+) -> None:
+    for shard, engine in router.db.shard_engines.items():
+        for user_id in await list_shard_users(engine=engine):
+            target = ring.owner(user_id)
+            if target == shard:
+                continue
+            if dry_run:
+                print(f"{user_id}: {shard} -> {target}")
+                continue
+            moved = await move_user_tasks(
+                router=router,
+                event_bus=event_bus,
+                user_id=user_id,
+                target=target,
+                freeze_timeout=freeze_timeout,
+            )
+            print(f"{user_id}: {shard} -> {target}, {moved} tasks")
+
+
+async def run(args: argparse.Namespace) -> None:
+    db, router, event_bus = build(
+        database_url=settings.async_database_url, shards=settings.TODO_SHARDS
+    )
+    if not router.enabled:
+        sys.exit("TODO_SHARDS is empty")
+    try:
+        if args.command == "move":
+            moved = await move_user_tasks(
+                router=router,
+                event_bus=event_bus,
+                user_id=args.user_id,
+                target=args.to,
+                freeze_timeout=args.freeze_timeout,
+            )
+            print(f"{args.user_id}: -> {args.to}, {moved} tasks")
+        elif args.command == "rebalance":
+            await rebalance(
+                router=router,
+                event_bus=event_bus,
+                ring=HashRing(nodes=args.ring.split(","), vnodes=settings.TODO_SHARD_VNODES),
+                dry_run=args.dry_run,
+                freeze_timeout=args.freeze_timeout,
+            )
+        else:
+            pruned = await prune_overrides(router=router, event_bus=event_bus)
+            print(f"pruned: {len(pruned)}")
+    finally:
+        for engine in (db.engine, *db.shard_engines.values()):
+            await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--freeze-timeout",
+        type=float,
+        default=30.0,
+        help="Сколько ждать транзакции, начатые до запрета записи",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    move = commands.add_parser("move")
+    move.add_argument("--user-id", type=UUID, required=True)
+    move.add_argument("--to", required=True, choices=sorted(settings.TODO_SHARDS))
+    rebalance_parser = commands.add_parser("rebalance")
+    rebalance_parser.add_argument("--ring", required=True, help="Шарды нового кольца через запятую")
+    rebalance_parser.add_argument("--dry-run", action="store_true")
+    commands.add_parser("prune-overrides")
+
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
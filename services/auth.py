@@ -1,5 +1,7 @@
+import time
 from logging import Logger
 from uuid import UUID
+from core.cache import TTLCache
 from exceptions import UnauthorizedException, InvalidTokenException
 from resources.constants import TOKEN_TYPE
 from schemas.user.request import CreateUser
@@ -19,18 +21,22 @@ class AuthService:
         security_service: SecurityService,
         logger: Logger,
         session: AsyncSession,
+        user_status_cache: TTLCache[UUID, bool],
+        claims_trust_seconds: int = 0,
     ) -> None:
         self.users_repository = users_repository
         self.security_service = security_service
         self.logger = logger
         self.session = session
+        self.user_status_cache = user_status_cache
+        self.claims_trust_seconds = claims_trust_seconds
 
     async def _authenticate(self, username: str, password: str) -> User:
         user: User = await self.users_repository.get_one(
             session=self.session, username=username, disabled=False
         )
 
-        if not self.security_service.verify_password(
+        if not await self.security_service.verify_password(
             plain_password=password,
             hashed_password=user.password_hash,
         ):
@@ -38,7 +44,7 @@ class AuthService:
         return user
 
     async def create_user(self, user_create: CreateUser) -> UserResponse:
-        password_hash = self.security_service.hash_password(
+        password_hash = await self.security_service.hash_password(
             password=user_create.password
         )
         new_user: User = await self.users_repository.create(
@@ -81,9 +87,44 @@ class AuthService:
 
         return UserResponse.model_validate(user)
 
+    def _parse_user_id(self, payload: dict) -> UUID:
+        try:
+            return UUID(str(payload["user_id"]))
+        except (KeyError, ValueError):
+            raise InvalidTokenException()
+
+    def _claims_are_fresh(self, payload: dict) -> bool:
+        if self.claims_trust_seconds <= 0:
+            return False
+        issued_at = payload.get("iat")
+        if not isinstance(issued_at, (int, float)):
+            return False
+        return time.time() - issued_at <= self.claims_trust_seconds
+
     async def get_current_user_id(self, token: str) -> UUID:
-        result: UserResponse = await self.get_current_user(token=token)
-        return result.id
+        """
+        Получение id активного пользователя из токена.
+
+        Для свежих токенов достаточно claims, иначе статус пользователя
+        берётся из кэша и только при промахе — из БД.
+        """
+        payload: dict = self.security_service.decode_access_token(token=token)
+        user_id: UUID = self._parse_user_id(payload=payload)
+
+        if self._claims_are_fresh(payload=payload):
+            return user_id
+
+        if self.user_status_cache.get(user_id):
+            return user_id
+
+        # Отключение пользователя во время чтения не должно перезаписаться
+        # устаревшим «активен», см. TTLCache.generation
+        generation = self.user_status_cache.generation
+        user: User = await self.users_repository.get_one(
+            session=self.session, id=user_id, disabled=False
+        )
+        self.user_status_cache.set(user.id, True, generation=generation)
+        return user.id
 
     async def get_user_by_id(self, user_id: UUID) -> UserResponse:
         user: User = await self.users_repository.get_by_id(
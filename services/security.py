@@ -1,57 +1,68 @@
+import hashlib
+import time
 from datetime import datetime, timedelta, timezone
 import bcrypt
 from jose import JWTError, jwt
 
+from core.cache import TTLCache
+from core.executors import BoundedExecutor
 from exceptions.custom_exceptions.invalid_token import InvalidTokenException
 from resources.constants import TOKEN_ENCODING
 
 
+# Функции уровня модуля, чтобы их можно было передать в ProcessPoolExecutor
+def _hashpw(password: bytes) -> bytes:
+    return bcrypt.hashpw(password=password, salt=bcrypt.gensalt())
+
+
+def _checkpw(password: bytes, hashed_password: bytes) -> bool:
+    return bcrypt.checkpw(password=password, hashed_password=hashed_password)
+
+
 class SecurityService:
     def __init__(
         self,
         access_token_expire_minutes: int,
         sign_algorithm: str,
         secret_key: str,
+        password_executor: BoundedExecutor,
+        token_cache: TTLCache[bytes, dict],
         encoding: str = TOKEN_ENCODING,
     ):
         self.access_token_expire_minutes = access_token_expire_minutes
         self.sign_algorithm = sign_algorithm
         self.secret_key = secret_key
+        self.password_executor = password_executor
+        self.token_cache = token_cache
         self.encoding = encoding
 
-    def hash_password(self, password: str) -> str:
-        return bcrypt.hashpw(
-            password=bytes(
-                password,
-                encoding=self.encoding,
-            ),
-            salt=bcrypt.gensalt(),
-        ).decode(encoding=self.encoding)
-
-    def verify_password(self, plain_password: str, hashed_password: str) -> bool:
-        return bcrypt.checkpw(
-            password=bytes(
-                plain_password,
-                encoding=self.encoding,
-            ),
-            hashed_password=bytes(
-                hashed_password,
-                encoding=self.encoding,
-            ),
+    async def hash_password(self, password: str) -> str:
+        password_hash: bytes = await self.password_executor.run(
+            _hashpw,
+            bytes(password, encoding=self.encoding),
+        )
+        return password_hash.decode(encoding=self.encoding)
+
+    async def verify_password(self, plain_password: str, hashed_password: str) -> bool:
+        return await self.password_executor.run(
+            _checkpw,
+            bytes(plain_password, encoding=self.encoding),
+            bytes(hashed_password, encoding=self.encoding),
         )
 
     def create_access_token(
         self, data: dict, expires_delta: timedelta | None = None
     ) -> str:
+        issued_at = datetime.now(tz=timezone.utc)
         if expires_delta:
-            expire = datetime.now(tz=timezone.utc) + expires_delta
+            expire = issued_at + expires_delta
         else:
-            expire = datetime.now(tz=timezone.utc) + timedelta(
+            expire = issued_at + timedelta(
                 minutes=self.access_token_expire_minutes
             )
 
         claims = data.copy()
-        claims.update({"exp": expire})
+        claims.update({"exp": expire, "iat": issued_at})
 
         encoded_jwt = jwt.encode(
             claims=claims,
@@ -61,12 +72,31 @@ class SecurityService:
         return encoded_jwt
 
     def decode_access_token(self, token: str) -> dict:
+        """
+        Проверка подписи и claims токена.
+
+        Уже проверенные токены кэшируются по sha256-дайджесту
+        до момента их собственного exp.
+        """
+        token_digest = hashlib.sha256(token.encode(self.encoding)).digest()
+        cached_payload = self.token_cache.get(token_digest)
+        if cached_payload is not None:
+            return dict(cached_payload)
+
         try:
             payload = jwt.decode(
                 token=token,
                 key=self.secret_key,
                 algorithms=[self.sign_algorithm],
             )
-            return payload
         except JWTError:
             raise InvalidTokenException()
+
+        expires_at = payload.get("exp")
+        if isinstance(expires_at, (int, float)):
+            self.token_cache.set(
+                token_digest,
+                dict(payload),
+                ttl_seconds=min(expires_at - time.time(), self.token_cache.ttl_seconds),
+            )
+        return payload
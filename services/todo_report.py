@@ -1,93 +1,105 @@
-import io
-from typing import AsyncGenerator, List
+import asyncio
+import tempfile
+from typing import IO, Any, AsyncGenerator, AsyncIterable, List
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, PatternFill, Alignment
 from openpyxl.utils import get_column_letter
+from openpyxl.worksheet._write_only import WriteOnlyWorksheet
 
-from models.todo_task import ToDoTask
 from resources.constants import (
-    BODY_ROW_NUM,
     COLUMNS_WIDTH,
     HEADER_ALIGNMENT,
     HEADER_FILL_KWARGS,
     HEADER_FONT,
     HEADERS_COL_NUM,
-    HEADERS_ROW_NUM,
+    REPORT_APPEND_BATCH_SIZE,
     REPORT_CHUNK_SIZE,
     REPORT_DATETIME_FORMAT,
     REPORT_HEADERS,
+    REPORT_SPOOL_MAX_SIZE,
     REPORT_TITLE,
 )
 
 
 class TodoReportService:
-    def _create_excel_report_buffer(self, todos: List[ToDoTask]) -> io.BytesIO:
-        workbook = Workbook()
-        worksheet = workbook.active
-        worksheet.title = REPORT_TITLE
+    """
+    Excel-отчёт в режиме write_only: строки пишутся во временный файл
+    листа по мере поступления, в памяти не держится весь набор задач.
+    Работа openpyxl выполняется в потоке, чтобы не блокировать event loop.
+    """
+
+    def _create_worksheet(self) -> tuple[Workbook, WriteOnlyWorksheet]:
+        workbook = Workbook(write_only=True)
+        worksheet = workbook.create_sheet(title=REPORT_TITLE)
 
         header_font = Font(**HEADER_FONT)
         header_fill = PatternFill(**HEADER_FILL_KWARGS)
         header_alignment = Alignment(**HEADER_ALIGNMENT)
 
+        header_cells = []
         for col_num, header in enumerate(
             iterable=REPORT_HEADERS, start=HEADERS_COL_NUM
         ):
-            cell = worksheet.cell(row=HEADERS_ROW_NUM, column=col_num)
-            cell.value = header
+            cell = WriteOnlyCell(ws=worksheet, value=header)
             cell.font = header_font
             cell.fill = header_fill
             cell.alignment = header_alignment
-            
+            header_cells.append(cell)
+
             col_letter = get_column_letter(col_num)
             worksheet.column_dimensions[col_letter].width = COLUMNS_WIDTH
 
-        for row_num, todo in enumerate(iterable=todos, start=BODY_ROW_NUM):
-            worksheet.cell(
-                row=row_num,
-                column=REPORT_HEADERS.index("ID") + 1,
-                value=str(object=todo.id),
-            )
-            worksheet.cell(
-                row=row_num, column=REPORT_HEADERS.index("Название") + 1, value=todo.title
-            )
-            worksheet.cell(
-                row=row_num,
-                column=REPORT_HEADERS.index("Описание") + 1,
-                value=todo.description or "",
-            )
-            worksheet.cell(
-                row=row_num,
-                column=REPORT_HEADERS.index("Дата создания") + 1,
-                value=(
-                    todo.created_at.strftime(REPORT_DATETIME_FORMAT)
-                    if todo.created_at
-                    else ""
-                ),
-            )
-            worksheet.cell(
-                row=row_num,
-                column=REPORT_HEADERS.index("Дата изменения") + 1,
-                value=(
-                    todo.updated_at.strftime(REPORT_DATETIME_FORMAT)
-                    if todo.updated_at
-                    else ""
-                ),
+        worksheet.append(header_cells)
+        return workbook, worksheet
+
+    @staticmethod
+    def _format_datetime(value: Any) -> str:
+        return value.strftime(REPORT_DATETIME_FORMAT) if value else ""
+
+    def _append_rows(self, worksheet: WriteOnlyWorksheet, todos: List[Any]) -> None:
+        for todo in todos:
+            worksheet.append(
+                (
+                    str(object=todo.id),
+                    todo.title,
+                    todo.description or "",
+                    self._format_datetime(todo.created_at),
+                    self._format_datetime(todo.updated_at),
+                )
             )
 
-        buf = io.BytesIO()
+    @staticmethod
+    def _save(workbook: Workbook) -> IO[bytes]:
+        buf = tempfile.SpooledTemporaryFile(max_size=REPORT_SPOOL_MAX_SIZE)
         workbook.save(filename=buf)
         buf.seek(0)
         return buf
 
     async def get_report_chunks(
         self,
-        todos: List[ToDoTask],
+        todos: AsyncIterable[Any],
         chunk_size: int = REPORT_CHUNK_SIZE,
+        batch_size: int = REPORT_APPEND_BATCH_SIZE,
     ) -> AsyncGenerator[bytes, None]:
-        buf: io.BytesIO = self._create_excel_report_buffer(todos=todos)
+        """
+        todos — задачи или строки с полями id, title, description,
+        created_at, updated_at, например из BaseRepository.stream.
+        """
+        workbook, worksheet = await asyncio.to_thread(self._create_worksheet)
 
-        while chunk := buf.read(chunk_size):
-            yield chunk
+        batch: List[Any] = []
+        async for todo in todos:
+            batch.append(todo)
+            if len(batch) >= batch_size:
+                await asyncio.to_thread(self._append_rows, worksheet, batch)
+                batch = []
+        if batch:
+            await asyncio.to_thread(self._append_rows, worksheet, batch)
 
-        buf.close()
+        buf = await asyncio.to_thread(self._save, workbook)
+        try:
+            while chunk := await asyncio.to_thread(buf.read, chunk_size):
+                yield chunk
+        finally:
+            buf.close()
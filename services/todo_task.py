@@ -1,12 +1,46 @@
+from datetime import date, datetime
 from logging import Logger
-from typing import List
+from typing import Any, AsyncIterable, AsyncIterator, List, Sequence
 from uuid import UUID
 
+from pydantic import ValidationError
+from sqlalchemy import Row
+from sqlalchemy.exc import DBAPIError, NoResultFound
+
+from exceptions.custom_exceptions.invalid_cursor import InvalidCursorException
+from exceptions.custom_exceptions.not_found import NotFoundException
+from exceptions.custom_exceptions.payload_too_large import PayloadTooLargeException
+from exceptions.custom_exceptions.precondition_failed import PreconditionFailedException
+from core.cache import TTLCache
+from exceptions.parsers.pg_parsers import parse_integrity_error
 from models.todo_task import ToDoTask
+from repositories.cursor import coerce_cursor_values, decode_cursor, encode_cursor
 from repositories.todo_tasks_repository import ToDoTaskRepository
-from schemas.todo_task.query_params import ToDoTaskListParams
-from schemas.todo_task.request import CreateToDoTask
-from schemas.todo_task.response import ToDoTaskResponse
+from resources.constants import (
+    BULK_CREATE_MAX_ITEMS,
+    BULK_INSERT_BATCH_SIZE,
+    LIMIT_TO_DEFAULT,
+    REPLICA_SESSION_INFO_KEY,
+    SEARCH_LIMIT_DEFAULT,
+)
+from schemas.query_params.query_params import PaginationMode, SortOrder
+from schemas.todo_task.query_params import ToDoTaskListParams, ToDoTaskStatsBucket
+from schemas.todo_task.request import (
+    BatchDeleteToDoTasks,
+    BatchUpdateToDoTasks,
+    CreateToDoTask,
+    ReplaceToDoTask,
+    UpdateToDoTask,
+)
+from schemas.todo_task.response import (
+    BatchDeleteResponse,
+    BulkCreateItemResult,
+    BulkCreateResponse,
+    ToDoTaskPage,
+    ToDoTaskResponse,
+    ToDoTaskStatsItem,
+    ToDoTaskStatsResponse,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
@@ -16,10 +50,27 @@ class ToDoTaskService:
         logger: Logger,
         todo_tasks_repository: ToDoTaskRepository,
         session: AsyncSession,
+        version_cache: TTLCache[UUID, tuple[UUID, datetime]] | None = None,
     ):
         self.todo_tasks_repository = todo_tasks_repository
         self.logger = logger
         self.session = session
+        self.version_cache = version_cache
+
+    def _version_generation(self) -> int | None:
+        """Поколение version_cache; берётся до чтения задачи из БД."""
+        return None if self.version_cache is None else self.version_cache.generation
+
+    def _remember_version(
+        self, user_id: UUID, task_id: UUID, updated_at: datetime, generation: int | None
+    ) -> None:
+        """Версия для If-None-Match, см. api.v1.etags.get_if_none_match."""
+        # Реплика отстаёт от primary: версия, прочитанная с неё после
+        # инвалидации, оставалась бы в кэше устаревшей до конца TTL
+        if self.version_cache is None or self.session.info.get(REPLICA_SESSION_INFO_KEY):
+            return
+        # Инвалидация во время чтения: прочитанная версия могла устареть
+        self.version_cache.set(task_id, (user_id, updated_at), generation=generation)
 
     async def create_todo_task(
         self, responsible_id: int, todo_task_create: CreateToDoTask
@@ -33,25 +84,287 @@ class ToDoTaskService:
 
         return ToDoTaskResponse.model_validate(obj=new_todo_task)
 
+    async def _create_todo_tasks_batch(
+        self,
+        responsible_id: UUID,
+        batch: List[tuple[int, CreateToDoTask]],
+    ) -> List[BulkCreateItemResult]:
+        # Savepoint на пачку: ошибка БД не откатывает уже вставленные пачки
+        try:
+            async with self.session.begin_nested():
+                created: List[ToDoTask] = await self.todo_tasks_repository.create_many(
+                    session=self.session,
+                    items=[
+                        {
+                            "title": item.title,
+                            "description": item.description,
+                            "responsible_id": responsible_id,
+                        }
+                        for _, item in batch
+                    ],
+                )
+        except DBAPIError as exc:
+            self.logger.warning("Bulk insert batch failed: %s", exc)
+            parsed = parse_integrity_error(exc=exc)
+            return [
+                BulkCreateItemResult(
+                    index=index,
+                    error=parsed.code if parsed else "db_error",
+                    message=parsed.message if parsed else None,
+                )
+                for index, _ in batch
+            ]
+
+        return [
+            BulkCreateItemResult(index=index, id=todo_task.id)
+            for (index, _), todo_task in zip(batch, created)
+        ]
+
+    async def bulk_create_todo_tasks(
+        self,
+        responsible_id: UUID,
+        raw_items: AsyncIterable[Any],
+    ) -> BulkCreateResponse:
+        """
+        Массовое создание задач. Элементы читаются по мере поступления
+        (bytes/str — JSON одного элемента, иначе уже разобранный объект),
+        валидируются по одному и вставляются пачками.
+        """
+        results: List[BulkCreateItemResult] = []
+        batch: List[tuple[int, CreateToDoTask]] = []
+        index = -1
+
+        async for raw_item in raw_items:
+            index += 1
+            if index >= BULK_CREATE_MAX_ITEMS:
+                raise PayloadTooLargeException(
+                    message=f"At most {BULK_CREATE_MAX_ITEMS} items per request"
+                )
+
+            try:
+                if isinstance(raw_item, (bytes, str)):
+                    item = CreateToDoTask.model_validate_json(raw_item)
+                else:
+                    item = CreateToDoTask.model_validate(raw_item)
+            except ValidationError as exc:
+                results.append(
+                    BulkCreateItemResult(
+                        index=index,
+                        error="validation_error",
+                        message=exc.errors()[0]["msg"],
+                    )
+                )
+                continue
+
+            batch.append((index, item))
+            if len(batch) >= BULK_INSERT_BATCH_SIZE:
+                results.extend(
+                    await self._create_todo_tasks_batch(
+                        responsible_id=responsible_id, batch=batch
+                    )
+                )
+                batch = []
+
+        if batch:
+            results.extend(
+                await self._create_todo_tasks_batch(
+                    responsible_id=responsible_id, batch=batch
+                )
+            )
+
+        results.sort(key=lambda result: result.index)
+        created = sum(1 for result in results if result.id is not None)
+        return BulkCreateResponse(
+            created=created,
+            failed=len(results) - created,
+            results=results,
+        )
+
+    async def _raise_update_conflict(self, user_id: UUID, task_id: UUID) -> None:
+        """
+        Условный UPDATE не затронул строку: задачи нет (404)
+        или её версия не совпала с If-Match (412).
+        """
+        await self.todo_tasks_repository.get_one(
+            session=self.session,
+            id=task_id,
+            responsible_id=user_id,
+        )
+        raise PreconditionFailedException()
+
+    async def update_user_todo_task(
+        self,
+        user_id: UUID,
+        task_id: UUID,
+        todo_task_update: UpdateToDoTask,
+        expected_updated_at: datetime | None = None,
+    ) -> ToDoTaskResponse:
+        """
+        Частичное изменение задачи одним UPDATE ... RETURNING.
+        expected_updated_at — версия из If-Match (оптимистическая блокировка).
+        """
+        filters: dict = {"responsible_id": user_id}
+        if expected_updated_at is not None:
+            filters["updated_at"] = expected_updated_at
+
+        changes = todo_task_update.model_dump(exclude_unset=True, exclude_none=True)
+        if not changes:
+            try:
+                todo_task: ToDoTask = await self.todo_tasks_repository.get_one(
+                    session=self.session, id=task_id, **filters
+                )
+            except NoResultFound:
+                # Как и для UPDATE: устаревший If-Match — 412, а не 404
+                await self._raise_update_conflict(user_id=user_id, task_id=task_id)
+            return ToDoTaskResponse.model_validate(obj=todo_task)
+
+        todo_task = await self.todo_tasks_repository.update(
+            session=self.session,
+            id=task_id,
+            filters=filters,
+            **changes,
+        )
+        if todo_task is None:
+            await self._raise_update_conflict(user_id=user_id, task_id=task_id)
+        return ToDoTaskResponse.model_validate(obj=todo_task)
+
+    async def replace_user_todo_task(
+        self,
+        user_id: UUID,
+        task_id: UUID,
+        todo_task_replace: ReplaceToDoTask,
+        expected_updated_at: datetime | None = None,
+    ) -> ToDoTaskResponse:
+        """
+        Создание или полная замена задачи с заданным id.
+        Без If-Match — UPDATE ... RETURNING, а если задачи нет — вставка
+        при отсутствии id (ON CONFLICT (id) на секционированной таблице
+        невозможен), с If-Match — условный UPDATE существующей задачи.
+        """
+        if expected_updated_at is not None:
+            return await self.update_user_todo_task(
+                user_id=user_id,
+                task_id=task_id,
+                todo_task_update=UpdateToDoTask(**todo_task_replace.model_dump()),
+                expected_updated_at=expected_updated_at,
+            )
+
+        todo_task = await self._replace_existing_todo_task(
+            user_id=user_id, task_id=task_id, todo_task_replace=todo_task_replace
+        )
+        if todo_task is None:
+            todo_task = await self.todo_tasks_repository.insert_if_absent(
+                session=self.session,
+                values={
+                    "id": task_id,
+                    "title": todo_task_replace.title,
+                    "description": todo_task_replace.description,
+                    "responsible_id": user_id,
+                },
+            )
+        if todo_task is None:
+            # Параллельный PUT того же id вставил задачу, пока мы ждали
+            # блокировку: её видит уже следующий запрос транзакции
+            todo_task = await self._replace_existing_todo_task(
+                user_id=user_id, task_id=task_id, todo_task_replace=todo_task_replace
+            )
+        # Задача с таким id принадлежит другому пользователю
+        if todo_task is None:
+            raise NotFoundException()
+        return ToDoTaskResponse.model_validate(obj=todo_task)
+
+    async def _replace_existing_todo_task(
+        self,
+        user_id: UUID,
+        task_id: UUID,
+        todo_task_replace: ReplaceToDoTask,
+    ) -> ToDoTask | None:
+        return await self.todo_tasks_repository.update(
+            session=self.session,
+            id=task_id,
+            filters={"responsible_id": user_id},
+            title=todo_task_replace.title,
+            description=todo_task_replace.description,
+        )
+
+    async def batch_update_todo_tasks(
+        self,
+        user_id: UUID,
+        batch_update: BatchUpdateToDoTasks,
+    ) -> List[ToDoTaskResponse]:
+        """Обновление задач пользователя одним UPDATE ... RETURNING на пачку."""
+        changes = batch_update.changes.model_dump(exclude_none=True)
+        if not changes:
+            return []
+
+        todo_tasks: List[ToDoTask] = await self.todo_tasks_repository.update_many(
+            session=self.session,
+            values=changes,
+            ids=batch_update.ids,
+            responsible_id=user_id,
+        )
+        return [
+            ToDoTaskResponse.model_validate(obj=todo_task) for todo_task in todo_tasks
+        ]
+
+    async def batch_delete_todo_tasks(
+        self,
+        user_id: UUID,
+        batch_delete: BatchDeleteToDoTasks,
+    ) -> BatchDeleteResponse:
+        deleted_ids: List[UUID] = await self.todo_tasks_repository.delete_many(
+            session=self.session,
+            ids=batch_delete.ids,
+            responsible_id=user_id,
+        )
+        return BatchDeleteResponse(deleted_ids=deleted_ids)
+
     async def get_todo_task(self, task_id: int) -> ToDoTaskResponse:
         todo_task: ToDoTask = await self.todo_tasks_repository.get_by_id(id=task_id)
         return ToDoTaskResponse.model_validate(obj=todo_task)
 
     async def get_user_todo_task(self, user_id: UUID, task_id: int) -> ToDoTaskResponse:
+        generation = self._version_generation()
         todo_task: ToDoTask = await self.todo_tasks_repository.get_one(
             session=self.session,
             id=task_id,
             responsible_id=user_id,
         )
+        self._remember_version(
+            user_id=user_id,
+            task_id=todo_task.id,
+            updated_at=todo_task.updated_at,
+            generation=generation,
+        )
         return ToDoTaskResponse.model_validate(obj=todo_task)
 
-    async def get_user_all_todo_tasks(
+    async def get_user_todo_task_version(self, user_id: UUID, task_id: UUID) -> datetime:
+        """updated_at задачи пользователя: одна колонка, без описания."""
+        generation = self._version_generation()
+        row = await self.todo_tasks_repository.get_one_row(
+            session=self.session,
+            columns=("updated_at",),
+            id=task_id,
+            responsible_id=user_id,
+        )
+        self._remember_version(
+            user_id=user_id, task_id=task_id, updated_at=row.updated_at, generation=generation
+        )
+        return row.updated_at
+
+    def stream_user_todo_tasks(
         self,
         user_id: UUID,
         list_params: ToDoTaskListParams,
-    ) -> List[ToDoTaskResponse]:
-        todo_tasks: List[ToDoTask] = await self.todo_tasks_repository.list(
+        columns: Sequence[str] | None = None,
+    ) -> AsyncIterator[Any]:
+        """
+        Все задачи пользователя по одной, без буферизации всей выборки.
+        columns — загрузить только эти колонки (строки Core вместо ORM-объектов).
+        """
+        return self.todo_tasks_repository.stream(
             session=self.session,
+            columns=columns,
             responsible_id=user_id,
             limit=list_params.pagination.limit,
             offset=list_params.pagination.offset,
@@ -60,6 +373,167 @@ class ToDoTaskService:
             date_from=list_params.dt_range_filter.date_from,
             date_to=list_params.dt_range_filter.date_to,
         )
+
+    async def search_user_todo_tasks(
+        self,
+        user_id: UUID,
+        query: str,
+        offset: int | None = None,
+        limit: int | None = None,
+    ) -> List[ToDoTaskResponse]:
+        todo_tasks = await self.todo_tasks_repository.search(
+            session=self.session,
+            responsible_id=user_id,
+            query=query,
+            offset=offset,
+            limit=limit or SEARCH_LIMIT_DEFAULT,
+        )
         return [
             ToDoTaskResponse.model_validate(obj=todo_task) for todo_task in todo_tasks
         ]
+
+    async def get_user_todo_task_stats(
+        self,
+        user_id: UUID,
+        bucket: ToDoTaskStatsBucket,
+        date_from: date,
+        date_to: date,
+    ) -> ToDoTaskStatsResponse:
+        rows = await self.todo_tasks_repository.stats(
+            session=self.session,
+            responsible_id=user_id,
+            bucket=bucket,
+            date_from=date_from,
+            date_to=date_to,
+        )
+        items = [ToDoTaskStatsItem.model_validate(obj=row) for row in rows]
+        return ToDoTaskStatsResponse(
+            bucket=bucket,
+            date_from=date_from,
+            date_to=date_to,
+            total=sum(item.count for item in items),
+            items=items,
+        )
+
+    async def _list_user_todo_tasks(
+        self,
+        user_id: UUID,
+        list_params: ToDoTaskListParams,
+        columns: Sequence[str] | None = None,
+    ) -> tuple[list, str | None, int | None]:
+        """
+        Задачи пользователя в режиме offset или cursor.
+        В режиме cursor сортировка берётся из курсора, а next_cursor
+        возвращается, если страница заполнена целиком.
+        columns — загрузить только эти колонки (строки Core вместо ORM-объектов).
+        Третий элемент — общее количество, если задан count_mode.
+        """
+        pagination = list_params.pagination
+        list_kwargs: dict[str, Any] = {
+            "session": self.session,
+            "count_mode": pagination.count_mode.value if pagination.count_mode else None,
+            "responsible_id": user_id,
+            "date_from": list_params.dt_range_filter.date_from,
+            "date_to": list_params.dt_range_filter.date_to,
+        }
+
+        keyset = pagination.mode is PaginationMode.CURSOR
+        if keyset:
+            after = None
+            if pagination.cursor is not None:
+                sort_by, sort_order, after = decode_cursor(cursor=pagination.cursor)
+                repository = self.todo_tasks_repository
+                requested_sort_by = list_params.sorting.sort_by
+                # Курсор подделан или выдан для другой сортировки
+                if repository.keyset_sort_column(sort_by=sort_by) != sort_by or (
+                    requested_sort_by is not None
+                    and repository.keyset_sort_column(sort_by=requested_sort_by) != sort_by
+                ):
+                    raise InvalidCursorException()
+                after = coerce_cursor_values(
+                    values=after, types=repository.keyset_value_types(sort_by=sort_by)
+                )
+            else:
+                sort_by = list_params.sorting.sort_by
+                sort_order = (list_params.sorting.sort_order or SortOrder.ASC).value
+            sort_by = self.todo_tasks_repository.keyset_sort_column(sort_by=sort_by)
+            limit = pagination.limit or LIMIT_TO_DEFAULT
+            list_kwargs.update(
+                limit=limit,
+                sort_by=sort_by,
+                sort_order=sort_order,
+                keyset=True,
+                after=after,
+            )
+        else:
+            list_kwargs.update(
+                limit=pagination.limit,
+                offset=pagination.offset,
+                sort_by=list_params.sorting.sort_by,
+                sort_order=list_params.sorting.sort_order,
+            )
+
+        if columns is not None and keyset:
+            # Курсор строится по колонке сортировки и id
+            columns = list(dict.fromkeys((*columns, sort_by, "id")))
+        items, total = await self.todo_tasks_repository.list_page(
+            columns=columns, **list_kwargs
+        )
+
+        next_cursor = None
+        if keyset and len(items) == limit:
+            last = items[-1]
+            next_cursor = encode_cursor(
+                sort_by=sort_by,
+                sort_order=sort_order,
+                values=(getattr(last, sort_by), last.id),
+            )
+        return items, next_cursor, total
+
+    async def get_user_todo_tasks_page(
+        self,
+        user_id: UUID,
+        list_params: ToDoTaskListParams,
+    ) -> ToDoTaskPage:
+        todo_tasks, next_cursor, total_count = await self._list_user_todo_tasks(
+            user_id=user_id, list_params=list_params
+        )
+        return ToDoTaskPage(
+            items=[
+                ToDoTaskResponse.model_validate(obj=todo_task)
+                for todo_task in todo_tasks
+            ],
+            next_cursor=next_cursor,
+            total_count=total_count,
+        )
+
+    async def get_user_todo_tasks_rows(
+        self,
+        user_id: UUID,
+        list_params: ToDoTaskListParams,
+        fields: Sequence[str],
+    ) -> tuple[List[Row], str | None, int | None]:
+        """Страница задач, где из БД выбираются только поля fields."""
+        return await self._list_user_todo_tasks(
+            user_id=user_id, list_params=list_params, columns=fields
+        )
+
+    async def get_user_todo_task_row(
+        self,
+        user_id: UUID,
+        task_id: UUID,
+        fields: Sequence[str],
+    ) -> Row:
+        # id и updated_at нужны для ETag
+        columns = list(dict.fromkeys((*fields, "id", "updated_at")))
+        generation = self._version_generation()
+        row = await self.todo_tasks_repository.get_one_row(
+            session=self.session,
+            columns=columns,
+            id=task_id,
+            responsible_id=user_id,
+        )
+        self._remember_version(
+            user_id=user_id, task_id=row.id, updated_at=row.updated_at, generation=generation
+        )
+        return row